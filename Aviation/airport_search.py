@@ -0,0 +1,192 @@
+"""
+Indexed airport search
+
+Matches a free-text query against IATA code, airport name, city and
+country and returns the top-N airport codes, so the UI only ever renders a
+short candidate list instead of every airport.
+
+    exact code   'jfk' -> JFK first
+    prefix       every query word must prefix a word of the airport
+                 ('new yo', 'heath'); matches ranked by route count
+    fuzzy        padded character trigrams for typos ('heathorw'),
+                 used to fill the list when prefixes find too few
+
+The prefix index is the flattened form of a trie: all words sorted, so a
+prefix is one bisect range (a trie subtree). The ranked matches of every
+one- and two-character prefix are precomputed, since their ranges span a
+large share of the airports. Build once per graph version (the app caches
+it under the graph fingerprint).
+
+    python airport_search.py --synthetic 10000 heathrow "new york" S0042
+"""
+import argparse
+import heapq
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from data_loader import build_network_graph, generate_synthetic_network, load_aviation_data
+from graph_arrays import compile_graph
+
+SEARCH_LIMIT = 10
+# Prefixes up to this length get their ranked matches precomputed
+SHALLOW_PREFIX = 2
+CACHED_MATCHES = 50
+# Trigrams shared by more than this share of airports carry no signal ('air', 'ort')
+MAX_GRAM_SHARE = 0.05
+# Share of the query's trigrams an airport must contain to be a fuzzy match
+MIN_SIMILARITY = 0.45
+
+
+def normalize(text: str) -> str:
+    """Lower-case ASCII words: accents dropped, punctuation -> spaces"""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^0-9a-z]+', ' ', text.lower()).strip()
+
+
+def trigrams(words: Sequence[str]) -> List[str]:
+    grams = []
+    for word in words:
+        padded = f"${word}$"
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class AirportSearchIndex:
+    """Prefix + trigram index over airport code, name, city and country"""
+
+    def __init__(self, graph):
+        cg = compile_graph(graph)
+        self.codes = list(cg.nodes)
+        self.version = cg.version
+        self.degree = np.bincount(cg.sources, minlength=cg.n) + np.bincount(cg.indices, minlength=cg.n)
+        self._labels = {}
+        self._code_ids = {normalize(code): i for i, code in enumerate(self.codes)}
+
+        words = []
+        self._airport_words = []
+        grams: Dict[str, List[int]] = {}
+        for i, code in enumerate(self.codes):
+            node = graph.nodes[code]
+            self._labels[code] = (f"{code} - {node.get('name', code)}, "
+                                  f"{node.get('city', '')} ({node.get('country', '')})")
+            airport_words = set(normalize(' '.join(str(node.get(field, '')) for field in ('name', 'city', 'country')))
+                                .split())
+            airport_words.add(normalize(code))
+            self._airport_words.append(sorted(airport_words))
+            words.extend((word, i) for word in airport_words)
+
+            for gram in set(trigrams(airport_words)):
+                grams.setdefault(gram, []).append(i)
+
+        words.sort()
+        self._words = [word for word, _ in words]
+        self._word_ids = [i for _, i in words]
+
+        max_postings = max(int(MAX_GRAM_SHARE * cg.n), 32)
+        self._grams = {gram: ids for gram, ids in grams.items() if len(ids) <= max_postings}
+
+        # Busiest-first airport order, used to rank matches
+        self._rank = np.empty(cg.n, dtype=np.int64)
+        self._busiest = np.argsort(-self.degree, kind='stable')
+        self._rank[self._busiest] = np.arange(cg.n)
+
+        self._shallow = {}
+        for length in range(1, SHALLOW_PREFIX + 1):
+            prefixes = {}
+            for word, i in words:
+                if len(word) >= length:
+                    prefixes.setdefault(word[:length], set()).add(i)
+            for prefix, ids in prefixes.items():
+                self._shallow[prefix] = self._ranked(ids, CACHED_MATCHES)
+
+    def _ranked(self, ids, limit: int) -> List[int]:
+        return heapq.nsmallest(limit, ids, key=self._rank.__getitem__)
+
+    def _prefix_range(self, prefix: str) -> List[int]:
+        """Airport ids with a word starting with prefix (may repeat)"""
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + '\x7f', lo)
+        return self._word_ids[lo:hi]
+
+    def _has_prefix(self, i: int, prefix: str) -> bool:
+        return any(word.startswith(prefix) for word in self._airport_words[i])
+
+    def prefix_matches(self, words: Sequence[str], limit: int = SEARCH_LIMIT) -> List[int]:
+        """Airports where every query word prefixes one of their words, busiest first"""
+        if len(words) == 1 and len(words[0]) <= SHALLOW_PREFIX:
+            return self._shallow.get(words[0], [])[:limit]
+
+        # Drive from the word with the fewest matches, check the others per candidate
+        ranges = sorted(((self._prefix_range(word), word) for word in words), key=lambda item: len(item[0]))
+        candidates = set(ranges[0][0])
+        others = [word for _, word in ranges[1:]]
+        if others:
+            candidates = [i for i in candidates if all(self._has_prefix(i, word) for word in others)]
+        return self._ranked(candidates, limit)
+
+    def fuzzy_matches(self, words: Sequence[str], limit: int = SEARCH_LIMIT) -> List[int]:
+        """Airports containing the most query trigrams (at least MIN_SIMILARITY of them)"""
+        # Trigrams too common to be indexed do not count towards the share
+        query_grams = [gram for gram in set(trigrams(words)) if gram in self._grams]
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._grams[gram])
+
+        needed = MIN_SIMILARITY * len(query_grams)
+        return heapq.nlargest(limit, (i for i, common in shared.items() if common >= needed),
+                              key=lambda i: (shared[i], -self._rank[i]))
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[str]:
+        """Top-limit airport codes for query (the busiest airports for an empty query)"""
+        words = normalize(query).split()
+        if not words:
+            return [self.codes[i] for i in self._busiest[:limit]]
+
+        matches = []
+        if len(words) == 1 and words[0] in self._code_ids:
+            matches.append(self._code_ids[words[0]])
+        matches.extend(self.prefix_matches(words, limit))
+        if len(set(matches)) < limit:
+            matches.extend(self.fuzzy_matches(words, limit))
+
+        return [self.codes[i] for i in dict.fromkeys(matches)][:limit]
+
+    def label(self, code: Optional[str]) -> str:
+        """'JFK - John F Kennedy Intl, New York (United States)' for selectboxes"""
+        return self._labels.get(code, str(code))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search airports by code, name, city or country")
+    parser.add_argument('queries', nargs='+')
+    parser.add_argument('--limit', type=int, default=SEARCH_LIMIT)
+    parser.add_argument('--synthetic', type=int, help="index a synthetic network of this many airports")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        graph = build_network_graph(*generate_synthetic_network(args.synthetic))
+    else:
+        graph = build_network_graph(*load_aviation_data())
+
+    start = time.perf_counter()
+    index = AirportSearchIndex(graph)
+    print(f"Indexed {len(index.codes):,} airports in {time.perf_counter() - start:.2f} s")
+
+    for query in args.queries:
+        start = time.perf_counter()
+        matches = index.search(query, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n{query!r} ({elapsed:.3f} ms)")
+        for code in matches:
+            print(f"  {index.label(code)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,18 @@
 import heapq
+import threading
 import time
+import weakref
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
 
+import numpy as np
+
+from graph_arrays import compile_graph, path_from_tree
+from jit_kernels import bellman_ford_kernel, dijkstra_kernel, floyd_warshall_kernel, use_numba
+from planner import OBJECTIVES, MAX_PLAN_SECONDS, PlanStep, plan_comparison
+from profiling import measure_memory
+from tracing import span
+
 
 class PathfindingResult:
     """Container for algorithm results"""
@@ -14,53 +25,8 @@ class PathfindingResult:
         self.details = details
 
 
-def dijkstra_shortest_distance(graph, source: str, destination: str) -> PathfindingResult:
-    """
-    Dijkstra's Algorithm - Optimized for SHORTEST DISTANCE
-    Greedy approach: always picks the nearest unvisited node
-    Time Complexity: O((V + E) log V) with binary heap
-    Space Complexity: O(V)
-    """
-    start_time = time.time()
-
-    dist = {node: float('inf') for node in graph.nodes()}
-    prev = {}
-    dist[source] = 0
-    pq = [(0, source)]
-    visited = set()
-    nodes_explored = 0
-
-    while pq:
-        current_dist, u = heapq.heappop(pq)
-
-        if u in visited:
-            continue
-
-        visited.add(u)
-        nodes_explored += 1
-
-        if u == destination:
-            break
-
-        for v in graph.neighbors(u):
-            edge_data = graph[u][v]
-            weight = edge_data['distance']  # Optimize for DISTANCE
-
-            if dist[u] + weight < dist[v]:
-                dist[v] = dist[u] + weight
-                prev[v] = u
-                heapq.heappush(pq, (dist[v], v))
-
-    # Reconstruct path
-    path = []
-    current = destination
-    while current in prev:
-        path.append(current)
-        current = prev[current]
-    path.append(source)
-    path.reverse()
-
-    # Calculate detailed metrics
+def route_totals(graph, path: List[str]) -> Dict:
+    """Distance, time and cost summed along a path (cost is 0 on graphs without fares)"""
     total_distance = 0
     total_time = 0
     total_cost = 0
@@ -69,66 +35,220 @@ def dijkstra_shortest_distance(graph, source: str, destination: str) -> Pathfind
         edge = graph[path[i]][path[i + 1]]
         total_distance += edge['distance']
         total_time += edge['time']
-        total_cost += edge['cost']
+        total_cost += edge.get('cost', 0)
 
-    execution_time = time.time() - start_time
-
-    details = {
-        'optimization_target': 'Shortest Distance',
-        'algorithm_type': 'Greedy (Single-Source)',
-        'nodes_explored': nodes_explored,
+    return {
         'total_distance': round(total_distance, 2),
         'total_time': round(total_time, 2),
         'total_cost': round(total_cost, 2),
-        'hops': len(path) - 1
+        'hops': max(len(path) - 1, 0)
     }
 
-    return PathfindingResult(path, dist[destination], execution_time, details)
 
+class DijkstraSearch:
+    """
+    Resumable single-source Dijkstra over the compiled edge arrays
+    The heap, distances and settled set survive between queries, so a new
+    destination is either already settled (answered immediately) or reached
+    by continuing the heap from where the previous query stopped.
+    Hold self.lock while querying a search shared between threads.
+    """
 
-def bellman_ford_cheapest_route(graph, source: str, destination: str) -> PathfindingResult:
+    def __init__(self, cg, attribute: str, source: int):
+        self.cg = cg
+        self.attribute = attribute
+        self.source = source
+        self.dist = [float('inf')] * cg.n
+        self.pred_edge = [-1] * cg.n
+        self.settled = bytearray(cg.n)
+        self.dist[source] = 0.0
+        self.pq = [(0.0, source)]
+        self.nodes_explored = 0
+        self.lock = threading.Lock()
+
+    def run_until(self, target: int) -> float:
+        """Settle nodes until target is settled or the heap is exhausted"""
+        if self.settled[target]:
+            return self.dist[target]
+
+        indptr, indices, weights = self.cg.as_lists(self.attribute)
+        dist = self.dist
+        pred_edge = self.pred_edge
+        settled = self.settled
+        pq = self.pq
+
+        while pq:
+            d, u = heapq.heappop(pq)
+            if settled[u]:
+                continue
+            settled[u] = 1
+            self.nodes_explored += 1
+
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                nd = d + weights[e]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    pred_edge[v] = e
+                    heapq.heappush(pq, (nd, v))
+
+            if u == target:
+                break
+
+        return dist[target]
+
+    def path_to(self, target: int) -> List[str]:
+        """Node names along the settled route to target ([] if unreachable)"""
+        if self.dist[target] == float('inf'):
+            return []
+
+        path = [target]
+        current = target
+        while current != self.source:
+            current = int(self.cg.sources[self.pred_edge[current]])
+            path.append(current)
+        return [self.cg.nodes[i] for i in reversed(path)]
+
+
+_search_cache = weakref.WeakKeyDictionary()
+_search_cache_lock = threading.Lock()
+MAX_CACHED_SEARCHES = 64
+
+
+def get_dijkstra_search(graph, source: str, attribute: str = 'distance') -> Tuple[DijkstraSearch, bool]:
     """
-    Bellman-Ford Algorithm - Optimized for CHEAPEST COST
-    Dynamic Programming: handles negative weights, penalty adjustments
-    Time Complexity: O(V * E)
+    Cached DijkstraSearch for (graph version, weight, source)
+    Returns (search, reused). The least recently used searches are dropped
+    beyond MAX_CACHED_SEARCHES per graph.
+    """
+    cg = compile_graph(graph)
+    key = (cg.version, attribute, source)
+
+    with _search_cache_lock:
+        searches = _search_cache.setdefault(graph, OrderedDict())
+        if key in searches:
+            searches.move_to_end(key)
+            return searches[key], True
+
+        search = DijkstraSearch(cg, attribute, cg.node_index[source])
+        searches[key] = search
+        while len(searches) > MAX_CACHED_SEARCHES:
+            searches.popitem(last=False)
+        return search, False
+
+
+def dijkstra_shortest_distance(graph, source: str, destination: str,
+                               backend: str = 'python') -> PathfindingResult:
+    """
+    Dijkstra's Algorithm - Optimized for SHORTEST DISTANCE
+    Greedy approach: always picks the nearest unvisited node
+    Time Complexity: O((V + E) log V) with binary heap
     Space Complexity: O(V)
+    Searches are kept per source, so changing only the destination resumes
+    the previous search instead of starting over.
+    """
+    return dijkstra_route(graph, source, destination, 'distance', 'Shortest Distance', backend)
+
+
+def dijkstra_route(graph, source: str, destination: str, attribute: str,
+                   optimization_target: str, backend: str = 'python') -> PathfindingResult:
+    """
+    Resumable Dijkstra on any non-negative edge attribute (distance, time, adjusted_cost, ...)
+    backend='numba' runs the compiled kernel instead (a fresh search per query).
     """
     start_time = time.time()
 
-    dist = {node: float('inf') for node in graph.nodes()}
-    prev = {}
-    dist[source] = 0
-    iterations = 0
+    if use_numba(backend):
+        cg = compile_graph(graph)
+        s, target = cg.node_index[source], cg.node_index[destination]
+        dist, pred_edge, nodes_explored = dijkstra_kernel(cg.indptr, cg.indices.astype(np.int64),
+                                                          cg.weight(attribute), s, target)
+        distance = float(dist[target])
+        path = [cg.nodes[i] for i in path_from_tree(cg, pred_edge.tolist(), s, target)]
+        reused = False
+    else:
+        search, reused = get_dijkstra_search(graph, source, attribute)
+        target = search.cg.node_index[destination]
+        with search.lock:
+            distance = search.run_until(target)
+            path = search.path_to(target)
+            nodes_explored = search.nodes_explored
 
-    # Relax edges |V| - 1 times
-    for _ in range(len(graph.nodes()) - 1):
-        iterations += 1
-        updated = False
+    execution_time = time.time() - start_time
 
-        for u, v, data in graph.edges(data=True):
-            # Optimize for COST with penalties
-            base_cost = data['cost']
+    details = {
+        'optimization_target': optimization_target,
+        'algorithm_type': 'Greedy (Single-Source)',
+        'nodes_explored': nodes_explored,
+        'search_reused': reused,
+        'backend': 'numba' if use_numba(backend) else 'python'
+    }
+    details.update(route_totals(graph, path))
 
-            # Apply dynamic pricing adjustments
-            # Reward direct flights (fewer layovers)
-            layover_penalty = data['layover'] * 50  # $50 per hour layover
+    return PathfindingResult(path, distance, execution_time, details)
 
-            # Fuel surcharge affects cost optimization differently
-            adjusted_cost = base_cost + layover_penalty
 
-            if dist[u] != float('inf') and dist[u] + adjusted_cost < dist[v]:
-                dist[v] = dist[u] + adjusted_cost
-                prev[v] = u
-                updated = True
+def bellman_ford_cheapest_route(graph, source: str, destination: str,
+                                max_stops: Optional[int] = None, backend: str = 'python') -> PathfindingResult:
+    """
+    Bellman-Ford Algorithm - Optimized for CHEAPEST COST
+    Dynamic Programming: handles negative weights, penalty adjustments
+    Time Complexity: O(V * E), O(k * E) with max_stops = k
+    Space Complexity: O(V)
+    backend='numba' runs the relaxation rounds as a compiled kernel.
+    """
+    if max_stops is not None:
+        by_stops = cheapest_routes_by_stops(graph, source, destination, max_stops)
+        if not by_stops:
+            return PathfindingResult([], float('inf'), 0.0, {})
+        return by_stops[max(by_stops)]
 
-        if not updated:
-            break
+    start_time = time.time()
 
-    # Check for negative cycles
-    for u, v, data in graph.edges(data=True):
-        adjusted_cost = data['cost'] + data['layover'] * 50
-        if dist[u] != float('inf') and dist[u] + adjusted_cost < dist[v]:
+    if use_numba(backend):
+        cg = compile_graph(graph)
+        dist_arr, pred, iterations, negative_cycle = bellman_ford_kernel(
+            cg.n, cg.sources.astype(np.int64), cg.indices.astype(np.int64),
+            cg.weight('adjusted_cost'), cg.node_index[source])
+        if negative_cycle:
             raise ValueError("Graph contains negative-weight cycle")
+        dist = dict(zip(cg.nodes, dist_arr.tolist()))
+        prev = {cg.nodes[v]: cg.nodes[u] for v, u in enumerate(pred.tolist()) if u != -1}
+    else:
+        dist = {node: float('inf') for node in graph.nodes()}
+        prev = {}
+        dist[source] = 0
+        iterations = 0
+
+        # Relax edges |V| - 1 times
+        for _ in range(len(graph.nodes()) - 1):
+            iterations += 1
+            updated = False
+
+            for u, v, data in graph.edges(data=True):
+                # Optimize for COST with penalties
+                base_cost = data['cost']
+
+                # Apply dynamic pricing adjustments
+                # Reward direct flights (fewer layovers)
+                layover_penalty = data['layover'] * 50  # $50 per hour layover
+
+                # Fuel surcharge affects cost optimization differently
+                adjusted_cost = base_cost + layover_penalty
+
+                if dist[u] != float('inf') and dist[u] + adjusted_cost < dist[v]:
+                    dist[v] = dist[u] + adjusted_cost
+                    prev[v] = u
+                    updated = True
+
+            if not updated:
+                break
+
+        # Check for negative cycles
+        for u, v, data in graph.edges(data=True):
+            adjusted_cost = data['cost'] + data['layover'] * 50
+            if dist[u] != float('inf') and dist[u] + adjusted_cost < dist[v]:
+                raise ValueError("Graph contains negative-weight cycle")
 
     # Reconstruct path
     path = []
@@ -156,6 +276,7 @@ def bellman_ford_cheapest_route(graph, source: str, destination: str) -> Pathfin
         'optimization_target': 'Cheapest Cost',
         'algorithm_type': 'Dynamic Programming',
         'iterations': iterations,
+        'backend': 'numba' if use_numba(backend) else 'python',
         'total_distance': round(total_distance, 2),
         'total_time': round(total_time, 2),
         'total_cost': round(total_cost, 2),
@@ -165,12 +286,83 @@ def bellman_ford_cheapest_route(graph, source: str, destination: str) -> Pathfin
     return PathfindingResult(path, dist[destination], execution_time, details)
 
 
-def floyd_warshall_fastest_time(graph, source: str, destination: str) -> PathfindingResult:
+def cheapest_routes_by_stops(graph, source: str, destination: str,
+                             max_stops: int = 2) -> Dict[int, PathfindingResult]:
+    """
+    Hop-Limited Bellman-Ford - CHEAPEST COST with at most k stops
+    Exactly k + 1 relaxation rounds over the compiled edge arrays, each
+    round reading one distance vector and writing the other. After round r
+    the vector holds the cheapest cost using at most r flights, so a single
+    call yields the cheapest route for every stop count 0..k.
+    Time Complexity: O(k * E)
+    Space Complexity: O(k * V) for the per-round predecessors
+    """
+    start_time = time.time()
+
+    cg = compile_graph(graph)
+    weights = cg.weight('adjusted_cost')
+    src = cg.sources
+    dst = cg.indices
+    s = cg.node_index[source]
+    t = cg.node_index[destination]
+
+    current = np.full(cg.n, np.inf)
+    current[s] = 0.0
+    nxt = np.empty_like(current)
+    preds = []
+    best_by_round = []
+
+    for _ in range(max_stops + 1):
+        candidate = current[src] + weights
+        np.copyto(nxt, current)
+        np.minimum.at(nxt, dst, candidate)
+
+        # pred[v] = -1 keeps the previous round's route to v
+        pred = np.full(cg.n, -1, dtype=np.int64)
+        improved = (candidate < current[dst]) & (candidate == nxt[dst])
+        pred[dst[improved]] = src[improved]
+        preds.append(pred)
+        best_by_round.append(nxt[t])
+
+        current, nxt = nxt, current
+
+    execution_time = time.time() - start_time
+
+    results = {}
+    for stops, cost in enumerate(best_by_round):
+        if cost == np.inf:
+            continue
+
+        path_idx = [t]
+        v, r = t, stops
+        while r >= 0:
+            if preds[r][v] != -1:
+                v = int(preds[r][v])
+                path_idx.append(v)
+            r -= 1
+        path = [cg.nodes[i] for i in reversed(path_idx)]
+
+        details = {
+            'optimization_target': 'Cheapest Cost',
+            'algorithm_type': 'Hop-Limited Dynamic Programming',
+            'max_stops': max_stops,
+            'iterations': max_stops + 1,
+            'stops': len(path) - 2
+        }
+        details.update(route_totals(graph, path))
+        results[stops] = PathfindingResult(path, float(cost), execution_time, details)
+
+    return results
+
+
+def floyd_warshall_fastest_time(graph, source: str, destination: str,
+                                backend: str = 'python') -> PathfindingResult:
     """
     Floyd-Warshall Algorithm - Optimized for FASTEST TIME
     All-Pairs Shortest Path: precomputes all routes globally
     Time Complexity: O(V³)
     Space Complexity: O(V²)
+    backend='numba' runs the triple loop as a compiled kernel.
     """
     start_time = time.time()
 
@@ -178,30 +370,42 @@ def floyd_warshall_fastest_time(graph, source: str, destination: str) -> Pathfin
     n = len(nodes)
     node_idx = {node: i for i, node in enumerate(nodes)}
 
-    # Initialize distance and next matrices
-    dist = [[float('inf')] * n for _ in range(n)]
-    next_node = [[None] * n for _ in range(n)]
-
-    # Set diagonal to 0
-    for i in range(n):
-        dist[i][i] = 0
-
-    # Initialize with edge weights (optimizing for TIME)
-    for u, v, data in graph.edges(data=True):
-        i, j = node_idx[u], node_idx[v]
-        # Optimize for TIME (includes layover consideration)
-        dist[i][j] = data['time']
-        next_node[i][j] = j
-
-    # Floyd-Warshall main loop
-    operations = 0
-    for k in range(n):
+    if use_numba(backend):
+        cg = compile_graph(graph)
+        dist_arr = np.full((n, n), np.inf)
+        next_arr = np.full((n, n), -1, dtype=np.int64)
+        np.fill_diagonal(dist_arr, 0.0)
+        dist_arr[cg.sources, cg.indices] = cg.weight('time')
+        next_arr[cg.sources, cg.indices] = cg.indices
+        floyd_warshall_kernel(dist_arr, next_arr)
+        dist = dist_arr.tolist()
+        next_node = [[j if j != -1 else None for j in row] for row in next_arr.tolist()]
+        operations = n ** 3
+    else:
+        # Initialize distance and next matrices
+        dist = [[float('inf')] * n for _ in range(n)]
+        next_node = [[None] * n for _ in range(n)]
+
+        # Set diagonal to 0
         for i in range(n):
-            for j in range(n):
-                operations += 1
-                if dist[i][k] + dist[k][j] < dist[i][j]:
-                    dist[i][j] = dist[i][k] + dist[k][j]
-                    next_node[i][j] = next_node[i][k]
+            dist[i][i] = 0
+
+        # Initialize with edge weights (optimizing for TIME)
+        for u, v, data in graph.edges(data=True):
+            i, j = node_idx[u], node_idx[v]
+            # Optimize for TIME (includes layover consideration)
+            dist[i][j] = data['time']
+            next_node[i][j] = j
+
+        # Floyd-Warshall main loop
+        operations = 0
+        for k in range(n):
+            for i in range(n):
+                for j in range(n):
+                    operations += 1
+                    if dist[i][k] + dist[k][j] < dist[i][j]:
+                        dist[i][j] = dist[i][k] + dist[k][j]
+                        next_node[i][j] = next_node[i][k]
 
     # Reconstruct path
     src_idx = node_idx[source]
@@ -233,6 +437,7 @@ def floyd_warshall_fastest_time(graph, source: str, destination: str) -> Pathfin
         'optimization_target': 'Fastest Time',
         'algorithm_type': 'All-Pairs (Global Optimization)',
         'total_operations': operations,
+        'backend': 'numba' if use_numba(backend) else 'python',
         'matrix_size': f"{n}x{n}",
         'total_distance': round(total_distance, 2),
         'total_time': round(total_time, 2),
@@ -243,30 +448,69 @@ def floyd_warshall_fastest_time(graph, source: str, destination: str) -> Pathfin
     return PathfindingResult(path, dist[src_idx][dst_idx], execution_time, details)
 
 
-def compare_all_algorithms(graph, source: str, destination: str) -> Dict:
-    """Run all three algorithms and return comparison"""
+def run_engine(graph, engine: str, label: str, source: str, destination: str,
+               backend: str = 'python') -> PathfindingResult:
+    """Answer one comparison entry (see planner.OBJECTIVES) with the given engine"""
+    attribute, target = OBJECTIVES[label]
+    if engine == 'dijkstra':
+        if label == 'Dijkstra':
+            return dijkstra_shortest_distance(graph, source, destination, backend)
+        return dijkstra_route(graph, source, destination, attribute, target, backend)
+    if engine == 'bellman_ford' and label == 'Bellman-Ford':
+        return bellman_ford_cheapest_route(graph, source, destination, backend=backend)
+    if engine == 'floyd_warshall' and label == 'Floyd-Warshall':
+        return floyd_warshall_fastest_time(graph, source, destination, backend)
+    raise ValueError(f"No {engine} runner for {label}")
+
+
+def refused_result(step: PlanStep) -> PathfindingResult:
+    """Placeholder for a plan the planner refused to run"""
+    return PathfindingResult([], float('inf'), 0.0, {
+        'optimization_target': OBJECTIVES[step.label][1],
+        'algorithm_type': 'Refused by planner',
+        'refused': True,
+        'estimated_seconds': step.estimated_seconds,
+        'plan': step.explain()
+    })
+
+
+def compare_all_algorithms(graph, source: str, destination: str,
+                           profile_memory: bool = False, use_planner: bool = False,
+                           max_seconds: float = MAX_PLAN_SECONDS, backend: str = 'python') -> Dict:
+    """
+    Run all three algorithms and return comparison
+    With profile_memory each solver runs under tracemalloc and its peak
+    allocation, allocation count and retained result size are added to
+    result.details (execution times then include the tracing overhead).
+    Every entry is checked by the query planner first: plans estimated
+    above max_seconds are refused (see refused_result) instead of run.
+    With use_planner each objective is answered by the cheapest valid
+    engine rather than its namesake algorithm. The plan explanation is
+    stored in result.details['plan']. backend='numba' runs the solvers as
+    compiled kernels when Numba is installed (see jit_kernels).
+    """
+    with span('plan'):
+        plan = plan_comparison(graph, use_planner=use_planner, max_seconds=max_seconds)
+
+    def run(step):
+        if not step.feasible:
+            return refused_result(step)
+        if not profile_memory:
+            result = run_engine(graph, step.engine, step.label, source, destination, backend)
+        else:
+            result, stats = measure_memory(run_engine, graph, step.engine, step.label, source, destination,
+                                           backend)
+            result.details.update(stats)
+        result.details['plan'] = step.explain()
+        return result
 
     results = {}
-
-    try:
-        # Dijkstra - Shortest Distance
-        results['Dijkstra'] = dijkstra_shortest_distance(graph, source, destination)
-    except Exception as e:
-        print(f"Dijkstra failed: {e}")
-        results['Dijkstra'] = None
-
-    try:
-        # Bellman-Ford - Cheapest Cost
-        results['Bellman-Ford'] = bellman_ford_cheapest_route(graph, source, destination)
-    except Exception as e:
-        print(f"Bellman-Ford failed: {e}")
-        results['Bellman-Ford'] = None
-
-    try:
-        # Floyd-Warshall - Fastest Time
-        results['Floyd-Warshall'] = floyd_warshall_fastest_time(graph, source, destination)
-    except Exception as e:
-        print(f"Floyd-Warshall failed: {e}")
-        results['Floyd-Warshall'] = None
-
-    return results
\ No newline at end of file
+    for label, step in plan.items():
+        try:
+            with span(f'solve:{label}', engine=step.engine):
+                results[label] = run(step)
+        except Exception as e:
+            print(f"{label} failed: {e}")
+            results[label] = None
+
+    return results
@@ -0,0 +1,217 @@
+"""
+Scaling-sweep benchmark for the aviation algorithms
+
+Generates synthetic airport networks of increasing size, runs every
+algorithm / engine variant that is still viable at that size, and records
+execution time and peak memory per size. Scaling exponents are fitted on a
+log-log scale so they can be compared with the complexity table in README.
+
+    python benchmark.py --sizes 100 1000 10000 50000 --output benchmark.csv
+    python benchmark.py --sizes 100 300 --fw-sizes 1000 2000 --fw-workers 1 2 4 8
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aviation_algorithms import (
+    bellman_ford_cheapest_route, cheapest_routes_by_stops,
+    dijkstra_shortest_distance, floyd_warshall_fastest_time
+)
+from data_loader import build_network_graph, generate_synthetic_network
+from graph_arrays import compile_graph, shortest_path_tree
+from k_shortest import yen_k_shortest_paths
+from parallel_floyd_warshall import blocked_floyd_warshall
+from profiling import measure_memory
+
+DEFAULT_SIZES = [100, 300, 1000, 3000, 10000, 30000, 50000]
+
+# name -> (runner(graph, source, destination), largest node count still run)
+ENGINES = {
+    'Dijkstra': (dijkstra_shortest_distance, None),
+    'Dijkstra (full tree)': (
+        lambda g, s, d: shortest_path_tree(compile_graph(g), 'distance', compile_graph(g).node_index[s]),
+        None
+    ),
+    'Bellman-Ford': (bellman_ford_cheapest_route, 3000),
+    'Hop-Limited Bellman-Ford (3 stops)': (
+        lambda g, s, d: cheapest_routes_by_stops(g, s, d, max_stops=3),
+        None
+    ),
+    'Floyd-Warshall': (floyd_warshall_fastest_time, 300),
+    'Blocked Floyd-Warshall (1 worker)': (lambda g, s, d: blocked_floyd_warshall(g, 'time', workers=1), 3000),
+    "Yen's K-Shortest (K=10)": (lambda g, s, d: yen_k_shortest_paths(g, s, d, k=10), 30000),
+}
+
+
+def _timed(runner, graph, source, destination):
+    start = time.perf_counter()
+    runner(graph, source, destination)
+    return time.perf_counter() - start
+
+
+def run_benchmark(sizes=None, repeats=3, k_nearest=4, seed=42, engines=None) -> pd.DataFrame:
+    """Run every engine on every network size; one row per (engine, size)"""
+    sizes = sizes or DEFAULT_SIZES
+    engines = engines or ENGINES
+    rng = np.random.default_rng(seed)
+    rows = []
+
+    for n in sizes:
+        airports_df, routes_df = generate_synthetic_network(n, k_nearest=k_nearest, seed=seed)
+        graph = build_network_graph(airports_df, routes_df)
+        nodes = list(graph.nodes())
+
+        start = time.perf_counter()
+        compile_graph(graph)
+        rows.append({
+            'engine': 'Compile CSR', 'nodes': n, 'edges': graph.number_of_edges(),
+            'time_s': time.perf_counter() - start, 'peak_memory_kb': np.nan
+        })
+
+        for name, (runner, cutoff) in engines.items():
+            if cutoff is not None and n > cutoff:
+                continue
+
+            # Fresh source per repeat so cached searches do not hide the cost
+            pairs = [tuple(rng.choice(nodes, 2, replace=False)) for _ in range(repeats)]
+            times = [_timed(runner, graph, s, d) for s, d in pairs]
+            s, d = tuple(rng.choice(nodes, 2, replace=False))
+            _, memory = measure_memory(runner, graph, s, d)
+
+            rows.append({
+                'engine': name, 'nodes': n, 'edges': graph.number_of_edges(),
+                'time_s': float(np.median(times)), 'peak_memory_kb': memory['peak_memory_kb']
+            })
+            print(f"{name:<36} n={n:<6} {rows[-1]['time_s'] * 1000:10.2f} ms "
+                  f"{rows[-1]['peak_memory_kb']:10.1f} KiB")
+
+    return pd.DataFrame(rows)
+
+
+# Largest size at which the pure-Python floyd_warshall_fastest_time is also compared
+SERIAL_CHECK_NODES = 300
+SERIAL_CHECK_PAIRS = 30
+
+
+def serial_floyd_warshall(graph, attribute: str = 'time') -> np.ndarray:
+    """
+    Distance matrix in the serial k-i-j order of floyd_warshall_fastest_time
+    (one vectorised row/column update per k, which does the same additions)
+    """
+    cg = compile_graph(graph)
+    dist = np.full((cg.n, cg.n), np.inf)
+    np.fill_diagonal(dist, 0.0)
+    dist[cg.sources, cg.indices] = cg.weight(attribute)
+    for k in range(cg.n):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+    return dist
+
+
+def run_floyd_warshall_speedup(sizes=None, worker_counts=None, k_nearest=4, seed=42) -> pd.DataFrame:
+    """
+    Parallel blocked Floyd-Warshall time and speedup over 1 worker per core count
+    Every run is checked against the serial solver with np.allclose, not
+    for equality: the blocked tile order sums the same routes in a
+    different order, so distances can differ in the last float bits
+    (48.620000000000005 vs 48.62). Up to SERIAL_CHECK_NODES airports the
+    routes of sampled pairs are also compared with floyd_warshall_fastest_time.
+    """
+    sizes = sizes or [500, 1000, 2000]
+    worker_counts = worker_counts or [1, 2, 4, 8]
+    rows = []
+
+    for n in sizes:
+        airports_df, routes_df = generate_synthetic_network(n, k_nearest=k_nearest, seed=seed)
+        graph = build_network_graph(airports_df, routes_df)
+        serial = serial_floyd_warshall(graph, 'time')
+        baseline = None
+
+        if 1 < n <= SERIAL_CHECK_NODES:
+            nodes = list(graph.nodes())
+            rng = np.random.default_rng(seed)
+            # Distinct pairs only: floyd_warshall_fastest_time has no route from an airport to itself
+            origins = rng.integers(0, n, size=SERIAL_CHECK_PAIRS)
+            destinations = rng.integers(0, n - 1, size=SERIAL_CHECK_PAIRS)
+            destinations += destinations >= origins
+            for i, j in zip(origins, destinations):
+                result = floyd_warshall_fastest_time(graph, nodes[i], nodes[j])
+                if not np.isclose(result.total_weight, serial[i, j]):
+                    raise AssertionError(f"Serial Floyd-Warshall reference diverged at n={n}")
+
+        for workers in sorted(worker_counts):
+            start = time.perf_counter()
+            _, dist, _ = blocked_floyd_warshall(graph, 'time', workers=workers)
+            elapsed = time.perf_counter() - start
+
+            if not np.allclose(dist, serial):
+                raise AssertionError(f"Parallel Floyd-Warshall diverged from the serial solver "
+                                     f"at n={n}, workers={workers}")
+            if baseline is None:
+                baseline = elapsed
+
+            rows.append({
+                'nodes': n, 'workers': workers, 'time_s': elapsed,
+                'speedup': round(baseline / elapsed, 2)
+            })
+            print(f"Blocked Floyd-Warshall n={n:<6} workers={workers:<3} "
+                  f"{elapsed:8.3f} s  speedup x{rows[-1]['speedup']}")
+
+    return pd.DataFrame(rows)
+
+
+def fit_scaling_exponents(df: pd.DataFrame) -> pd.DataFrame:
+    """Least-squares slope of log(time) and log(memory) against log(V) per engine"""
+    rows = []
+    for engine, group in df.groupby('engine'):
+        group = group[group['time_s'] > 0]
+        if group['nodes'].nunique() < 2:
+            continue
+
+        log_n = np.log(group['nodes'].values)
+        time_exp = np.polyfit(log_n, np.log(group['time_s'].values), 1)[0]
+
+        memory = group['peak_memory_kb'].values
+        memory_exp = np.nan
+        if np.all(memory > 0):
+            memory_exp = np.polyfit(log_n, np.log(memory), 1)[0]
+
+        rows.append({
+            'engine': engine,
+            'time_exponent': round(time_exp, 2),
+            'memory_exponent': round(memory_exp, 2),
+            'largest_size': int(group['nodes'].max()),
+            'time_at_largest_s': round(group.loc[group['nodes'].idxmax(), 'time_s'], 4)
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the aviation algorithms")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--k-nearest', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmark_results.csv')
+    parser.add_argument('--fw-sizes', type=int, nargs='*', default=[],
+                        help="network sizes for the parallel Floyd-Warshall speedup sweep")
+    parser.add_argument('--fw-workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    df = run_benchmark(args.sizes, args.repeats, args.k_nearest, args.seed)
+    df.to_csv(args.output, index=False)
+
+    exponents = fit_scaling_exponents(df)
+    exponents.to_csv(args.output.replace('.csv', '_exponents.csv'), index=False)
+    print()
+    print(exponents.to_string(index=False))
+
+    if args.fw_sizes:
+        print()
+        speedup = run_floyd_warshall_speedup(args.fw_sizes, args.fw_workers, args.k_nearest, args.seed)
+        speedup.to_csv(args.output.replace('.csv', '_fw_speedup.csv'), index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,112 @@
+import hashlib
+import os
+import zlib
 import pandas as pd
 import numpy as np
-from math import radians, sin, cos, sqrt, atan2
+from math import radians, sin, cos, sqrt
 import networkx as nx
 
 
 def haversine_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points on Earth in kilometers"""
+    """
+    Calculate distance between two points on Earth in kilometers
+    Same operation sequence as haversine_matrix, so both agree bit for bit
+    """
     R = 6371  # Earth's radius in km
 
     lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
     dlat = lat2 - lat1
     dlon = lon2 - lon1
 
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    sin_dlat = sin(dlat / 2)
+    sin_dlon = sin(dlon / 2)
+    a = sin_dlat * sin_dlat + cos(lat1) * cos(lat2) * sin_dlon * sin_dlon
+    # np.arctan2 rather than math.atan2: the two differ in the last bit
+    c = 2 * float(np.arctan2(sqrt(a), sqrt(1 - a)))
 
     return R * c
 
 
+def _haversine_block(lat1, lon1, lat2, lon2):
+    """Vectorised kernel: radians in, (M, N) kilometres out (float64), computed in place"""
+    sin_dlat = lat2[None, :] - lat1[:, None]
+    sin_dlat /= 2
+    np.sin(sin_dlat, out=sin_dlat)
+
+    sin_dlon = lon2[None, :] - lon1[:, None]
+    sin_dlon /= 2
+    np.sin(sin_dlon, out=sin_dlon)
+
+    # a = sin_dlat * sin_dlat + cos(lat1) * cos(lat2) * sin_dlon * sin_dlon
+    a = sin_dlat
+    a *= sin_dlat
+    term = np.cos(lat1)[:, None] * np.cos(lat2)[None, :]
+    term *= sin_dlon
+    term *= sin_dlon
+    a += term
+
+    # c = 2 * atan2(sqrt(a), sqrt(1 - a)); reuse the buffers
+    np.subtract(1, a, out=term)
+    np.sqrt(term, out=term)
+    np.sqrt(a, out=sin_dlon)
+    np.arctan2(sin_dlon, term, out=sin_dlon)
+    sin_dlon *= 2
+    sin_dlon *= 6371
+
+    return sin_dlon
+
+
+def iter_haversine_chunks(lat1, lon1, lat2=None, lon2=None, chunk_size=1024, dtype=np.float64):
+    """Yield (row_start, block) for the M x N great-circle distance matrix, chunk_size rows at a time"""
+    lat1 = np.radians(np.asarray(lat1, dtype=np.float64))
+    lon1 = np.radians(np.asarray(lon1, dtype=np.float64))
+    lat2 = lat1 if lat2 is None else np.radians(np.asarray(lat2, dtype=np.float64))
+    lon2 = lon1 if lon2 is None else np.radians(np.asarray(lon2, dtype=np.float64))
+
+    for start in range(0, len(lat1), chunk_size):
+        stop = start + chunk_size
+        yield start, _haversine_block(lat1[start:stop], lon1[start:stop], lat2, lon2).astype(dtype, copy=False)
+
+
+def haversine_matrix(lat1, lon1, lat2=None, lon2=None, dtype=np.float64, chunk_size=1024):
+    """
+    Pairwise great-circle distances in km
+    Full N x N matrix when only one set of points is given, M x N otherwise.
+    Computed chunk_size rows at a time to bound temporaries; float32 halves
+    the result's memory (values are computed in float64, then rounded).
+    """
+    m = len(lat1)
+    n = m if lat2 is None else len(lat2)
+    out = np.empty((m, n), dtype=dtype)
+    for start, block in iter_haversine_chunks(lat1, lon1, lat2, lon2, chunk_size, dtype):
+        out[start:start + len(block)] = block
+    return out
+
+
+def cached_distance_matrix(airports_df, cache_dir='.', dtype=np.float32, chunk_size=1024):
+    """
+    N x N airport distance matrix, memory-mapped from a .npy cache file
+    The file name carries a hash of the coordinates, so a changed airport
+    table gets a new cache; the matrix is written in chunks and reopened
+    read-only, so large N never needs the whole matrix in RAM.
+    """
+    lat = airports_df['lat'].to_numpy(dtype=np.float64)
+    lon = airports_df['lon'].to_numpy(dtype=np.float64)
+    key = hashlib.sha1(np.concatenate((lat, lon)).tobytes()).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"distances_{key}_{np.dtype(dtype).name}.npy")
+
+    if not os.path.exists(path):
+        tmp_path = path + '.tmp'
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(len(lat), len(lat)))
+        for start, block in iter_haversine_chunks(lat, lon, chunk_size=chunk_size, dtype=dtype):
+            out[start:start + len(block)] = block
+        out.flush()
+        del out
+        os.replace(tmp_path, path)
+
+    return np.load(path, mmap_mode='r')
+
+
 def create_comprehensive_aviation_network():
     """Create a comprehensive aviation network with major global airports"""
 
@@ -196,8 +285,9 @@ def build_network_graph(airports_df, routes_df):
             # Calculate cost with complexity factors
             base_cost = distance * 0.15  # Base: $0.15 per km
 
-            # Add variability factors (seeded for consistency)
-            np.random.seed(hash(src + dst) % 2 ** 32)
+            # Add variability factors (seeded from the route so every process agrees;
+            # hash() is salted per interpreter)
+            np.random.seed(zlib.crc32(f"{src}-{dst}".encode('utf-8')))
             demand_factor = np.random.uniform(0.8, 1.6)
             fuel_surcharge = np.random.uniform(80, 250)
             airport_fees = np.random.uniform(50, 180)
@@ -219,7 +309,7 @@ def build_network_graph(airports_df, routes_df):
             )
 
             # Reverse direction with different cost/time
-            np.random.seed(hash(dst + src) % 2 ** 32)
+            np.random.seed(zlib.crc32(f"{dst}-{src}".encode('utf-8')))
             reverse_demand = np.random.uniform(0.8, 1.6)
             reverse_cost = (base_cost * reverse_demand) + np.random.uniform(80, 250) + np.random.uniform(50, 180)
             reverse_layover = np.random.choice([0, 1.5, 3, 5], p=[0.5, 0.3, 0.15, 0.05])
@@ -237,6 +327,69 @@ def build_network_graph(airports_df, routes_df):
     return G
 
 
+def generate_synthetic_network(n_airports, k_nearest=4, seed=42):
+    """
+    Synthetic global airport network for benchmarking
+    Airports are spread uniformly over the globe and each one gets routes to
+    its k nearest neighbours; returns (airports_df, routes_df) in the same
+    shape as create_comprehensive_aviation_network.
+    """
+    rng = np.random.default_rng(seed)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n_airports)))
+    lon = rng.uniform(-180, 180, n_airports)
+
+    airports_df = pd.DataFrame({
+        'iata': [f"S{i:05d}" for i in range(n_airports)],
+        'name': [f"Synthetic Airport {i}" for i in range(n_airports)],
+        'city': [f"City {i}" for i in range(n_airports)],
+        'country': [f"Region {i % 50}" for i in range(n_airports)],
+        'lat': np.round(lat, 4),
+        'lon': np.round(lon, 4)
+    })
+
+    # Bucket unit-sphere coordinates into a cube grid (~k points per cell)
+    # so nearest neighbours only need the 27 surrounding cells
+    phi, lam = np.radians(airports_df['lat'].values), np.radians(airports_df['lon'].values)
+    xyz = np.column_stack((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)))
+    cell_size = np.sqrt(4 * np.pi * max(k_nearest, 1) / n_airports)
+    cells = np.floor(xyz / cell_size).astype(np.int64)
+
+    buckets = {}
+    for i, cell in enumerate(map(tuple, cells)):
+        buckets.setdefault(cell, []).append(i)
+
+    sources, destinations = [], []
+    seen = set()
+
+    for i, (cx, cy, cz) in enumerate(map(tuple, cells)):
+        candidates = []
+        radius = 1
+        while len(candidates) <= k_nearest and radius <= 4:
+            candidates = [j for dx in range(-radius, radius + 1)
+                          for dy in range(-radius, radius + 1)
+                          for dz in range(-radius, radius + 1)
+                          for j in buckets.get((cx + dx, cy + dy, cz + dz), ())]
+            radius += 1
+        candidates = np.array([j for j in candidates if j != i], dtype=np.int64)
+        if len(candidates) == 0:
+            continue
+
+        chord = np.linalg.norm(xyz[candidates] - xyz[i], axis=1)
+        for j in candidates[np.argsort(chord)[:k_nearest]]:
+            pair = (min(i, j), max(i, j))
+            if pair not in seen:
+                seen.add(pair)
+                sources.append(airports_df['iata'].iat[pair[0]])
+                destinations.append(airports_df['iata'].iat[pair[1]])
+
+    routes_df = pd.DataFrame({
+        'source_airport': sources,
+        'dest_airport': destinations
+    })
+
+    return airports_df, routes_df
+
+
 def load_aviation_data():
     """Load aviation data - uses built-in comprehensive dataset"""
     return create_comprehensive_aviation_network()
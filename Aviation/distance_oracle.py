@@ -0,0 +1,320 @@
+"""
+Approximate distance oracle
+
+An all-pairs matrix needs V² floats (80 GB at 100k airports). The oracle
+keeps O(V·k) numbers instead and answers a query from them in microseconds:
+
+    landmarks  k random airports (the Thorup-Zwick sample); one forward and
+               one backward Dijkstra each gives d(l, v) and d(v, l) for all v
+    balls      the ball_size nearest airports of every airport, with their
+               exact distances (truncated Dijkstra)
+
+A query u -> v is exact when v is in u's ball. Otherwise it returns a
+certified interval lower <= d(u, v) <= upper:
+
+    upper  min over landmarks of d(u, l) + d(l, v)        (the estimate)
+    lower  max of the landmark triangle bounds d(l, v) - d(l, u) and
+           d(u, l) - d(v, l), and u's ball radius (v lies outside it)
+
+Stretch guarantee: with p the landmark of shortest round trip from u,
+upper <= d(u, p) + d(p, u) + d(u, v) and d(u, v) >= radius(u), so every
+estimate from u is within 1 + round_trip(u) / radius(u) of the truth
+(3 on two-way networks once u's ball reaches its nearest landmark, as in
+Thorup-Zwick). max_stretch is that bound over all airports; bounds()
+also returns the tighter per-query bound upper / lower.
+
+Landmark searches and balls are preprocessed on a process pool.
+
+    python distance_oracle.py --synthetic 20000 --landmarks 16 --pairs 2000
+"""
+import argparse
+import heapq
+import os
+import random
+import time
+from multiprocessing import Pool
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import build_network_graph, generate_synthetic_network, load_aviation_data
+from graph_arrays import CompiledGraph, compile_graph, shortest_path_tree
+
+LANDMARKS = 16
+# Nearest airports stored exactly per airport
+BALL_SIZE = 16
+
+# Worker-side compiled graph (set once per process by _init_worker)
+_state = {}
+
+
+def nearest_ball(cg: CompiledGraph, attribute: str, source: int, size: int) -> Tuple[List[int], List[float]]:
+    """The size airports closest to source (excluding it) in settling order, with their distances"""
+    indptr, indices, weights = cg.as_lists(attribute)
+    dist = {source: 0.0}
+    settled = set()
+    ids, dists = [], []
+    pq = [(0.0, source)]
+
+    while pq and len(ids) < size:
+        d, u = heapq.heappop(pq)
+        if u in settled:
+            continue
+        settled.add(u)
+        if u != source:
+            ids.append(u)
+            dists.append(d)
+
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d + weights[e]
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+
+    return ids, dists
+
+
+def _landmark_row(cg: CompiledGraph, attribute: str, landmark: int, backward: bool) -> np.ndarray:
+    """d(landmark, v) for every v, or d(v, landmark) with backward=True"""
+    graph = cg.reverse() if backward else cg
+    return np.array(shortest_path_tree(graph, attribute, landmark)[0])
+
+
+def _ball_rows(cg: CompiledGraph, attribute: str, sources: Sequence[int],
+               size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(ids, dists, radius) of the balls of sources, padded with -1 / inf"""
+    ids = np.full((len(sources), size), -1, dtype=np.int32)
+    dists = np.full((len(sources), size), np.inf)
+    radius = np.full(len(sources), np.inf)
+    for row, source in enumerate(sources):
+        ball, ball_dists = nearest_ball(cg, attribute, source, size)
+        ids[row, :len(ball)] = ball
+        dists[row, :len(ball)] = ball_dists
+        # A ball smaller than size holds everything reachable: nothing lies beyond it
+        if len(ball) == size:
+            radius[row] = ball_dists[-1]
+    return ids, dists, radius
+
+
+def _init_worker(cg: CompiledGraph):
+    _state['cg'] = cg
+
+
+def _worker_landmark(task: Tuple[str, int, bool]) -> np.ndarray:
+    return _landmark_row(_state['cg'], *task)
+
+
+def _worker_balls(task: Tuple[str, List[int], int]):
+    return _ball_rows(_state['cg'], *task)
+
+
+class DistanceOracle:
+    """
+    Landmark distances and nearest-airport balls of one compiled graph
+    from_landmark[v, i] = d(l_i, v), to_landmark[v, i] = d(v, l_i);
+    ball_ids[u] lists u's nearest airports (-1 padded), ball_dist their
+    distances and radius[u] the distance of the farthest one.
+    """
+
+    def __init__(self, nodes: List, attribute: str, landmarks: np.ndarray, from_landmark: np.ndarray,
+                 to_landmark: np.ndarray, ball_ids: np.ndarray, ball_dist: np.ndarray, radius: np.ndarray):
+        self.nodes = list(nodes)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        self.attribute = attribute
+        self.landmarks = landmarks
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+        self.ball_ids = ball_ids
+        self.ball_dist = ball_dist
+        self.radius = radius
+
+        # Worst-case stretch of any estimate from u (see the module docstring)
+        round_trip = (from_landmark + to_landmark).min(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cap = 1.0 + round_trip / radius
+        cap[np.isinf(radius)] = 1.0  # every query from u is exact or unreachable
+        self.stretch_cap = np.nan_to_num(cap, nan=np.inf)
+
+    @property
+    def max_stretch(self) -> float:
+        """Guaranteed bound on estimate / exact distance over every pair"""
+        return float(self.stretch_cap.max()) if len(self.nodes) else 1.0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.from_landmark, self.to_landmark, self.ball_ids,
+                                      self.ball_dist, self.radius, self.stretch_cap))
+
+    def bounds(self, source: str, target: str) -> Tuple[float, float, float]:
+        """(estimate, lower, upper) for source -> target; the estimate is the upper bound"""
+        u, v = self.node_index[source], self.node_index[target]
+        if u == v:
+            return 0.0, 0.0, 0.0
+        hit = np.flatnonzero(self.ball_ids[u] == v)
+        if len(hit):
+            d = float(self.ball_dist[u, hit[0]])
+            return d, d, d
+
+        upper = float((self.to_landmark[u] + self.from_landmark[v]).min())
+        with np.errstate(invalid='ignore'):
+            # fmax skips the NaNs of inf - inf (landmarks unreachable both ways)
+            lower = np.fmax.reduce(np.concatenate((
+                self.from_landmark[v] - self.from_landmark[u],
+                self.to_landmark[u] - self.to_landmark[v],
+                (self.radius[u], upper / self.stretch_cap[u])
+            )))
+        return upper, float(lower), upper
+
+    def distance(self, source: str, target: str) -> float:
+        """Approximate distance source -> target (inf when unreachable)"""
+        return self.bounds(source, target)[0]
+
+    def query_many(self, sources: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorised bounds() over node-index arrays: (estimate, lower, upper)"""
+        sources = np.asarray(sources)
+        targets = np.asarray(targets)
+        upper = (self.to_landmark[sources] + self.from_landmark[targets]).min(axis=1)
+        with np.errstate(invalid='ignore'):
+            lower = np.fmax.reduce(np.column_stack((
+                self.from_landmark[targets] - self.from_landmark[sources],
+                self.to_landmark[sources] - self.to_landmark[targets],
+                self.radius[sources],
+                upper / self.stretch_cap[sources]
+            )), axis=1)
+
+        in_ball = self.ball_ids[sources] == targets[:, None]
+        exact = in_ball.any(axis=1)
+        ball_value = np.where(in_ball, self.ball_dist[sources], np.inf).min(axis=1)
+        same = sources == targets
+        for values in (lower, upper):
+            values[exact] = ball_value[exact]
+            values[same] = 0.0
+        return upper.copy(), lower, upper
+
+
+def build_oracle(graph, attribute: str = 'distance', landmarks: int = LANDMARKS, ball_size: int = BALL_SIZE,
+                 workers: Optional[int] = None, seed: int = 42, chunk_size: int = 512) -> DistanceOracle:
+    """
+    Preprocess graph for approximate attribute distances
+    Memory is (2 * landmarks + 2 * ball_size + 2) numbers per airport.
+    """
+    cg = compile_graph(graph)
+    cg.weight(attribute)
+    n = cg.n
+    chosen = np.array(sorted(random.Random(seed).sample(range(n), min(landmarks, n))), dtype=np.int64)
+
+    landmark_tasks = [(attribute, int(l), backward) for backward in (False, True) for l in chosen]
+    ball_tasks = [(attribute, list(range(i, min(i + chunk_size, n))), ball_size) for i in range(0, n, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        rows = [_landmark_row(cg, *task) for task in landmark_tasks]
+        balls = [_ball_rows(cg, *task) for task in ball_tasks]
+    else:
+        cg.reverse()
+        with Pool(workers, initializer=_init_worker, initargs=(cg,)) as pool:
+            rows = pool.map(_worker_landmark, landmark_tasks)
+            balls = pool.map(_worker_balls, ball_tasks)
+
+    k = len(chosen)
+    from_landmark = np.stack(rows[:k], axis=1) if k else np.zeros((n, 0))
+    to_landmark = np.stack(rows[k:], axis=1) if k else np.zeros((n, 0))
+    if balls:
+        ball_ids, ball_dist, radius = (np.concatenate(parts) for parts in zip(*balls))
+    else:
+        ball_ids, ball_dist, radius = np.zeros((0, ball_size), np.int32), np.zeros((0, ball_size)), np.zeros(0)
+    return DistanceOracle(cg.nodes, attribute, chosen, from_landmark, to_landmark, ball_ids, ball_dist, radius)
+
+
+def measure_error(oracle: DistanceOracle, graph, pairs: int = 1000, sources: int = 20,
+                  seed: int = 42) -> pd.DataFrame:
+    """
+    Oracle answers against exact Dijkstra on random pairs
+    pairs targets are spread over sources random sources (one full Dijkstra
+    each). One row per pair: exact, estimate, lower, upper, stretch.
+    """
+    cg = compile_graph(graph)
+    rng = np.random.default_rng(seed)
+    origin = rng.choice(cg.n, size=min(sources, cg.n), replace=False)
+    per_source = -(-pairs // len(origin))
+
+    us, vs, exact = [], [], []
+    for u in origin:
+        dist = np.array(shortest_path_tree(cg, oracle.attribute, int(u))[0])
+        targets = rng.integers(0, cg.n, per_source)
+        us.append(np.full(per_source, u))
+        vs.append(targets)
+        exact.append(dist[targets])
+    us, vs, exact = np.concatenate(us)[:pairs], np.concatenate(vs)[:pairs], np.concatenate(exact)[:pairs]
+
+    estimate, lower, upper = oracle.query_many(us, vs)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stretch = np.where(exact > 0, estimate / exact, 1.0)
+    return pd.DataFrame({
+        'source': [oracle.nodes[u] for u in us],
+        'target': [oracle.nodes[v] for v in vs],
+        'exact': exact,
+        'estimate': estimate,
+        'lower': lower,
+        'upper': upper,
+        'stretch': stretch,
+    })
+
+
+def error_summary(errors: pd.DataFrame) -> dict:
+    """Stretch distribution of a measure_error result; violations must be 0"""
+    reachable = errors[np.isfinite(errors['exact'])]
+    stretch = reachable['stretch']
+    tolerance = 1e-9 * np.maximum(errors['exact'].where(np.isfinite(errors['exact']), 0), 1)
+    violations = ((errors['lower'] > errors['exact'] + tolerance) |
+                  (errors['upper'] < errors['exact'] - tolerance)).sum()
+    quantiles = stretch.quantile([0.5, 0.9, 0.99]) if len(stretch) else pd.Series([np.nan] * 3, [0.5, 0.9, 0.99])
+    return {
+        'pairs': len(errors),
+        'unreachable': len(errors) - len(reachable),
+        'exact_share': round(float((stretch <= 1 + 1e-12).mean()), 4) if len(stretch) else None,
+        'mean_stretch': round(float(stretch.mean()), 4) if len(stretch) else None,
+        'p50': round(float(quantiles[0.5]), 4),
+        'p90': round(float(quantiles[0.9]), 4),
+        'p99': round(float(quantiles[0.99]), 4),
+        'max_stretch': round(float(stretch.max()), 4) if len(stretch) else None,
+        'bound_violations': int(violations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a distance oracle and measure its error against Dijkstra")
+    parser.add_argument('--weight', default='distance', choices=['distance', 'time', 'cost', 'adjusted_cost'])
+    parser.add_argument('--landmarks', type=int, default=LANDMARKS)
+    parser.add_argument('--ball-size', type=int, default=BALL_SIZE)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--pairs', type=int, default=1000)
+    parser.add_argument('--sources', type=int, default=20, help="exact Dijkstra runs the pairs are drawn from")
+    parser.add_argument('--synthetic', type=int, help="use a synthetic network of this many airports")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        graph = build_network_graph(*generate_synthetic_network(args.synthetic))
+    else:
+        graph = build_network_graph(*load_aviation_data())
+
+    start = time.perf_counter()
+    oracle = build_oracle(graph, args.weight, args.landmarks, args.ball_size, args.workers)
+    print(f"Oracle over {graph.number_of_nodes():,} airports in {time.perf_counter() - start:.2f} s "
+          f"({oracle.nbytes / 2 ** 20:.1f} MiB, guaranteed stretch <= {oracle.max_stretch:.2f})")
+
+    errors = measure_error(oracle, graph, args.pairs, args.sources)
+    sample = errors.head(min(len(errors), 1000))
+    start = time.perf_counter()
+    for row in sample.itertuples(index=False):
+        oracle.distance(row.source, row.target)
+    per_query = (time.perf_counter() - start) / max(len(sample), 1)
+    print(f"{per_query * 1e6:.1f} µs per query")
+    for key, value in error_summary(errors).items():
+        print(f"  {key:18} {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+import hashlib
+import heapq
+import weakref
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Bellman-Ford in aviation_algorithms charges $50 per layover hour on top of the fare
+LAYOVER_PENALTY_PER_HOUR = 50
+
+DERIVED_WEIGHTS = {
+    'adjusted_cost': lambda w: w['cost'] + w['layover'] * LAYOVER_PENALTY_PER_HOUR,
+}
+
+_compiled_cache = weakref.WeakKeyDictionary()
+
+
+class CompiledGraph:
+    """
+    Array (CSR) form of a DiGraph
+    Nodes are numbered 0..n-1 and the outgoing edges of node i are
+    indices[indptr[i]:indptr[i + 1]]. Every numeric edge attribute is kept
+    as one float64 array aligned with the edge ids.
+    """
+
+    def __init__(self, nodes: List, indptr: np.ndarray, indices: np.ndarray,
+                 sources: np.ndarray, weights: Dict[str, np.ndarray], version=None):
+        self.nodes = list(nodes)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.sources = sources
+        self.weights = weights
+        self.version = version
+        self._lists = {}
+        self._reverse = None
+        self._fingerprint = None
+
+    @property
+    def n(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def m(self) -> int:
+        return len(self.indices)
+
+    def weight(self, attribute: str) -> np.ndarray:
+        """Edge weight array for a stored or derived attribute"""
+        if attribute not in self.weights:
+            if attribute not in DERIVED_WEIGHTS:
+                raise KeyError(f"Unknown edge attribute: {attribute}")
+            self.weights[attribute] = DERIVED_WEIGHTS[attribute](self.weights)
+        return self.weights[attribute]
+
+    def edge_id(self, u: int, v: int) -> int:
+        """Edge id of u -> v (node indices), -1 if there is no such edge"""
+        for e in range(self.indptr[u], self.indptr[u + 1]):
+            if self.indices[e] == v:
+                return e
+        return -1
+
+    def edge_mask(self) -> np.ndarray:
+        """Fresh all-enabled edge mask; set entries to False to ban edges"""
+        return np.ones(self.m, dtype=bool)
+
+    def as_lists(self, attribute: str) -> Tuple[List[int], List[int], List[float]]:
+        """Python-list views of (indptr, indices, weights) for interpreted hot loops"""
+        if attribute not in self._lists:
+            self._lists[attribute] = (
+                self.indptr.tolist(),
+                self.indices.tolist(),
+                self.weight(attribute).tolist()
+            )
+        return self._lists[attribute]
+
+    def reverse(self) -> 'CompiledGraph':
+        """Transposed graph; reverse().edge_ids maps each reversed edge to its original id"""
+        if self._reverse is None:
+            order = np.argsort(self.indices, kind='stable')
+            counts = np.bincount(self.indices, minlength=self.n)
+            indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+            weights = {name: w[order] for name, w in self.weights.items()}
+            rev = CompiledGraph(self.nodes, indptr, self.sources[order],
+                                self.indices[order], weights, self.version)
+            rev.edge_ids = order
+            self._reverse = rev
+        return self._reverse
+
+
+def graph_version(graph) -> Tuple[int, int, int]:
+    """Cheap change token for a graph; call mark_modified() after editing edge weights in place"""
+    return graph.graph.get('version', 0), graph.number_of_nodes(), graph.number_of_edges()
+
+
+def mark_modified(graph):
+    """Bump the graph version so compiled arrays and cached searches are rebuilt"""
+    graph.graph['version'] = graph.graph.get('version', 0) + 1
+
+
+def graph_fingerprint(cg: CompiledGraph) -> str:
+    """Content hash of the node list, CSR structure and stored edge weights (memoised)"""
+    if cg._fingerprint is not None:
+        return cg._fingerprint
+
+    digest = hashlib.sha1()
+    digest.update('\x00'.join(map(str, cg.nodes)).encode('utf-8'))
+    digest.update(np.ascontiguousarray(cg.indptr).tobytes())
+    digest.update(np.ascontiguousarray(cg.indices).tobytes())
+    for name in sorted(cg.weights):
+        if name not in DERIVED_WEIGHTS:
+            digest.update(name.encode('utf-8'))
+            digest.update(np.ascontiguousarray(cg.weights[name]).tobytes())
+    cg._fingerprint = digest.hexdigest()
+    return cg._fingerprint
+
+
+def attach_compiled(graph, compiled: CompiledGraph):
+    """Register already-built arrays for graph (e.g. from a snapshot) so compile_graph skips the rebuild"""
+    compiled.version = graph_version(graph)
+    _compiled_cache[graph] = compiled
+
+
+def compile_graph(graph) -> CompiledGraph:
+    """Compile a DiGraph into CSR arrays (cached until the graph version changes)"""
+    version = graph_version(graph)
+    cached = _compiled_cache.get(graph)
+    if cached is not None and cached.version == version:
+        return cached
+
+    nodes = list(graph.nodes())
+    node_index = {node: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+
+    attributes = []
+    for _, _, data in graph.edges(data=True):
+        attributes = [k for k, v in data.items() if isinstance(v, (int, float, np.number))]
+        break
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    targets = []
+    sources = []
+    columns = {attr: [] for attr in attributes}
+
+    for i, u in enumerate(nodes):
+        for v, data in graph.adj[u].items():
+            sources.append(i)
+            targets.append(node_index[v])
+            for attr in attributes:
+                columns[attr].append(data[attr])
+        indptr[i + 1] = len(targets)
+
+    compiled = CompiledGraph(
+        nodes,
+        indptr,
+        np.array(targets, dtype=np.int32),
+        np.array(sources, dtype=np.int32),
+        {attr: np.array(values, dtype=np.float64) for attr, values in columns.items()},
+        version
+    )
+    _compiled_cache[graph] = compiled
+    return compiled
+
+
+def shortest_path_tree(cg: CompiledGraph, attribute: str, source: int,
+                       edge_mask: Optional[np.ndarray] = None,
+                       target: Optional[int] = None) -> Tuple[List[float], List[int]]:
+    """
+    Dijkstra over the CSR arrays
+    Returns (dist, pred_edge) indexed by node; pred_edge[v] is the edge id
+    used to reach v (-1 for the source and unreached nodes). Edges whose
+    mask entry is False are skipped. Stops early once target is settled.
+    """
+    indptr, indices, weights = cg.as_lists(attribute)
+    inf = float('inf')
+    dist = [inf] * cg.n
+    pred_edge = [-1] * cg.n
+    dist[source] = 0.0
+    pq = [(0.0, source)]
+    settled = bytearray(cg.n)
+
+    while pq:
+        d, u = heapq.heappop(pq)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        if u == target:
+            break
+
+        for e in range(indptr[u], indptr[u + 1]):
+            if edge_mask is not None and not edge_mask[e]:
+                continue
+            v = indices[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred_edge[v] = e
+                heapq.heappush(pq, (nd, v))
+
+    return dist, pred_edge
+
+
+def multi_source_search(cg: CompiledGraph, attribute: str, sources: Iterable[int],
+                        targets: Set[int]) -> Tuple[List[float], List[int], Optional[int]]:
+    """
+    Dijkstra seeded with several sources at distance 0, stopped at the
+    first settled target. Returns (dist, pred_edge, reached target or None).
+    """
+    indptr, indices, weights = cg.as_lists(attribute)
+    inf = float('inf')
+    dist = [inf] * cg.n
+    pred_edge = [-1] * cg.n
+    pq = []
+    for s in sources:
+        dist[s] = 0.0
+        pq.append((0.0, s))
+    heapq.heapify(pq)
+    settled = bytearray(cg.n)
+
+    while pq:
+        d, u = heapq.heappop(pq)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        if u in targets:
+            return dist, pred_edge, u
+
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred_edge[v] = e
+                heapq.heappush(pq, (nd, v))
+
+    return dist, pred_edge, None
+
+
+def path_from_tree(cg: CompiledGraph, pred_edge: List[int], source: Optional[int], target: int) -> List[int]:
+    """
+    Node-index path source -> target from a predecessor-edge tree ([] if unreachable)
+    With source=None the walk stops at whichever root of a multi-source tree it reaches.
+    """
+    if source == target:
+        return [source]
+    if pred_edge[target] == -1:
+        return [target] if source is None else []
+
+    path = [target]
+    current = target
+    while current != source and pred_edge[current] != -1:
+        current = int(cg.sources[pred_edge[current]])
+        path.append(current)
+    path.reverse()
+    return path
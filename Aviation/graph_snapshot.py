@@ -0,0 +1,241 @@
+"""
+Compact binary graph snapshots
+
+File layout (little-endian):
+    8 bytes   magic b'AVSNAP\\x00\\x00'
+    4 bytes   header length H (uint32)
+    H bytes   JSON header: schema version, content hash, source hash,
+              string node columns and the (dtype, shape, offset) of
+              every array
+    ...       numeric arrays, each 64-byte aligned
+
+Numeric arrays (CSR indptr/indices/sources, edge attributes, lat/lon) are
+mapped straight from the file with np.memmap, so loading costs no copies;
+the networkx DiGraph is only rebuilt when to_networkx() is called.
+
+The source hash identifies the inputs the graph was built from (see
+source_hash); load_or_build_network rebuilds when it no longer matches.
+Files are written to a temporary name and renamed into place, so readers
+never see a partly written snapshot.
+"""
+import hashlib
+import inspect
+import json
+import os
+import struct
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from graph_arrays import DERIVED_WEIGHTS, CompiledGraph, attach_compiled, compile_graph
+
+MAGIC = b'AVSNAP\x00\x00'
+SCHEMA_VERSION = 2
+ALIGNMENT = 64
+
+
+def _content_hash(strings: Dict[str, List], arrays: Dict[str, np.ndarray]) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps(strings, sort_keys=True).encode('utf-8'))
+    for name in sorted(arrays):
+        digest.update(name.encode('utf-8'))
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()
+
+
+def source_hash(*frames: pd.DataFrame, builder: Optional[Callable] = None) -> str:
+    """
+    Hash of the input DataFrames (columns, dtypes and values), the snapshot
+    schema version and, if given, the source code of the graph builder
+    """
+    digest = hashlib.sha256(f"schema:{SCHEMA_VERSION}".encode('utf-8'))
+    for frame in frames:
+        digest.update(json.dumps([[str(c), str(t)] for c, t in frame.dtypes.items()]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+    if builder is not None:
+        digest.update(inspect.getsource(builder).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def save_snapshot(graph, path: str, source: Optional[str] = None) -> str:
+    """
+    Write graph to a snapshot file and return its content hash
+    source is the source_hash of the data the graph was built from.
+    """
+    cg = compile_graph(graph)
+
+    node_attrs = {}
+    for node in cg.nodes:
+        node_attrs = graph.nodes[node]
+        break
+
+    strings = {'nodes': [str(node) for node in cg.nodes]}
+    arrays = {
+        'indptr': cg.indptr.astype(np.int64),
+        'indices': cg.indices.astype(np.int32),
+        'sources': cg.sources.astype(np.int32),
+    }
+
+    for attr, value in node_attrs.items():
+        column = [graph.nodes[node].get(attr) for node in cg.nodes]
+        if isinstance(value, (int, float, np.number)):
+            arrays[f"node:{attr}"] = np.array(column, dtype=np.float64)
+        else:
+            strings[f"node:{attr}"] = [str(v) for v in column]
+
+    for attr, weights in cg.weights.items():
+        if attr not in DERIVED_WEIGHTS:
+            arrays[f"edge:{attr}"] = weights.astype(np.float64)
+
+    content_hash = _content_hash(strings, arrays)
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+
+    header = json.dumps({
+        'schema_version': SCHEMA_VERSION,
+        'content_hash': content_hash,
+        'source_hash': source,
+        'strings': strings,
+        'arrays': layout,
+    }).encode('utf-8')
+
+    prefix = len(MAGIC) + 4 + len(header)
+    data_start = (prefix + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(b'\x00' * (data_start - prefix))
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return content_hash
+
+
+class GraphSnapshot:
+    """A loaded snapshot; numeric arrays are read-only views into the mapped file"""
+
+    def __init__(self, path: str, header: Dict, arrays: Dict[str, np.ndarray]):
+        self.path = path
+        self.schema_version = header['schema_version']
+        self.content_hash = header['content_hash']
+        self.source_hash = header.get('source_hash')
+        self.strings = header['strings']
+        self.arrays = arrays
+        self.nodes = self.strings['nodes']
+
+    def verify(self) -> bool:
+        """Recompute the content hash (reads every byte of the file)"""
+        return _content_hash(self.strings, self.arrays) == self.content_hash
+
+    def node_table(self) -> Dict[str, list]:
+        """Node columns (IATA, name, city, country, lat, lon, ...) by attribute name"""
+        table = {'iata': self.nodes}
+        for key, values in self.strings.items():
+            if key.startswith('node:'):
+                table[key[5:]] = values
+        for key, values in self.arrays.items():
+            if key.startswith('node:'):
+                table[key[5:]] = values
+        return table
+
+    def to_compiled(self) -> CompiledGraph:
+        """CSR view over the mapped arrays (no copies)"""
+        weights = {key[5:]: values for key, values in self.arrays.items() if key.startswith('edge:')}
+        return CompiledGraph(
+            self.nodes,
+            self.arrays['indptr'],
+            self.arrays['indices'],
+            self.arrays['sources'],
+            weights,
+            ('snapshot', self.content_hash)
+        )
+
+    def to_networkx(self) -> nx.DiGraph:
+        """Rehydrate the DiGraph; its compiled arrays are pre-registered"""
+        G = nx.DiGraph()
+        table = self.node_table()
+        attrs = [key for key in table if key != 'iata']
+
+        for i, node in enumerate(self.nodes):
+            G.add_node(node, **{attr: _scalar(table[attr][i]) for attr in attrs})
+
+        edge_attrs = {key[5:]: values.tolist() for key, values in self.arrays.items()
+                      if key.startswith('edge:')}
+        sources = self.arrays['sources'].tolist()
+        targets = self.arrays['indices'].tolist()
+        for e, (u, v) in enumerate(zip(sources, targets)):
+            G.add_edge(self.nodes[u], self.nodes[v],
+                       **{attr: values[e] for attr, values in edge_attrs.items()})
+
+        attach_compiled(G, self.to_compiled())
+        return G
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def load_snapshot(path: str) -> GraphSnapshot:
+    """Map a snapshot file; raises ValueError on a bad magic or schema version"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a graph snapshot")
+        (header_len,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+    if header['schema_version'] != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported snapshot schema version {header['schema_version']}")
+
+    prefix = len(MAGIC) + 4 + header_len
+    data_start = (prefix + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        shape = tuple(spec['shape'])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=np.dtype(spec['dtype']))
+            continue
+        arrays[name] = np.memmap(path, dtype=np.dtype(spec['dtype']), mode='r',
+                                 offset=data_start + spec['offset'], shape=shape)
+
+    return GraphSnapshot(path, header, arrays)
+
+
+def load_or_build_network(snapshot_path: Optional[str], build, source: Optional[str] = None):
+    """
+    Load the graph from snapshot_path if it exists and was built from the
+    same source (see source_hash), otherwise call build() and write the
+    snapshot for the next session
+    """
+    if snapshot_path and os.path.exists(snapshot_path):
+        try:
+            snapshot = load_snapshot(snapshot_path)
+            if source is None or snapshot.source_hash == source:
+                return snapshot.to_networkx()
+            print("Snapshot was built from different data, rebuilding")
+        except (ValueError, OSError) as e:
+            print(f"Snapshot load failed, rebuilding: {e}")
+
+    graph = build()
+    if snapshot_path:
+        save_snapshot(graph, snapshot_path, source)
+    return graph
@@ -0,0 +1,121 @@
+"""
+Optional Numba kernels for Dijkstra, Bellman-Ford and Floyd-Warshall
+
+The kernels run on the compiled CSR arrays (graph_arrays) and repeat the
+reference loops in aviation_algorithms step for step: same edge order,
+same (distance, node index) heap, same early exits. They therefore
+return identical distances, routes and iteration counts.
+
+With Numba installed they are compiled on first use and cached on disk
+(__pycache__, or NUMBA_CACHE_DIR), so later processes start without
+recompiling. Without it NUMBA_AVAILABLE is False and the solvers keep
+their pure-Python/NumPy loops whatever backend is requested.
+
+The root app's jit_kernels.py holds the same kernels (the two apps share
+no modules); change both copies together.
+"""
+import heapq
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+BACKENDS = ('python', 'numba')
+
+
+def _jit(func):
+    if numba is None:
+        return func
+    return numba.njit(cache=True)(func)
+
+
+def use_numba(backend: str) -> bool:
+    """True when backend asks for the kernels and Numba can compile them"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    return backend == 'numba' and NUMBA_AVAILABLE
+
+
+@_jit
+def dijkstra_kernel(indptr, indices, weights, source, target):
+    """
+    Binary-heap Dijkstra over CSR arrays, stopping once target (-1: none) is settled
+    Returns (dist, pred_edge, nodes settled).
+    """
+    n = len(indptr) - 1
+    dist = np.full(n, np.inf)
+    pred_edge = np.full(n, -1, dtype=np.int64)
+    settled = np.zeros(n, dtype=np.bool_)
+    dist[source] = 0.0
+    pq = [(0.0, source)]
+    explored = 0
+
+    while len(pq) > 0:
+        d, u = heapq.heappop(pq)
+        if settled[u]:
+            continue
+        settled[u] = True
+        explored += 1
+
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred_edge[v] = e
+                heapq.heappush(pq, (nd, v))
+
+        if u == target:
+            break
+
+    return dist, pred_edge, explored
+
+
+@_jit
+def bellman_ford_kernel(n, src, dst, weights, source):
+    """
+    Bellman-Ford over an edge list, stopping after a round without updates
+    Returns (dist, pred node or -1, rounds run, negative cycle found).
+    """
+    dist = np.full(n, np.inf)
+    pred = np.full(n, -1, dtype=np.int64)
+    dist[source] = 0.0
+    rounds = 0
+
+    for _ in range(n - 1):
+        rounds += 1
+        updated = False
+        for e in range(len(src)):
+            u = src[e]
+            if dist[u] != np.inf and dist[u] + weights[e] < dist[dst[e]]:
+                dist[dst[e]] = dist[u] + weights[e]
+                pred[dst[e]] = u
+                updated = True
+        if not updated:
+            break
+
+    negative_cycle = False
+    for e in range(len(src)):
+        u = src[e]
+        if dist[u] != np.inf and dist[u] + weights[e] < dist[dst[e]]:
+            negative_cycle = True
+            break
+
+    return dist, pred, rounds, negative_cycle
+
+
+@_jit
+def floyd_warshall_kernel(dist, next_node):
+    """In-place Floyd-Warshall on a V x V matrix; next_node uses -1 for no route"""
+    n = dist.shape[0]
+    for k in range(n):
+        for i in range(n):
+            for j in range(n):
+                if dist[i, k] + dist[k, j] < dist[i, j]:
+                    dist[i, j] = dist[i, k] + dist[k, j]
+                    next_node[i, j] = next_node[i, k]
+    return dist, next_node
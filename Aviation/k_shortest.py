@@ -0,0 +1,185 @@
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+from aviation_algorithms import PathfindingResult, route_totals
+from graph_arrays import compile_graph, shortest_path_tree
+
+
+class KShortestPaths:
+    """
+    Yen's K-Shortest Loopless Paths towards one destination
+    The reverse shortest-path tree to the destination is built once and
+    reused: a spur path that can follow the tree without touching a banned
+    edge or root-path node is optimal as-is, otherwise the tree distances
+    drive an A* spur search. Banned edges are switched off in a mask over the
+    compiled edge arrays, the graph itself is never copied.
+    Time Complexity: O(K * L * (E + V log V)) worst case, L = path length
+    Space Complexity: O(V + E)
+    """
+
+    def __init__(self, graph, destination: str, weight: str = 'distance'):
+        self.graph = graph
+        self.weight = weight
+        self.cg = compile_graph(graph)
+        self.target = self.cg.node_index[destination]
+
+        rev = self.cg.reverse()
+        self.dist_to_target, rev_pred = shortest_path_tree(rev, weight, self.target)
+        self.next_edge = [int(rev.edge_ids[e]) if e != -1 else -1 for e in rev_pred]
+
+        self.mask = self.cg.edge_mask()
+        self.spur_cache: Dict[Tuple, Optional[Tuple[float, List[int]]]] = {}
+        self.spur_searches = 0
+        self.cache_hits = 0
+        self.tree_reuses = 0
+
+    def _tree_path(self, spur: int, banned_nodes) -> Optional[List[int]]:
+        """Edges of the tree path spur -> target, None if it hits a banned edge/node"""
+        indices = self.cg.as_lists(self.weight)[1]
+        edges = []
+        u = spur
+        while u != self.target:
+            e = self.next_edge[u]
+            if e == -1 or not self.mask[e] or indices[e] in banned_nodes:
+                return None
+            edges.append(e)
+            u = indices[e]
+        return edges
+
+    def _astar(self, spur: int, banned_nodes) -> Optional[Tuple[float, List[int]]]:
+        """A* from spur to target guided by the unrestricted tree distances"""
+        indptr, indices, weights = self.cg.as_lists(self.weight)
+        h = self.dist_to_target
+        inf = float('inf')
+        g = {spur: 0.0}
+        pred = {}
+        closed = set()
+        pq = [(h[spur], 0.0, spur)]
+
+        while pq:
+            _, gu, u = heapq.heappop(pq)
+            if u in closed:
+                continue
+            closed.add(u)
+
+            if u == self.target:
+                edges = []
+                while u != spur:
+                    e = pred[u]
+                    edges.append(e)
+                    u = int(self.cg.sources[e])
+                edges.reverse()
+                return gu, edges
+
+            for e in range(indptr[u], indptr[u + 1]):
+                if not self.mask[e]:
+                    continue
+                v = indices[e]
+                if v in banned_nodes or h[v] == inf:
+                    continue
+                ng = gu + weights[e]
+                if ng < g.get(v, inf):
+                    g[v] = ng
+                    pred[v] = e
+                    heapq.heappush(pq, (ng + h[v], ng, v))
+
+        return None
+
+    def _spur_path(self, root: Tuple[int, ...], banned_edges: frozenset) -> Optional[Tuple[float, List[int]]]:
+        key = (root, banned_edges)
+        if key in self.spur_cache:
+            self.cache_hits += 1
+            return self.spur_cache[key]
+
+        self.spur_searches += 1
+        spur = root[-1]
+        banned_nodes = set(root[:-1])
+        for e in banned_edges:
+            self.mask[e] = False
+
+        edges = self._tree_path(spur, banned_nodes)
+        if edges is not None:
+            self.tree_reuses += 1
+            result = (self.dist_to_target[spur], edges)
+        else:
+            result = self._astar(spur, banned_nodes)
+
+        for e in banned_edges:
+            self.mask[e] = True
+        self.spur_cache[key] = result
+        return result
+
+    def paths(self, source: str, k: int) -> List[Tuple[float, List[int], List[int]]]:
+        """Up to k (cost, node indices, edge ids) tuples in non-decreasing cost order"""
+        s = self.cg.node_index[source]
+        if self.dist_to_target[s] == float('inf'):
+            return []
+
+        indices = self.cg.as_lists(self.weight)[1]
+        weights = self.cg.as_lists(self.weight)[2]
+
+        first_edges = self._tree_path(s, set())
+        first_nodes = [s] + [indices[e] for e in first_edges]
+        found = [(self.dist_to_target[s], first_nodes, first_edges)]
+        seen = {tuple(first_nodes)}
+        candidates = []
+
+        while len(found) < k:
+            _, prev_nodes, prev_edges = found[-1]
+            root_cost = 0.0
+
+            for i in range(len(prev_nodes) - 1):
+                root = tuple(prev_nodes[:i + 1])
+                banned_edges = frozenset(
+                    p_edges[i] for _, p_nodes, p_edges in found
+                    if len(p_nodes) > i + 1 and tuple(p_nodes[:i + 1]) == root
+                )
+
+                spur = self._spur_path(root, banned_edges)
+                if spur is not None:
+                    spur_cost, spur_edges = spur
+                    nodes = list(root) + [indices[e] for e in spur_edges]
+                    key = tuple(nodes)
+                    if key not in seen:
+                        seen.add(key)
+                        edges = list(prev_edges[:i]) + spur_edges
+                        heapq.heappush(candidates, (root_cost + spur_cost, nodes, edges))
+
+                root_cost += weights[prev_edges[i]]
+
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+
+        return found
+
+
+def yen_k_shortest_paths(graph, source: str, destination: str, k: int = 5,
+                         weight: str = 'distance') -> List[PathfindingResult]:
+    """
+    Top-K loopless routes from source to destination for any edge attribute
+    (distance, time, cost, adjusted_cost, ...). Works on both the aviation
+    and the transport graphs.
+    """
+    start_time = time.time()
+
+    engine = KShortestPaths(graph, destination, weight)
+    ranked = engine.paths(source, k)
+    execution_time = time.time() - start_time
+
+    results = []
+    for rank, (cost, nodes, _) in enumerate(ranked, start=1):
+        path = [engine.cg.nodes[i] for i in nodes]
+        details = {
+            'optimization_target': f"K-Shortest ({weight})",
+            'algorithm_type': "Yen's K-Shortest Loopless Paths",
+            'rank': rank,
+            'spur_searches': engine.spur_searches,
+            'spur_cache_hits': engine.cache_hits,
+            'tree_reuses': engine.tree_reuses,
+        }
+        details.update(route_totals(graph, path))
+        results.append(PathfindingResult(path, cost, execution_time, details))
+
+    return results
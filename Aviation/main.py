@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import folium
 from streamlit_folium import st_folium
@@ -5,7 +6,26 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from data_loader import load_aviation_data, build_network_graph, get_network_statistics
-from aviation_algorithms import compare_all_algorithms
+from aviation_algorithms import compare_all_algorithms, cheapest_routes_by_stops
+from graph_snapshot import load_or_build_network, source_hash
+from result_cache import ResultCache, SharedNetwork, cached_compare_all_algorithms
+from centrality import compute_centrality
+from tracing import TRACER, span
+from map_layers import MAX_MARKERS, add_lod_layers, build_lod_layers
+from airport_search import SEARCH_LIMIT, AirportSearchIndex
+from reachability import isochrone_layer, reachable_within
+from jit_kernels import NUMBA_AVAILABLE
+
+# Binary snapshot of the built network; set AVIATION_SNAPSHOT="" to always rebuild
+SNAPSHOT_PATH = os.environ.get('AVIATION_SNAPSHOT', 'aviation_network.avsnap')
+
+# Reachability budgets: objective -> unit, default limit
+REACH_UNITS = {'time': 'hrs', 'cost': '$', 'distance': 'km'}
+REACH_DEFAULTS = {'time': 12.0, 'cost': 800.0, 'distance': 5000.0}
+
+# Hub ranking: exact Brandes up to this many airports, sampled sources above it
+CENTRALITY_EXACT_MAX = 500
+CENTRALITY_SAMPLE = 256
 
 # Page configuration
 st.set_page_config(
@@ -64,16 +84,47 @@ st.markdown('<div class="main-header">✈️ Global Aviation Route Optimizer</di
 st.markdown('<div class="sub-header">Compare Dijkstra, Bellman-Ford & Floyd-Warshall on Real Flight Data</div>',
             unsafe_allow_html=True)
 
-# Initialize session state
-if 'graph' not in st.session_state:
-    with st.spinner("🌍 Loading global aviation data..."):
-        airports_df, routes_df = load_aviation_data()
-        st.session_state.airports_df = airports_df
-        st.session_state.routes_df = routes_df
-        st.session_state.graph = build_network_graph(airports_df, routes_df)
 
-graph = st.session_state.graph
-airports_df = st.session_state.airports_df
+# Shared across all sessions of this process (read-only)
+@st.cache_resource(show_spinner="🌍 Loading global aviation data...")
+def load_shared_network() -> SharedNetwork:
+    airports_df, routes_df = load_aviation_data()
+    source = source_hash(airports_df, routes_df, builder=build_network_graph)
+    graph = load_or_build_network(SNAPSHOT_PATH, lambda: build_network_graph(airports_df, routes_df), source)
+    return SharedNetwork(graph, airports_df, routes_df)
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    return ResultCache()
+
+
+@st.cache_resource(show_spinner="🔎 Indexing airports...")
+def load_search_index(fingerprint: str, _graph) -> AirportSearchIndex:
+    return AirportSearchIndex(_graph)
+
+
+@st.cache_resource(show_spinner="🗺️ Precomputing map layers...")
+def load_lod_layers(fingerprint: str, _graph):
+    return build_lod_layers(_graph)
+
+
+@st.cache_resource(show_spinner="🏙️ Ranking hubs...")
+def load_hub_centrality(fingerprint: str, weight: str, _graph):
+    # In-process (no worker pool inside the server), sampled on large networks
+    sample = CENTRALITY_SAMPLE if _graph.number_of_nodes() > CENTRALITY_EXACT_MAX else None
+    return compute_centrality(_graph, weight, workers=1, sample=sample)
+
+
+# One trace per script run; stages below are timed as child spans
+request = TRACER.start_trace('request')
+with span('load'):
+    network = load_shared_network()
+    result_cache = get_result_cache()
+    graph = network.graph
+    airports_df = network.airports_df
+    lod_layers = load_lod_layers(network.fingerprint, graph)
+    search_index = load_search_index(network.fingerprint, graph)
 
 # Sidebar
 with st.sidebar:
@@ -85,23 +136,40 @@ with st.sidebar:
     st.metric("Total Routes", stats['total_routes'])
     st.metric("Avg Distance", f"{stats['avg_distance']} km")
 
-    st.divider()
-
-    # Airport selection
-    available_airports = sorted(list(graph.nodes()))
+    with st.expander("🏙️ Hub Centrality"):
+        centrality_weight = st.selectbox("Weight routes by", ['distance', 'time', 'cost'])
+        if st.button("Rank hubs", use_container_width=True):
+            st.session_state.rank_hubs = True
+        if st.session_state.get('rank_hubs'):
+            hubs = load_hub_centrality(network.fingerprint, centrality_weight, graph)
+            st.dataframe(
+                hubs.head(10)[['airport', 'betweenness', 'closeness', 'degree_centrality']],
+                hide_index=True,
+                use_container_width=True
+            )
+            caption = "Betweenness: share of optimal routes through the airport (Brandes)"
+            if graph.number_of_nodes() > CENTRALITY_EXACT_MAX:
+                caption += f", estimated from {CENTRALITY_SAMPLE} sampled origins"
+            st.caption(caption)
 
-    source_airport = st.selectbox(
-        "🛫 Departure Airport",
-        available_airports,
-        index=available_airports.index('JFK') if 'JFK' in available_airports else 0
-    )
+    st.divider()
 
-    destination_airport = st.selectbox(
-        "🛬 Arrival Airport",
-        available_airports,
-        index=available_airports.index('LHR') if 'LHR' in available_airports else (
-            1 if len(available_airports) > 1 else 0)
-    )
+    # Airport selection (indexed search; only the top matches reach the browser)
+    source_query = st.text_input("🛫 Departure Airport", value='JFK',
+                                 placeholder="Code, airport, city or country")
+    source_matches = search_index.search(source_query, SEARCH_LIMIT)
+    source_airport = st.selectbox("Departure matches", source_matches, format_func=search_index.label,
+                                  label_visibility='collapsed')
+    if not source_matches:
+        st.caption("No matching airport")
+
+    destination_query = st.text_input("🛬 Arrival Airport", value='LHR',
+                                      placeholder="Code, airport, city or country")
+    destination_matches = search_index.search(destination_query, SEARCH_LIMIT)
+    destination_airport = st.selectbox("Arrival matches", destination_matches, format_func=search_index.label,
+                                       label_visibility='collapsed')
+    if not destination_matches:
+        st.caption("No matching airport")
 
     st.divider()
 
@@ -120,8 +188,21 @@ with st.sidebar:
 
     st.divider()
 
+    profile_memory = st.checkbox("🧠 Profile memory", value=False,
+                                 help="Track peak allocation per algorithm with tracemalloc (slower)")
+    use_planner = st.checkbox("🧭 Let the planner pick engines", value=False,
+                              help="Answer each objective with the engine the cost model estimates fastest")
+    use_jit = st.checkbox("⚡ JIT-compiled kernels (Numba)", value=False, disabled=not NUMBA_AVAILABLE,
+                          help="Compiled Dijkstra, Bellman-Ford and Floyd-Warshall loops; identical routes"
+                          if NUMBA_AVAILABLE else "Install numba to enable")
+    backend = 'numba' if use_jit else 'python'
+
     run_button = st.button("🚀 Compare All Algorithms", type="primary", use_container_width=True)
 
+    cache_stats = result_cache.stats()
+    st.caption(f"Shared result cache: {cache_stats['entries']} routes, "
+               f"{cache_stats['hit_rate']:.0%} hit rate")
+
     if st.button("🔄 Clear Results", use_container_width=True):
         if 'results' in st.session_state:
             del st.session_state.results
@@ -131,6 +212,21 @@ with st.sidebar:
             del st.session_state.last_dest
         st.rerun()
 
+    with st.expander("🕒 Reachable Within Budget"):
+        reach_objective = st.selectbox("Budget", list(REACH_UNITS), format_func=lambda o: f"{o} ({REACH_UNITS[o]})")
+        reach_budget = st.number_input(f"Limit ({REACH_UNITS[reach_objective]})", min_value=0.0,
+                                       value=REACH_DEFAULTS[reach_objective], step=REACH_DEFAULTS[reach_objective] / 4)
+        reach_hops = st.number_input("Max flights (0 = no limit)", min_value=0, max_value=10, value=0)
+        if st.button("Find reachable airports", use_container_width=True, disabled=not source_airport):
+            with span('reachability', source=source_airport, objective=reach_objective, budget=reach_budget):
+                st.session_state.reachability = {
+                    'source': source_airport,
+                    'objective': reach_objective,
+                    'budget': reach_budget,
+                    'airports': reachable_within(graph, source_airport, reach_budget, reach_objective,
+                                                 int(reach_hops) or None)
+                }
+
     st.divider()
 
     st.markdown("### 📚 Algorithm Info")
@@ -147,12 +243,25 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
+    # Filled at the end of the run so it includes this request
+    latency_panel = st.container()
+
 # Main content
-if run_button and source_airport != destination_airport:
-    with st.spinner("🔍 Running all algorithms..."):
-        st.session_state.results = compare_all_algorithms(graph, source_airport, destination_airport)
-        st.session_state.last_source = source_airport
-        st.session_state.last_dest = destination_airport
+if run_button and source_airport and destination_airport and source_airport != destination_airport:
+    with span('compare', source=source_airport, destination=destination_airport,
+              profile_memory=profile_memory, use_planner=use_planner, backend=backend):
+        with st.spinner("🔍 Running all algorithms..."):
+            if profile_memory:
+                # Profiling measures a fresh run, so it bypasses the shared cache
+                st.session_state.results = compare_all_algorithms(graph, source_airport, destination_airport,
+                                                                  profile_memory=True, use_planner=use_planner,
+                                                                  backend=backend)
+            else:
+                st.session_state.results = cached_compare_all_algorithms(network, result_cache,
+                                                                         source_airport, destination_airport,
+                                                                         use_planner=use_planner, backend=backend)
+            st.session_state.last_source = source_airport
+            st.session_state.last_dest = destination_airport
 
 # Check if we have results to display
 if 'results' in st.session_state and st.session_state.results:
@@ -160,80 +269,78 @@ if 'results' in st.session_state and st.session_state.results:
     source_airport = st.session_state.last_source
     destination_airport = st.session_state.last_dest
 
+    # Plans the cost model refused to run (estimated too slow for this network)
+    for algo_name, result in results.items():
+        if result and result.details.get('refused'):
+            st.warning(f"**{algo_name}** skipped by the query planner\n\n{result.details['plan']}")
+
     # Create tabs
     tab1, tab2, tab3 = st.tabs(["🗺️ Interactive Map", "📊 Comparison Dashboard", "🎓 Academic Analysis"])
 
     with tab1:
         st.subheader("Global Route Visualization")
 
-        # Create base map
-        src_node = graph.nodes[source_airport]
-        dst_node = graph.nodes[destination_airport]
-
-        center_lat = (src_node['lat'] + dst_node['lat']) / 2
-        center_lon = (src_node['lon'] + dst_node['lon']) / 2
-
-        m = folium.Map(
-            location=[center_lat, center_lon],
-            zoom_start=3,
-            tiles='CartoDB positron'
-        )
-
-        # Add all routes (faded)
-        for u, v, data in graph.edges(data=True):
-            u_node = graph.nodes[u]
-            v_node = graph.nodes[v]
-
-            folium.PolyLine(
-                locations=[[u_node['lat'], u_node['lon']], [v_node['lat'], v_node['lon']]],
-                color='gray',
-                weight=1,
-                opacity=0.2
-            ).add_to(m)
-
-        # Color mapping
-        colors = {
-            'Dijkstra': '#EF4444',
-            'Bellman-Ford': '#10B981',
-            'Floyd-Warshall': '#3B82F6'
-        }
-
-        # Add algorithm-specific routes
-        for algo_name, result in results.items():
-            if result and result.path and len(result.path) > 1:
-                path_coords = []
-                for airport in result.path:
-                    node = graph.nodes[airport]
-                    path_coords.append([node['lat'], node['lon']])
-
-                folium.PolyLine(
-                    locations=path_coords,
-                    color=colors[algo_name],
-                    weight=4,
-                    opacity=0.8,
-                    popup=f"{algo_name}: {result.details['optimization_target']}"
-                ).add_to(m)
+        with span('map_build') as map_span:
+            # Create base map
+            src_node = graph.nodes[source_airport]
+            dst_node = graph.nodes[destination_airport]
 
-        # Add airport markers
-        for airport in graph.nodes():
-            node = graph.nodes[airport]
+            center_lat = (src_node['lat'] + dst_node['lat']) / 2
+            center_lon = (src_node['lon'] + dst_node['lon']) / 2
 
-            if airport == source_airport:
-                icon = folium.Icon(color='green', icon='plane-departure', prefix='fa')
-            elif airport == destination_airport:
-                icon = folium.Icon(color='red', icon='plane-arrival', prefix='fa')
-            else:
-                icon = folium.Icon(color='lightgray', icon='plane', prefix='fa', icon_size=(10, 10))
+            m = folium.Map(
+                location=[center_lat, center_lon],
+                zoom_start=3,
+                tiles='CartoDB positron'
+            )
+
+            # Network context (level-of-detail layers, switched by zoom)
+            payload = add_lod_layers(m, lod_layers, skip=[source_airport, destination_airport])
+
+            # Color mapping
+            colors = {
+                'Dijkstra': '#EF4444',
+                'Bellman-Ford': '#10B981',
+                'Floyd-Warshall': '#3B82F6'
+            }
 
-            folium.Marker(
-                location=[node['lat'], node['lon']],
-                popup=f"<b>{node['name']}</b><br>{node['city']}, {node['country']}",
-                tooltip=airport,
-                icon=icon
-            ).add_to(m)
+            # Add algorithm-specific routes
+            for algo_name, result in results.items():
+                if result and result.path and len(result.path) > 1:
+                    path_coords = []
+                    for airport in result.path:
+                        node = graph.nodes[airport]
+                        path_coords.append([node['lat'], node['lon']])
+
+                    folium.PolyLine(
+                        locations=path_coords,
+                        color=colors[algo_name],
+                        weight=4,
+                        opacity=0.8,
+                        popup=f"{algo_name}: {result.details['optimization_target']}"
+                    ).add_to(m)
+
+            # Source and destination markers
+            for airport in (source_airport, destination_airport):
+                node = graph.nodes[airport]
+
+                if airport == source_airport:
+                    icon = folium.Icon(color='green', icon='plane-departure', prefix='fa')
+                else:
+                    icon = folium.Icon(color='red', icon='plane-arrival', prefix='fa')
+
+                folium.Marker(
+                    location=[node['lat'], node['lon']],
+                    popup=f"<b>{node['name']}</b><br>{node['city']}, {node['country']}",
+                    tooltip=airport,
+                    icon=icon
+                ).add_to(m)
+
+            map_span.attributes['payload'] = payload
 
         # Display map
-        st_folium(m, width=1400, height=600)
+        with span('map_serialize'):
+            st_folium(m, width=1400, height=600)
 
         # Legend
         st.markdown("### 🎨 Route Legend")
@@ -256,90 +363,114 @@ if 'results' in st.session_state and st.session_state.results:
         st.subheader("📊 Detailed Performance Comparison")
 
         # Create comparison table
-        comparison_data = []
-
-        for algo_name, result in results.items():
-            if result and result.path:
-                comparison_data.append({
-                    'Algorithm': algo_name,
-                    'Target': result.details['optimization_target'],
-                    'Distance (km)': result.details['total_distance'],
-                    'Time (hrs)': result.details['total_time'],
-                    'Cost ($)': result.details['total_cost'],
-                    'Hops': result.details['hops'],
-                    'Execution (ms)': round(result.execution_time * 1000, 4)
-                })
-
-        df = pd.DataFrame(comparison_data)
+        with span('metrics'):
+            comparison_data = []
 
-        # Display styled table
-        st.dataframe(
-            df.style.background_gradient(subset=['Distance (km)', 'Time (hrs)', 'Cost ($)'], cmap='RdYlGn_r')
-            .format({
-                'Distance (km)': '{:.1f}',
-                'Time (hrs)': '{:.2f}',
-                'Cost ($)': '{:.2f}',
-                'Execution (ms)': '{:.4f}'
-            }),
-            use_container_width=True
-        )
-
-        # Visual comparisons
-        col1, col2 = st.columns(2)
+            for algo_name, result in results.items():
+                if result and result.path:
+                    row = {
+                        'Algorithm': algo_name,
+                        'Target': result.details['optimization_target'],
+                        'Distance (km)': result.details['total_distance'],
+                        'Time (hrs)': result.details['total_time'],
+                        'Cost ($)': result.details['total_cost'],
+                        'Hops': result.details['hops'],
+                        'Execution (ms)': round(result.execution_time * 1000, 4),
+                        'Cached': result.details.get('cached', False)
+                    }
+                    if 'peak_memory_kb' in result.details:
+                        row['Peak Memory (KB)'] = result.details['peak_memory_kb']
+                        row['Blocks Retained'] = result.details['blocks_retained']
+                        row['Retained (KB)'] = result.details['retained_kb']
+                    comparison_data.append(row)
+
+            df = pd.DataFrame(comparison_data)
 
-        with col1:
-            # Distance comparison
-            fig1 = px.bar(
-                df, x='Algorithm', y='Distance (km)',
-                title='Distance Comparison',
-                color='Algorithm',
-                color_discrete_map={
-                    'Dijkstra': '#EF4444',
-                    'Bellman-Ford': '#10B981',
-                    'Floyd-Warshall': '#3B82F6'
-                }
-            )
-            st.plotly_chart(fig1, use_container_width=True)
-
-            # Cost comparison
-            fig3 = px.bar(
-                df, x='Algorithm', y='Cost ($)',
-                title='Cost Comparison',
-                color='Algorithm',
-                color_discrete_map={
-                    'Dijkstra': '#EF4444',
-                    'Bellman-Ford': '#10B981',
-                    'Floyd-Warshall': '#3B82F6'
-                }
+        # Display styled table
+        with span('table'):
+            st.dataframe(
+                df.style.background_gradient(subset=['Distance (km)', 'Time (hrs)', 'Cost ($)'], cmap='RdYlGn_r')
+                .format({
+                    'Distance (km)': '{:.1f}',
+                    'Time (hrs)': '{:.2f}',
+                    'Cost ($)': '{:.2f}',
+                    'Execution (ms)': '{:.4f}'
+                }),
+                use_container_width=True
             )
-            st.plotly_chart(fig3, use_container_width=True)
 
-        with col2:
-            # Time comparison
-            fig2 = px.bar(
-                df, x='Algorithm', y='Time (hrs)',
-                title='Travel Time Comparison',
-                color='Algorithm',
-                color_discrete_map={
-                    'Dijkstra': '#EF4444',
-                    'Bellman-Ford': '#10B981',
-                    'Floyd-Warshall': '#3B82F6'
-                }
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-
-            # Execution time
-            fig4 = px.bar(
-                df, x='Algorithm', y='Execution (ms)',
-                title='Algorithm Execution Time',
-                color='Algorithm',
-                color_discrete_map={
-                    'Dijkstra': '#EF4444',
-                    'Bellman-Ford': '#10B981',
-                    'Floyd-Warshall': '#3B82F6'
-                }
-            )
-            st.plotly_chart(fig4, use_container_width=True)
+        # Visual comparisons
+        with span('charts'):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                # Distance comparison
+                fig1 = px.bar(
+                    df, x='Algorithm', y='Distance (km)',
+                    title='Distance Comparison',
+                    color='Algorithm',
+                    color_discrete_map={
+                        'Dijkstra': '#EF4444',
+                        'Bellman-Ford': '#10B981',
+                        'Floyd-Warshall': '#3B82F6'
+                    }
+                )
+                st.plotly_chart(fig1, use_container_width=True)
+
+                # Cost comparison
+                fig3 = px.bar(
+                    df, x='Algorithm', y='Cost ($)',
+                    title='Cost Comparison',
+                    color='Algorithm',
+                    color_discrete_map={
+                        'Dijkstra': '#EF4444',
+                        'Bellman-Ford': '#10B981',
+                        'Floyd-Warshall': '#3B82F6'
+                    }
+                )
+                st.plotly_chart(fig3, use_container_width=True)
+
+            with col2:
+                # Time comparison
+                fig2 = px.bar(
+                    df, x='Algorithm', y='Time (hrs)',
+                    title='Travel Time Comparison',
+                    color='Algorithm',
+                    color_discrete_map={
+                        'Dijkstra': '#EF4444',
+                        'Bellman-Ford': '#10B981',
+                        'Floyd-Warshall': '#3B82F6'
+                    }
+                )
+                st.plotly_chart(fig2, use_container_width=True)
+
+                # Execution time
+                fig4 = px.bar(
+                    df, x='Algorithm', y='Execution (ms)',
+                    title='Algorithm Execution Time',
+                    color='Algorithm',
+                    color_discrete_map={
+                        'Dijkstra': '#EF4444',
+                        'Bellman-Ford': '#10B981',
+                        'Floyd-Warshall': '#3B82F6'
+                    }
+                )
+                st.plotly_chart(fig4, use_container_width=True)
+
+            if 'Peak Memory (KB)' in df.columns:
+                # Peak allocation (tracemalloc)
+                fig_mem = px.bar(
+                    df, x='Algorithm', y='Peak Memory (KB)',
+                    title='Peak Memory Allocation',
+                    color='Algorithm',
+                    hover_data=['Blocks Retained', 'Retained (KB)'],
+                    color_discrete_map={
+                        'Dijkstra': '#EF4444',
+                        'Bellman-Ford': '#10B981',
+                        'Floyd-Warshall': '#3B82F6'
+                    }
+                )
+                st.plotly_chart(fig_mem, use_container_width=True)
 
         # Winner boxes
         st.markdown("### 🏆 Performance Winners")
@@ -361,6 +492,36 @@ if 'results' in st.session_state and st.session_state.results:
             fastest_algo = df.loc[df['Execution (ms)'].idxmin()]
             st.error(f"**Fastest Algorithm**\n\n{fastest_algo['Algorithm']}\n\n{fastest_algo['Execution (ms)']} ms")
 
+        # Price versus number of stops (hop-limited Bellman-Ford, one call)
+        with span('price_vs_stops'):
+            st.markdown("### 💸 Price vs Stops")
+            by_stops, _ = result_cache.get_or_compute(
+                (network.fingerprint, source_airport, destination_airport, 'Price vs Stops (3)'),
+                lambda: cheapest_routes_by_stops(graph, source_airport, destination_airport, max_stops=3)
+            )
+
+            if by_stops:
+                stops_df = pd.DataFrame([
+                    {
+                        'Max Stops': stops,
+                        'Cost ($)': result.details['total_cost'],
+                        'Time (hrs)': result.details['total_time'],
+                        'Route': ' → '.join(result.path)
+                    }
+                    for stops, result in by_stops.items()
+                ])
+
+                fig5 = px.line(
+                    stops_df, x='Max Stops', y='Cost ($)',
+                    title='Cheapest Fare by Maximum Stops',
+                    markers=True,
+                    hover_data=['Route', 'Time (hrs)']
+                )
+                fig5.update_xaxes(dtick=1)
+                st.plotly_chart(fig5, use_container_width=True)
+            else:
+                st.caption("No route within 3 stops")
+
     with tab3:
         st.subheader("🎓 Academic Analysis: Algorithm Paradigms")
 
@@ -375,6 +536,8 @@ if 'results' in st.session_state and st.session_state.results:
 
                     with st.expander(f"**{algo_name}** - {details['optimization_target']}", expanded=True):
                         st.markdown(f"**Paradigm:** {details['algorithm_type']}")
+                        if details.get('backend') == 'numba':
+                            st.caption("⚡ Ran as a Numba JIT kernel")
 
                         if algo_name == 'Dijkstra':
                             st.markdown("""
@@ -404,6 +567,10 @@ if 'results' in st.session_state and st.session_state.results:
                         st.markdown(
                             f"**Route:** {' → '.join(result.path[:3])}{'...' if len(result.path) > 3 else ''} → {result.path[-1]}")
 
+                        if 'plan' in details:
+                            st.caption("Query plan")
+                            st.code(details['plan'], language=None)
+
         with col2:
             st.markdown("### Why Different Results?")
 
@@ -430,7 +597,7 @@ if 'results' in st.session_state and st.session_state.results:
             """)
 
 elif run_button:
-    st.warning("⚠️ Please select different airports for source and destination")
+    st.warning("⚠️ Please select two different airports for source and destination")
 elif 'results' not in st.session_state:
     # Initial state - show network overview
     st.info("👆 Select airports from the sidebar and click 'Compare All Algorithms' to begin")
@@ -438,17 +605,51 @@ elif 'results' not in st.session_state:
     # Show sample map
     st.subheader("🌍 Global Aviation Network Overview")
 
-    m = folium.Map(location=[20, 0], zoom_start=2, tiles='CartoDB positron')
-
-    for airport in list(graph.nodes())[:50]:  # Show first 50 airports
-        node = graph.nodes[airport]
-        folium.CircleMarker(
-            location=[node['lat'], node['lon']],
-            radius=3,
-            color='blue',
-            fill=True,
-            popup=f"{node['name']}<br>{node['city']}, {node['country']}",
-            tooltip=airport
-        ).add_to(m)
-
-    st_folium(m, width=1400, height=500)
\ No newline at end of file
+    with span('map_build') as map_span:
+        m = folium.Map(location=[20, 0], zoom_start=2, tiles='CartoDB positron')
+
+        # Whole network: clustered regions when zoomed out, busiest airports when zoomed in
+        map_span.attributes['payload'] = add_lod_layers(m, lod_layers)
+
+    with span('map_serialize'):
+        st_folium(m, width=1400, height=500)
+
+# Reachability (isochrone) from the departure airport, one map layer
+if 'reachability' in st.session_state:
+    reach = st.session_state.reachability
+    reachable = reach['airports']
+    unit = REACH_UNITS[reach['objective']]
+    st.subheader(f"🕒 {len(reachable):,} airports reachable from {reach['source']} "
+                 f"within {reach['budget']:g} {unit}")
+
+    if not reachable.empty:
+        with span('map_build'):
+            origin = graph.nodes[reach['source']]
+            m = folium.Map(location=[origin['lat'], origin['lon']], zoom_start=3, tiles='CartoDB positron')
+            isochrone_layer(graph, reach['source'], reachable.head(MAX_MARKERS), reach['budget'],
+                            reach['objective']).add_to(m)
+        with span('map_serialize'):
+            st_folium(m, width=1400, height=500, key='isochrone')
+        if len(reachable) > MAX_MARKERS:
+            st.caption(f"Map shows the {MAX_MARKERS:,} closest airports")
+
+        st.dataframe(reachable[['airport', 'name', 'country', reach['objective'], 'hops', 'route']],
+                     hide_index=True, use_container_width=True)
+
+TRACER.finish(request)
+
+with latency_panel:
+    with st.expander("⏱️ Request Latency"):
+        latency = pd.DataFrame(TRACER.percentiles())
+        if not latency.empty:
+            st.dataframe(latency[['stage', 'count', 'p50_ms', 'p95_ms', 'p99_ms']],
+                         hide_index=True, use_container_width=True)
+            stage = st.selectbox("Latency histogram", latency['stage'],
+                                 index=int(latency['stage'].tolist().index('request')))
+            counts, edges = TRACER.histogram(stage)
+            fig_latency = px.bar(x=edges[:-1].round(1), y=counts, labels={'x': 'ms', 'y': 'requests'})
+            fig_latency.update_layout(height=220, margin=dict(l=0, r=0, t=10, b=0))
+            st.plotly_chart(fig_latency, use_container_width=True)
+        st.download_button("Export traces (JSONL)", TRACER.to_jsonl(),
+                           file_name='aviation_traces.jsonl', mime='application/jsonl')
+        st.caption(f"Rolling window of the last {TRACER.window} runs per stage")
@@ -0,0 +1,281 @@
+"""
+Level-of-detail map layers
+
+Drawing every airport and route as its own Leaflet object does not scale
+past a few thousand airports. Instead the network is precomputed into one
+layer per zoom band:
+
+    coarse bands  airports binned into a lat/lon grid whose cell halves with
+                  every zoom level; one circle per cell and one line per
+                  connected cell pair (route counts aggregated)
+    detail band   the busiest airports as individual markers, clustered in
+                  the browser (MarkerCluster), plus their busiest routes
+
+Every layer is capped (MAX_MARKERS markers, MAX_EDGES lines), so the
+payload sent to the browser is bounded however large the network is.
+ZoomBands shows only the layer whose band contains the current zoom.
+
+    python map_layers.py --synthetic 20000
+"""
+import argparse
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+from data_loader import build_network_graph, generate_synthetic_network, load_aviation_data
+from graph_arrays import compile_graph
+
+# (min_zoom, max_zoom) per layer; the last band draws individual airports
+LOD_BANDS = ((0, 2), (3, 4), (5, 6), (7, 18))
+# Grid cell at zoom 0, halved per zoom level (45° -> 5.6° at zoom 3 -> 1.4° at zoom 5)
+CELL_DEGREES = 45.0
+# Per-layer payload caps
+MAX_MARKERS = 1000
+MAX_EDGES = 1500
+
+
+class NetworkPoints:
+    """Airport coordinates, route counts and edge endpoints as arrays"""
+
+    def __init__(self, graph):
+        cg = compile_graph(graph)
+        self.codes = np.array(cg.nodes, dtype=object)
+        self.names = np.array([graph.nodes[code].get('name', code) for code in cg.nodes], dtype=object)
+        self.lat = np.array([graph.nodes[code]['lat'] for code in cg.nodes], dtype=np.float64)
+        self.lon = np.array([graph.nodes[code]['lon'] for code in cg.nodes], dtype=np.float64)
+        self.src = cg.sources
+        self.dst = cg.indices
+        self.degree = (np.bincount(self.src, minlength=cg.n) + np.bincount(self.dst, minlength=cg.n))
+
+
+class LodLayer:
+    """
+    Markers and lines drawn for one zoom band
+    markers: lat, lon, airports, label (airport code or busiest airport of a cell), popup
+    edges:   lat1, lon1, lat2, lon2, routes
+    """
+
+    def __init__(self, min_zoom: int, max_zoom: int, cell_degrees: Optional[float],
+                 markers: pd.DataFrame, edges: pd.DataFrame):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.cell_degrees = cell_degrees
+        self.markers = markers
+        self.edges = edges
+
+    @property
+    def payload(self) -> int:
+        return len(self.markers) + len(self.edges)
+
+    def describe(self) -> str:
+        detail = f"{self.cell_degrees:.2f}° cells" if self.cell_degrees else "airports"
+        return (f"zoom {self.min_zoom}-{self.max_zoom}: {len(self.markers):,} markers ({detail}), "
+                f"{len(self.edges):,} lines")
+
+
+def grid_cells(lat: np.ndarray, lon: np.ndarray, cell_degrees: float) -> np.ndarray:
+    """Row-major lat/lon grid cell id per point"""
+    cols = int(math.ceil(360 / cell_degrees))
+    rows = int(math.ceil(180 / cell_degrees))
+    ix = np.clip(((lon + 180) // cell_degrees).astype(np.int64), 0, cols - 1)
+    iy = np.clip(((lat + 90) // cell_degrees).astype(np.int64), 0, rows - 1)
+    return iy * cols + ix
+
+
+def _top(values: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the limit largest values, largest first"""
+    order = np.argsort(-values, kind='stable')
+    return order[:limit]
+
+
+def _pair_edges(points: NetworkPoints, group: np.ndarray, keep: np.ndarray, max_edges: int):
+    """
+    Undirected (group a, group b) pairs with their directed route counts,
+    restricted to kept groups; groups are numbered 0..len(keep)-1
+    """
+    a, b = group[points.src], group[points.dst]
+    mask = (a != b) & keep[a] & keep[b]
+    lo, hi = np.minimum(a[mask], b[mask]), np.maximum(a[mask], b[mask])
+    pairs, counts = np.unique(lo * len(keep) + hi, return_counts=True)
+    top = _top(counts, max_edges)
+    return pairs[top] // len(keep), pairs[top] % len(keep), counts[top]
+
+
+def aggregate_layer(points: NetworkPoints, cell_degrees: float, max_markers: int = MAX_MARKERS,
+                    max_edges: int = MAX_EDGES) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """One marker per occupied grid cell and one line per connected cell pair"""
+    _, cluster = np.unique(grid_cells(points.lat, points.lon, cell_degrees), return_inverse=True)
+    k = int(cluster.max()) + 1
+    airports = np.bincount(cluster, minlength=k)
+    lat = np.bincount(cluster, points.lat, k) / airports
+    lon = np.bincount(cluster, points.lon, k) / airports
+    routes = np.bincount(cluster, points.degree, k)
+
+    # Busiest airport of each cell labels the marker
+    order = np.lexsort((-points.degree, cluster))
+    busiest = order[np.r_[0, np.flatnonzero(np.diff(cluster[order])) + 1]]
+
+    kept = _top(routes, max_markers)
+    keep = np.zeros(k, dtype=bool)
+    keep[kept] = True
+    markers = pd.DataFrame({
+        'lat': lat[kept],
+        'lon': lon[kept],
+        'airports': airports[kept],
+        'label': points.codes[busiest[kept]],
+        'popup': [f"{count:,} airports, busiest {points.names[busiest[c]]}"
+                  for c, count in zip(kept, airports[kept])],
+    })
+
+    a, b, counts = _pair_edges(points, cluster, keep, max_edges)
+    edges = pd.DataFrame({'lat1': lat[a], 'lon1': lon[a], 'lat2': lat[b], 'lon2': lon[b], 'routes': counts})
+    return markers, edges
+
+
+def detail_layer(points: NetworkPoints, max_markers: int = MAX_MARKERS,
+                 max_edges: int = MAX_EDGES) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """The max_markers busiest airports and the busiest routes between them"""
+    kept = _top(points.degree, max_markers)
+    keep = np.zeros(len(points.codes), dtype=bool)
+    keep[kept] = True
+    markers = pd.DataFrame({
+        'lat': points.lat[kept],
+        'lon': points.lon[kept],
+        'airports': 1,
+        'label': points.codes[kept],
+        'popup': points.names[kept],
+    })
+
+    a, b, counts = _pair_edges(points, np.arange(len(points.codes)), keep, max_edges)
+    edges = pd.DataFrame({'lat1': points.lat[a], 'lon1': points.lon[a],
+                          'lat2': points.lat[b], 'lon2': points.lon[b], 'routes': counts})
+    return markers, edges
+
+
+def build_lod_layers(graph, bands: Sequence[Tuple[int, int]] = LOD_BANDS, max_markers: int = MAX_MARKERS,
+                     max_edges: int = MAX_EDGES) -> List[LodLayer]:
+    """Precompute one capped layer per zoom band (the last band is the airport detail layer)"""
+    points = NetworkPoints(graph)
+    layers = []
+    for i, (min_zoom, max_zoom) in enumerate(bands):
+        if len(points.codes) == 0:
+            markers, edges, cell_degrees = pd.DataFrame(), pd.DataFrame(), None
+        elif i == len(bands) - 1:
+            cell_degrees = None
+            markers, edges = detail_layer(points, max_markers, max_edges)
+        else:
+            cell_degrees = CELL_DEGREES / 2 ** min_zoom
+            markers, edges = aggregate_layer(points, cell_degrees, max_markers, max_edges)
+        layers.append(LodLayer(min_zoom, max_zoom, cell_degrees, markers, edges))
+    return layers
+
+
+class ZoomBands(MacroElement):
+    """Shows each layer only while the map zoom is inside its band"""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var bands = [
+                {%- for min_zoom, max_zoom, layer in this.bands %}
+                [{{ min_zoom }}, {{ max_zoom }}, {{ layer.get_name() }}],
+                {%- endfor %}
+            ];
+            function update() {
+                var zoom = map.getZoom();
+                bands.forEach(function(band) {
+                    var visible = zoom >= band[0] && zoom <= band[1];
+                    if (visible && !map.hasLayer(band[2])) { map.addLayer(band[2]); }
+                    if (!visible && map.hasLayer(band[2])) { map.removeLayer(band[2]); }
+                });
+            }
+            map.on('zoomend', update);
+            update();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, bands):
+        super().__init__()
+        self._name = 'ZoomBands'
+        self.bands = bands
+
+
+def add_lod_layers(m: folium.Map, layers: List[LodLayer], skip: Sequence[str] = ()) -> int:
+    """
+    Add the precomputed layers to m and switch them by zoom
+    Airports in skip (e.g. a highlighted source and destination) are left
+    out of the detail layer. Returns the number of markers and lines added.
+    """
+    skip = set(skip)
+    bands = []
+    payload = 0
+    for layer in layers:
+        group = folium.FeatureGroup(name=f"Zoom {layer.min_zoom}-{layer.max_zoom}", control=False)
+
+        for edge in layer.edges.itertuples(index=False):
+            folium.PolyLine(
+                locations=[[edge.lat1, edge.lon1], [edge.lat2, edge.lon2]],
+                color='gray',
+                weight=min(1 + math.log2(edge.routes), 6),
+                opacity=0.25,
+                tooltip=f"{edge.routes:,} routes"
+            ).add_to(group)
+
+        if layer.cell_degrees is None:
+            target = MarkerCluster().add_to(group)
+        else:
+            target = group
+        for marker in layer.markers.itertuples(index=False):
+            if layer.cell_degrees is None and marker.label in skip:
+                continue
+            folium.CircleMarker(
+                location=[marker.lat, marker.lon],
+                radius=3 + 2 * math.log2(marker.airports),
+                color='#1E3A8A',
+                fill=True,
+                popup=marker.popup,
+                tooltip=marker.label if marker.airports == 1 else f"{marker.airports:,} airports ({marker.label})"
+            ).add_to(target)
+
+        group.add_to(m)
+        bands.append((layer.min_zoom, layer.max_zoom, group))
+        payload += layer.payload
+
+    ZoomBands(bands).add_to(m)
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute level-of-detail map layers")
+    parser.add_argument('--synthetic', type=int, help="layers for a synthetic network of this many airports")
+    parser.add_argument('--max-markers', type=int, default=MAX_MARKERS)
+    parser.add_argument('--max-edges', type=int, default=MAX_EDGES)
+    parser.add_argument('--html', help="also write a map with the layers to this file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        graph = build_network_graph(*generate_synthetic_network(args.synthetic))
+    else:
+        graph = build_network_graph(*load_aviation_data())
+
+    layers = build_lod_layers(graph, max_markers=args.max_markers, max_edges=args.max_edges)
+    print(f"{graph.number_of_nodes():,} airports, {graph.number_of_edges():,} routes")
+    for layer in layers:
+        print(layer.describe())
+
+    if args.html:
+        m = folium.Map(location=[20, 0], zoom_start=2, tiles='CartoDB positron')
+        add_lod_layers(m, layers)
+        m.save(args.html)
+
+
+if __name__ == '__main__':
+    main()
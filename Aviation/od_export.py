@@ -0,0 +1,191 @@
+"""
+Chunked origin-destination (OD) matrix export
+
+For every airport pair the export holds the distance-, time- and
+cost-optimal totals plus the hop count of each optimal route. Each origin
+gets one single-source tree per objective (all-pairs once per objective,
+instead of rerunning compare_all_algorithms pair by pair). Rows are
+streamed out one chunk of origins at a time, so memory stays bounded by
+chunk_size x V regardless of network size.
+
+    python od_export.py --output od_matrix.csv --chunk-size 64
+    python od_export.py --output od_parts --format npz   # compressed binary parts
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_loader import build_network_graph, generate_synthetic_network, load_aviation_data
+from graph_arrays import compile_graph, graph_fingerprint, shortest_path_tree
+from graph_snapshot import load_snapshot
+
+# column prefix -> edge attribute optimised (Bellman-Ford's objective for cost)
+OBJECTIVES = {
+    'distance': 'distance',
+    'time': 'time',
+    'cost': 'adjusted_cost',
+}
+
+
+def _source_rows(cg, source: int, objectives: Dict[str, str]) -> Dict[str, np.ndarray]:
+    """Optimal totals and hop counts from one origin to every node"""
+    columns = {}
+    for name, attribute in objectives.items():
+        dist, pred_edge = shortest_path_tree(cg, attribute, source)
+        dist = np.array(dist)
+
+        # Parents settle before children, so one pass in distance order fills the hops
+        hops = np.full(cg.n, -1, dtype=np.int32)
+        hops[source] = 0
+        for v in np.argsort(dist, kind='stable'):
+            e = pred_edge[v]
+            if e != -1:
+                hops[v] = hops[cg.sources[e]] + 1
+
+        columns[f"{name}_total"] = dist
+        columns[f"{name}_hops"] = hops
+    return columns
+
+
+def iter_od_chunks(graph, chunk_size: int = 64, objectives: Optional[Dict[str, str]] = None,
+                   start_chunk: int = 0, include_unreachable: bool = False) -> Iterator[pd.DataFrame]:
+    """Yield the OD table as DataFrames of chunk_size origins each"""
+    cg = compile_graph(graph)
+    objectives = objectives or OBJECTIVES
+    nodes = np.array(cg.nodes, dtype=object)
+
+    for chunk_start in range(start_chunk * chunk_size, cg.n, chunk_size):
+        frames = []
+        for source in range(chunk_start, min(chunk_start + chunk_size, cg.n)):
+            columns = _source_rows(cg, source, objectives)
+            keep = np.arange(cg.n) != source
+            if not include_unreachable:
+                for name in objectives:
+                    keep &= np.isfinite(columns[f"{name}_total"])
+
+            frame = {'origin': cg.nodes[source], 'destination': nodes[keep]}
+            frame.update({key: values[keep] for key, values in columns.items()})
+            frames.append(pd.DataFrame(frame))
+
+        yield pd.concat(frames, ignore_index=True)
+
+
+def _load_progress(progress_path: str, fingerprint: str, fmt: str, chunk_size: int) -> Dict:
+    if os.path.exists(progress_path):
+        with open(progress_path) as f:
+            progress = json.load(f)
+        if (progress.get('fingerprint') == fingerprint and progress.get('format') == fmt
+                and progress.get('chunk_size') == chunk_size):
+            return progress
+        print("Existing progress belongs to a different graph or layout; starting over")
+    return {'fingerprint': fingerprint, 'format': fmt, 'chunk_size': chunk_size,
+            'chunks_done': 0, 'rows_written': 0, 'bytes_written': 0}
+
+
+def _save_progress(progress_path: str, progress: Dict):
+    tmp_path = progress_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, progress_path)
+
+
+def export_od_matrix(graph, output_path: str, fmt: str = 'csv', chunk_size: int = 64,
+                     objectives: Optional[Dict[str, str]] = None, resume: bool = True,
+                     include_unreachable: bool = False, verbose: bool = True) -> Dict:
+    """
+    Stream the full OD table to output_path
+    fmt='csv' appends to one CSV file; fmt='npz' writes compressed
+    part-XXXXX.npz files into the output_path directory. Progress is
+    checkpointed after every chunk to <output_path>.progress.json, so an
+    interrupted export resumes at the first unfinished chunk (a partly
+    written CSV tail is truncated first).
+    Returns a summary with rows written, elapsed time and throughput.
+    """
+    if fmt not in ('csv', 'npz'):
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    cg = compile_graph(graph)
+    progress_path = output_path.rstrip('/') + '.progress.json'
+    if not resume and os.path.exists(progress_path):
+        os.remove(progress_path)
+    progress = _load_progress(progress_path, graph_fingerprint(cg), fmt, chunk_size)
+
+    if fmt == 'csv':
+        if progress['chunks_done'] == 0 and os.path.exists(output_path):
+            os.remove(output_path)
+        elif os.path.exists(output_path):
+            with open(output_path, 'r+b') as f:
+                f.truncate(progress['bytes_written'])
+    else:
+        os.makedirs(output_path, exist_ok=True)
+
+    total_chunks = (cg.n + chunk_size - 1) // chunk_size
+    start_time = time.time()
+    rows_this_run = 0
+    chunks_this_run = 0
+
+    chunks = iter_od_chunks(graph, chunk_size, objectives, progress['chunks_done'], include_unreachable)
+    for chunk_idx, df in enumerate(chunks, start=progress['chunks_done']):
+        if fmt == 'csv':
+            df.to_csv(output_path, mode='a', header=(chunk_idx == 0), index=False)
+            progress['bytes_written'] = os.path.getsize(output_path)
+        else:
+            np.savez_compressed(
+                os.path.join(output_path, f"part-{chunk_idx:05d}.npz"),
+                **{column: df[column].to_numpy() if pd.api.types.is_numeric_dtype(df[column])
+                   else df[column].to_numpy(dtype=str) for column in df.columns}
+            )
+
+        rows_this_run += len(df)
+        chunks_this_run += 1
+        progress['chunks_done'] = chunk_idx + 1
+        progress['rows_written'] += len(df)
+        _save_progress(progress_path, progress)
+
+        if verbose:
+            elapsed = time.time() - start_time
+            rate = rows_this_run / elapsed if elapsed > 0 else float('inf')
+            eta = (total_chunks - progress['chunks_done']) * elapsed / chunks_this_run
+            print(f"chunk {progress['chunks_done']}/{total_chunks}  rows {progress['rows_written']:,}  "
+                  f"{rate:,.0f} rows/s  ETA {eta:,.0f} s")
+
+    elapsed = time.time() - start_time
+    return {
+        'rows_written': progress['rows_written'],
+        'rows_this_run': rows_this_run,
+        'chunks': progress['chunks_done'],
+        'elapsed_s': round(elapsed, 2),
+        'rows_per_second': round(rows_this_run / elapsed, 1) if elapsed > 0 else None,
+        'output': output_path
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the all-pairs OD matrix in chunks")
+    parser.add_argument('--output', default='od_matrix.csv')
+    parser.add_argument('--format', choices=['csv', 'npz'], default='csv')
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--snapshot', help="load the network from a graph snapshot file")
+    parser.add_argument('--synthetic', type=int, help="export a synthetic network of this many airports")
+    parser.add_argument('--no-resume', action='store_true')
+    args = parser.parse_args()
+
+    if args.snapshot:
+        graph = load_snapshot(args.snapshot).to_networkx()
+    elif args.synthetic:
+        graph = build_network_graph(*generate_synthetic_network(args.synthetic))
+    else:
+        graph = build_network_graph(*load_aviation_data())
+
+    summary = export_od_matrix(graph, args.output, args.format, args.chunk_size,
+                               resume=not args.no_resume)
+    print(summary)
+
+
+if __name__ == '__main__':
+    main()
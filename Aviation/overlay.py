@@ -0,0 +1,403 @@
+"""
+Multi-level overlay routing
+
+The network is partitioned into nested cells. Level 0 groups airports by a
+node attribute (country) or by recursive coordinate bisection into
+balanced cells; each higher level merges about FANOUT neighbouring cells
+of the level below (bisection over cell centroids). An airport is a
+level-l boundary airport when it has a route to or from another level-l
+cell.
+
+Customisation computes, per level, cell and objective, the shortest
+distance inside the cell between every pair of its boundary airports (the
+cell's clique). Level 0 cliques search the original routes of the cell;
+level l cliques search the level l-1 cliques plus the routes between
+level l-1 cells inside it.
+
+A query from s to t settles each airport u on the highest level whose
+cell of u contains neither s nor t, using that level's clique of u and
+the routes leaving the cell. The cells of s and t themselves are searched
+over their original routes. Shortcuts on the result are unpacked level by
+level with searches inside their cells.
+
+Weights are read from the compiled graph. After editing edge weights in
+place (and mark_modified), refresh() re-customises only the cells that
+contain a changed route, bottom-up; a route between two top-level cells
+is read live by the query and re-customises nothing.
+
+    python overlay.py --partition country
+    python overlay.py --synthetic 20000 --partition balanced --cell-size 64 --levels 3
+"""
+import argparse
+import heapq
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from aviation_algorithms import PathfindingResult, route_totals
+from data_loader import build_network_graph, generate_synthetic_network, load_aviation_data
+from graph_arrays import CompiledGraph, compile_graph, shortest_path_tree
+from od_export import OBJECTIVES
+
+DEFAULT_CELL_SIZE = 64
+DEFAULT_LEVELS = 2
+# Level l cells merged into one level l + 1 cell
+FANOUT = 8
+
+
+def partition_by_attribute(graph, cg: CompiledGraph, attribute: str = 'country') -> List[int]:
+    """Cell id per node index: one cell per distinct value of a node attribute"""
+    cells = {}
+    return [cells.setdefault(graph.nodes[node].get(attribute), len(cells)) for node in cg.nodes]
+
+
+def _bisect(lat: np.ndarray, lon: np.ndarray, sizes: np.ndarray, limit: float) -> List[int]:
+    """
+    Group id per point by recursive coordinate bisection: split at the
+    (size-weighted) median of the wider lat/lon extent until a group's
+    total size is at most limit
+    """
+    group_of = [0] * len(lat)
+    stack = [np.arange(len(lat))]
+    group = 0
+    while stack:
+        members = stack.pop()
+        if len(members) <= 1 or sizes[members].sum() <= limit:
+            for i in members:
+                group_of[i] = group
+            group += 1
+            continue
+        axis = lat if np.ptp(lat[members]) > np.ptp(lon[members]) else lon
+        members = members[np.argsort(axis[members], kind='stable')]
+        cumulative = np.cumsum(sizes[members])
+        mid = int(np.clip(np.searchsorted(cumulative, cumulative[-1] / 2), 1, len(members) - 1))
+        stack.append(members[:mid])
+        stack.append(members[mid:])
+    return group_of
+
+
+def _coordinates(graph, cg: CompiledGraph) -> Tuple[np.ndarray, np.ndarray]:
+    lat = np.array([graph.nodes[node]['lat'] for node in cg.nodes], dtype=np.float64)
+    lon = np.array([graph.nodes[node]['lon'] for node in cg.nodes], dtype=np.float64)
+    return lat, lon
+
+
+def balanced_partition(graph, cg: CompiledGraph, cell_size: int = DEFAULT_CELL_SIZE) -> List[int]:
+    """Cell id per node index: nearby airports in cells of at most cell_size"""
+    lat, lon = _coordinates(graph, cg)
+    return _bisect(lat, lon, np.ones(cg.n), cell_size)
+
+
+def merge_cells(graph, cg: CompiledGraph, cell_of: List[int], fanout: int = FANOUT) -> List[int]:
+    """Next-level cell id per node index: about fanout neighbouring cells merged per parent"""
+    lat, lon = _coordinates(graph, cg)
+    cells = np.asarray(cell_of)
+    k = int(cells.max()) + 1 if len(cells) else 0
+    sizes = np.bincount(cells, minlength=k).astype(np.float64)
+    centroid_lat = np.bincount(cells, lat, k) / np.maximum(sizes, 1)
+    centroid_lon = np.bincount(cells, lon, k) / np.maximum(sizes, 1)
+    parent = _bisect(centroid_lat, centroid_lon, np.ones(k), fanout)
+    return [parent[cell] for cell in cell_of]
+
+
+class OverlayRouter:
+    """
+    Nested partition, boundary airports and per-objective cliques of one graph
+    cell_of[l][u] is the level-l cell of airport u; cliques[attribute][l][u]
+    maps a level-l boundary airport u to [(v, distance)] for the other
+    boundary airports v of its level-l cell reachable inside that cell.
+    """
+
+    def __init__(self, graph, cell_of: List[List[int]], objectives: Iterable[str] = OBJECTIVES.values()):
+        self.graph = graph
+        self.cg = compile_graph(graph)
+        self.cell_of = [list(level) for level in cell_of]
+        self.levels = len(self.cell_of)
+        self.objectives = list(objectives)
+
+        self.cells: List[Dict[int, List[int]]] = []
+        self.boundary: List[Dict[int, List[int]]] = []
+        for level in self.cell_of:
+            cells = {}
+            for node, cell in enumerate(level):
+                cells.setdefault(cell, []).append(node)
+            cell_array = np.asarray(level)
+            cross = cell_array[self.cg.sources] != cell_array[self.cg.indices]
+            is_boundary = np.zeros(self.cg.n, dtype=bool)
+            is_boundary[self.cg.sources[cross]] = True
+            is_boundary[self.cg.indices[cross]] = True
+            self.cells.append(cells)
+            self.boundary.append({cell: [u for u in nodes if is_boundary[u]] for cell, nodes in cells.items()})
+
+        self.cliques = {attribute: [{} for _ in range(self.levels)] for attribute in self.objectives}
+        self._weights = {}
+        self.customize()
+
+    @classmethod
+    def build(cls, graph, partition: str = 'country', cell_size: int = DEFAULT_CELL_SIZE,
+              levels: int = DEFAULT_LEVELS, fanout: int = FANOUT,
+              objectives: Iterable[str] = OBJECTIVES.values()) -> 'OverlayRouter':
+        """partition: a node attribute such as 'country' or 'balanced' (level 0); levels >= 1"""
+        cg = compile_graph(graph)
+        if partition == 'balanced':
+            cell_of = [balanced_partition(graph, cg, cell_size)]
+        else:
+            cell_of = [partition_by_attribute(graph, cg, partition)]
+        for _ in range(levels - 1):
+            cell_of.append(merge_cells(graph, cg, cell_of[-1], fanout))
+        return cls(graph, cell_of, objectives)
+
+    def _cell_search(self, attribute: str, level: int, source: int, target: Optional[int] = None,
+                     stops: frozenset = frozenset()) -> Tuple[Dict, Dict, Dict]:
+        """
+        Dijkstra from source inside its level cell: original routes on level 0,
+        else level - 1 cliques plus routes between level - 1 cells.
+        Returns (dist, pred, via) with pred[v] = (u, shortcut level or -1) and
+        via[v] True when the path found to v passes through one of stops.
+        """
+        indptr, indices, weights = self.cg.as_lists(attribute)
+        cell_of = self.cell_of[level]
+        below = self.cell_of[level - 1] if level else None
+        cliques = self.cliques[attribute][level - 1] if level else None
+        cell = cell_of[source]
+        inf = float('inf')
+        dist = {source: 0.0}
+        pred = {}
+        via = {source: False}
+        done = set()
+        pq = [(0.0, source)]
+        while pq:
+            d, u = heapq.heappop(pq)
+            if u in done:
+                continue
+            done.add(u)
+            if u == target:
+                break
+
+            passes = via[u] or (u != source and u in stops)
+            if level:
+                for v, w in cliques.get(u, ()):
+                    nd = d + w
+                    if nd < dist.get(v, inf):
+                        dist[v] = nd
+                        pred[v] = (u, level - 1)
+                        via[v] = passes
+                        heapq.heappush(pq, (nd, v))
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                if cell_of[v] != cell or (level and below[v] == below[u]):
+                    continue
+                nd = d + weights[e]
+                if nd < dist.get(v, inf):
+                    dist[v] = nd
+                    pred[v] = (u, -1)
+                    via[v] = passes
+                    heapq.heappush(pq, (nd, v))
+        return dist, pred, via
+
+    def customize(self, cells: Optional[Dict[int, Iterable[int]]] = None,
+                  objectives: Optional[Iterable[str]] = None):
+        """(Re)compute cliques bottom-up; cells maps level -> cell ids (all cells by default)"""
+        for attribute in objectives or self.objectives:
+            for level in range(self.levels):
+                todo = self.cells[level] if cells is None else cells.get(level, ())
+                cliques = self.cliques[attribute][level]
+                for cell in todo:
+                    boundary = self.boundary[level][cell]
+                    stops = frozenset(boundary)
+                    for u in boundary:
+                        # Shortcuts whose path crosses another boundary airport are implied by two others
+                        dist, _, via = self._cell_search(attribute, level, u, stops=stops)
+                        cliques[u] = [(v, dist[v]) for v in boundary if v != u and v in dist and not via[v]]
+            self._weights[attribute] = self.cg.weight(attribute).copy()
+
+    def refresh(self) -> Dict[int, List[int]]:
+        """
+        Pick up in-place weight edits (after mark_modified on the graph)
+        Re-customises only the cells containing a changed route, at every
+        level where both ends share a cell; returns {level: cells}.
+        A changed node or route set requires a new OverlayRouter.
+        """
+        cg = compile_graph(self.graph)
+        if cg is self.cg:
+            return {}
+        if cg.n != self.cg.n or not np.array_equal(cg.indptr, self.cg.indptr) \
+                or not np.array_equal(cg.indices, self.cg.indices):
+            raise ValueError("Routes or airports changed; build a new OverlayRouter")
+        self.cg = cg
+
+        changed_cells = {}
+        for attribute in self.objectives:
+            edited = np.flatnonzero(cg.weight(attribute) != self._weights[attribute])
+            if len(edited) == 0:
+                continue
+            cells = {}
+            for level in range(self.levels):
+                cell_array = np.asarray(self.cell_of[level])
+                inner = edited[cell_array[cg.sources[edited]] == cell_array[cg.indices[edited]]]
+                if len(inner):
+                    cells[level] = sorted(set(cell_array[cg.sources[inner]].tolist()))
+            self.customize(cells, [attribute])
+            for level, ids in cells.items():
+                changed_cells.setdefault(level, set()).update(ids)
+
+        for attribute in self.objectives:
+            self._weights[attribute] = cg.weight(attribute).copy()
+        return {level: sorted(ids) for level, ids in changed_cells.items()}
+
+    def query(self, source: str, destination: str, attribute: str) -> Tuple[float, List[str], int]:
+        """(optimal value, airport path, nodes settled); (inf, [], settled) when unreachable"""
+        if attribute not in self.cliques:
+            raise ValueError(f"Objective not customised: {attribute}")
+        indptr, indices, weights = self.cg.as_lists(attribute)
+        cliques = self.cliques[attribute]
+        cell_of = self.cell_of
+        s, t = self.cg.node_index[source], self.cg.node_index[destination]
+        local = [(level[s], level[t]) for level in cell_of]
+        top_down = list(reversed(range(self.levels)))
+
+        inf = float('inf')
+        dist = {s: 0.0}
+        pred = {}  # node -> (previous node, shortcut level or -1)
+        done = set()
+        pq = [(0.0, s)]
+        while pq:
+            d, u = heapq.heappop(pq)
+            if u in done:
+                continue
+            done.add(u)
+            if u == t:
+                break
+
+            # Highest level whose cell of u holds neither s nor t (-1: search original routes)
+            level = -1
+            for candidate in top_down:
+                if cell_of[candidate][u] not in local[candidate]:
+                    level = candidate
+                    break
+
+            if level >= 0:
+                for v, w in cliques[level].get(u, ()):
+                    nd = d + w
+                    if nd < dist.get(v, inf):
+                        dist[v] = nd
+                        pred[v] = (u, level)
+                        heapq.heappush(pq, (nd, v))
+            cell = cell_of[level][u] if level >= 0 else None
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                if level >= 0 and cell_of[level][v] == cell:
+                    continue
+                nd = d + weights[e]
+                if nd < dist.get(v, inf):
+                    dist[v] = nd
+                    pred[v] = (u, -1)
+                    heapq.heappush(pq, (nd, v))
+
+        if t not in done:
+            return inf, [], len(done)
+
+        path = [t]
+        node = t
+        while node != s:
+            previous, level = pred[node]
+            if level >= 0:
+                path.extend(reversed(self._unpack(attribute, level, previous, node)))
+            path.append(previous)
+            node = previous
+        path.reverse()
+        return dist[t], [self.cg.nodes[i] for i in path], len(done)
+
+    def _unpack(self, attribute: str, level: int, source: int, target: int) -> List[int]:
+        """Airports strictly between source and target on a level shortcut"""
+        _, pred, _ = self._cell_search(attribute, level, source, target)
+        inner = []
+        node = target
+        while node != source:
+            previous, below = pred[node]
+            if below >= 0:
+                inner.extend(reversed(self._unpack(attribute, below, previous, node)))
+            if previous != source:
+                inner.append(previous)
+            node = previous
+        inner.reverse()
+        return inner
+
+    def stats(self) -> List[Dict]:
+        rows = []
+        for level in range(self.levels):
+            shortcuts = [sum(len(v) for v in self.cliques[attribute][level].values()) for attribute in self.objectives]
+            rows.append({
+                'level': level,
+                'cells': len(self.cells[level]),
+                'largest_cell': max((len(nodes) for nodes in self.cells[level].values()), default=0),
+                'boundary_airports': sum(len(nodes) for nodes in self.boundary[level].values()),
+                'shortcuts': max(shortcuts, default=0),
+            })
+        return rows
+
+
+def overlay_route(router: OverlayRouter, source: str, destination: str, attribute: str,
+                  optimization_target: str) -> PathfindingResult:
+    """Overlay query wrapped like the other solvers"""
+    start_time = time.time()
+    value, path, settled = router.query(source, destination, attribute)
+    execution_time = time.time() - start_time
+
+    details = {
+        'optimization_target': optimization_target,
+        'algorithm_type': 'Multi-Level Overlay (Partitioned)',
+        'nodes_explored': settled
+    }
+    details.update(route_totals(router.graph, path))
+    return PathfindingResult(path, value, execution_time, details)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a multi-level overlay and compare queries with Dijkstra")
+    parser.add_argument('--partition', default='country', help="node attribute (e.g. country) or 'balanced'")
+    parser.add_argument('--cell-size', type=int, default=DEFAULT_CELL_SIZE)
+    parser.add_argument('--levels', type=int, default=DEFAULT_LEVELS)
+    parser.add_argument('--fanout', type=int, default=FANOUT)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--synthetic', type=int, help="route on a synthetic network of this many airports")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        graph = build_network_graph(*generate_synthetic_network(args.synthetic))
+    else:
+        graph = build_network_graph(*load_aviation_data())
+
+    start = time.perf_counter()
+    router = OverlayRouter.build(graph, args.partition, args.cell_size, args.levels, args.fanout)
+    print(f"Customised {len(router.objectives)} objectives in {time.perf_counter() - start:.2f} s")
+    for row in router.stats():
+        print(f"  level {row['level']}: {row['cells']:,} cells (largest {row['largest_cell']:,}), "
+              f"{row['boundary_airports']:,} boundary airports, {row['shortcuts']:,} shortcuts")
+
+    cg = router.cg
+    rng = random.Random(42)
+    pairs = [tuple(rng.sample(range(cg.n), 2)) for _ in range(args.queries)]
+    for attribute in router.objectives:
+        overlay_seconds = flat_seconds = 0.0
+        settled = 0
+        for s, t in pairs:
+            start = time.perf_counter()
+            value, _, explored = router.query(cg.nodes[s], cg.nodes[t], attribute)
+            overlay_seconds += time.perf_counter() - start
+            settled += explored
+
+            start = time.perf_counter()
+            dist, _ = shortest_path_tree(cg, attribute, s, target=t)
+            flat_seconds += time.perf_counter() - start
+            if not np.isclose(dist[t], value):
+                raise ValueError(f"{attribute}: overlay {value} != Dijkstra {dist[t]}")
+
+        print(f"{attribute:<14} overlay {overlay_seconds / len(pairs) * 1000:.2f} ms "
+              f"({settled // len(pairs):,} settled)  flat Dijkstra {flat_seconds / len(pairs) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
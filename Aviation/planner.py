@@ -0,0 +1,211 @@
+"""
+Cost-based query planner
+
+Given graph statistics (V, E, weight signs, cached all-pairs matrices)
+and a workload ('single_pair', 'one_to_many' or 'all_pairs'), estimates
+the running time of every engine that is valid for an objective and
+picks the cheapest. Workloads differ in how many trees are built and how
+many answers are read back: one_to_many is one origin to every
+destination, so a single-source engine builds one tree and the all-pairs
+engines pay O(V³) for V answers. Plans whose estimate exceeds
+max_seconds are refused with the estimate instead of being run.
+
+Throughput constants were calibrated by timing the solvers on
+generate_synthetic_network graphs of 300-2,000 airports; estimates are
+order-of-magnitude, not predictions.
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from graph_arrays import compile_graph
+
+# Interpreted inner-loop steps per second (heap pops, edge relaxations)
+PYTHON_OPS_PER_SECOND = 2e7
+# Nested-list triple loop of floyd_warshall_fastest_time
+FLOYD_WARSHALL_OPS_PER_SECOND = 6e6
+# Vectorised numpy element operations per second (blocked Floyd-Warshall)
+NUMPY_OPS_PER_SECOND = 1.5e8
+# Plans estimated above this are refused instead of freezing the UI
+MAX_PLAN_SECONDS = 30.0
+
+WORKLOADS = ('single_pair', 'one_to_many', 'all_pairs')
+
+# compare_all_algorithms entry -> (edge attribute, optimisation target)
+OBJECTIVES = {
+    'Dijkstra': ('distance', 'Shortest Distance'),
+    'Bellman-Ford': ('adjusted_cost', 'Cheapest Cost'),
+    'Floyd-Warshall': ('time', 'Fastest Time'),
+}
+
+# Engine each comparison entry runs when the planner does not choose
+DEFAULT_ENGINES = {
+    'Dijkstra': 'dijkstra',
+    'Bellman-Ford': 'bellman_ford',
+    'Floyd-Warshall': 'floyd_warshall',
+}
+
+
+class GraphProfile:
+    """Statistics the cost model needs, computed once from the compiled arrays"""
+
+    def __init__(self, graph, apsp_cached: Iterable[str] = ()):
+        cg = compile_graph(graph)
+        self.n = cg.n
+        self.m = cg.m
+        self.density = cg.m / (cg.n * (cg.n - 1)) if cg.n > 1 else 0.0
+        self.apsp_cached = set(apsp_cached)
+        self.negative = {}
+        for attribute in set(attr for attr, _ in OBJECTIVES.values()) | set(cg.weights):
+            weights = cg.weight(attribute)
+            self.negative[attribute] = bool((weights < 0).any())
+
+    def describe(self) -> str:
+        return f"V={self.n:,}, E={self.m:,}, density={self.density:.4f}"
+
+
+class PlanStep:
+    """Chosen engine for one objective, its estimate and the rejected alternatives"""
+
+    def __init__(self, label: str, attribute: str, engine: Optional[str], estimated_seconds: float,
+                 feasible: bool, reason: str, alternatives: List[Tuple[str, float, str]]):
+        self.label = label
+        self.attribute = attribute
+        self.engine = engine
+        self.estimated_seconds = estimated_seconds
+        self.feasible = feasible
+        self.reason = reason
+        self.alternatives = alternatives
+
+    def explain(self) -> str:
+        lines = [self.reason]
+        for engine, seconds, why in self.alternatives:
+            lines.append(f"  rejected {engine} ({_format_seconds(seconds)}): {why}")
+        return '\n'.join(lines)
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds == float('inf'):
+        return 'not applicable'
+    if seconds < 1:
+        return f"~{seconds * 1000:.3g} ms"
+    return f"~{seconds:,.3g} s"
+
+
+def estimate_engine(profile: GraphProfile, engine: str, attribute: str,
+                    workload: str = 'single_pair') -> Tuple[float, Optional[str]]:
+    """
+    (estimated seconds, None) for a valid engine, or (inf, why not)
+    Single-source engines build one tree per origin (V for all_pairs) and
+    every engine pays one read per answer: 1, V or V² for single_pair,
+    one_to_many and all_pairs.
+    """
+    n, m = profile.n, profile.m
+    sources = n if workload == 'all_pairs' else 1
+    answers = {'single_pair': 1, 'one_to_many': n, 'all_pairs': n * n}[workload]
+    reads = answers / PYTHON_OPS_PER_SECOND
+    negative = profile.negative.get(attribute, False)
+
+    if engine == 'dijkstra':
+        if negative:
+            return float('inf'), "negative edge weights"
+        ops = (n + m) * math.log2(n + 2)
+        return sources * ops / PYTHON_OPS_PER_SECOND + reads, None
+
+    if engine == 'bellman_ford':
+        # Worst case |V| - 1 rounds over every edge
+        return sources * max(n - 1, 1) * m / PYTHON_OPS_PER_SECOND + reads, None
+
+    if engine == 'floyd_warshall':
+        return n ** 3 / FLOYD_WARSHALL_OPS_PER_SECOND + reads, None
+
+    if engine == 'blocked_floyd_warshall':
+        return n ** 3 / NUMPY_OPS_PER_SECOND + reads, None
+
+    if engine == 'apsp_lookup':
+        if attribute in profile.apsp_cached:
+            return reads, None
+        return n ** 3 / NUMPY_OPS_PER_SECOND + reads, None
+
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+def _why(profile: GraphProfile, engine: str, attribute: str) -> str:
+    if engine == 'dijkstra':
+        return f"non-negative {attribute} weights, O((V + E) log V) per source"
+    if engine == 'bellman_ford':
+        return f"O(V·E) relaxation{'; required for negative weights' if profile.negative.get(attribute) else ''}"
+    if engine == 'floyd_warshall':
+        return "O(V³) interpreted all-pairs"
+    if engine == 'blocked_floyd_warshall':
+        return "O(V³) vectorised all-pairs"
+    if engine == 'apsp_lookup':
+        if attribute in profile.apsp_cached:
+            return "read from the cached all-pairs matrix"
+        return "build the all-pairs matrix once, then one lookup per answer"
+    return engine
+
+
+def plan_engine(profile: GraphProfile, label: str, attribute: str, candidates: Iterable[str],
+                workload: str = 'single_pair', max_seconds: float = MAX_PLAN_SECONDS) -> PlanStep:
+    """Cheapest valid engine among candidates for one objective (refused when over max_seconds)"""
+    if workload not in WORKLOADS:
+        raise ValueError(f"Unknown workload: {workload}")
+
+    scored = []
+    for engine in candidates:
+        seconds, invalid = estimate_engine(profile, engine, attribute, workload)
+        why = invalid or _why(profile, engine, attribute)
+        scored.append((seconds, engine, why))
+    scored.sort()
+
+    best_seconds, best_engine, best_why = scored[0]
+    alternatives = [(engine, seconds, why if seconds == float('inf') else f"{why}; slower")
+                    for seconds, engine, why in scored[1:]]
+
+    if best_seconds == float('inf'):
+        return PlanStep(label, attribute, None, best_seconds, False,
+                        f"{label}: no valid engine for {attribute} ({best_why})", alternatives)
+
+    feasible = best_seconds <= max_seconds
+    if feasible:
+        reason = (f"{label}: {best_engine} for {attribute} ({workload}, {profile.describe()}) "
+                  f"est. {_format_seconds(best_seconds)} - {best_why}")
+    else:
+        reason = (f"{label}: refused - cheapest engine {best_engine} is estimated at "
+                  f"{_format_seconds(best_seconds)} on {profile.describe()} "
+                  f"(limit {_format_seconds(max_seconds)})")
+    return PlanStep(label, attribute, best_engine, best_seconds, feasible, reason, alternatives)
+
+
+def plan_comparison(graph, use_planner: bool = False, workload: str = 'single_pair',
+                    allow_apsp: bool = False, apsp_cached: Iterable[str] = (),
+                    max_seconds: float = MAX_PLAN_SECONDS) -> Dict[str, PlanStep]:
+    """
+    One PlanStep per compare_all_algorithms entry
+    Without use_planner each entry keeps its own algorithm (apsp_lookup for
+    Floyd-Warshall when allow_apsp) and is only checked for feasibility;
+    with use_planner the cheapest engine run_engine can execute for its
+    objective is chosen: Dijkstra (any objective) or its namesake solver.
+    """
+    profile = GraphProfile(graph, apsp_cached)
+    plan = {}
+    for label, (attribute, _) in OBJECTIVES.items():
+        if use_planner:
+            candidates = sorted({'dijkstra', DEFAULT_ENGINES[label]})
+            if allow_apsp:
+                candidates.append('apsp_lookup')
+        elif label == 'Floyd-Warshall' and allow_apsp:
+            candidates = ['apsp_lookup']
+        else:
+            candidates = [DEFAULT_ENGINES[label]]
+        plan[label] = plan_engine(profile, label, attribute, candidates, workload, max_seconds)
+    return plan
+
+
+def plan_workload(graph, workload: str, attributes: Iterable[str] = ('distance', 'time', 'adjusted_cost'),
+                  apsp_cached: Iterable[str] = (), max_seconds: float = MAX_PLAN_SECONDS) -> Dict[str, PlanStep]:
+    """Engine choice per edge attribute for a whole workload (e.g. all_pairs exports)"""
+    profile = GraphProfile(graph, apsp_cached)
+    candidates = ['dijkstra', 'bellman_ford', 'floyd_warshall', 'blocked_floyd_warshall', 'apsp_lookup']
+    return {attribute: plan_engine(profile, attribute, attribute, candidates, workload, max_seconds)
+            for attribute in attributes}
@@ -0,0 +1,204 @@
+"""
+Reachability (isochrone) queries
+
+"Which airports can I reach from KHI within 12 hours / $800 / 5,000 km?"
+One budget-bounded Dijkstra from the source answers it for every
+destination at once. The search stops expanding at the budget and keeps
+its state in dicts, so the work is proportional to the reached region,
+not to the whole network.
+
+With max_hops the search runs over (airport, hops) labels: a label is
+only kept if it uses fewer hops than every cheaper label already settled
+at that airport, so each airport gets its optimum among paths of at most
+max_hops legs.
+
+    python reachability.py KHI --budget 12 --objective time
+    python reachability.py S00042 --synthetic 20000 --budget 2000 --max-hops 2
+"""
+import argparse
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+import folium
+import pandas as pd
+
+from aviation_algorithms import route_totals
+from data_loader import build_network_graph, generate_synthetic_network, load_aviation_data
+from graph_arrays import CompiledGraph, compile_graph
+
+# Budget objective -> edge attribute ('cost' includes the layover penalty, as Bellman-Ford does)
+OBJECTIVES = {
+    'time': 'time',
+    'cost': 'adjusted_cost',
+    'distance': 'distance',
+}
+
+
+def bounded_search(cg: CompiledGraph, attribute: str, source: int, budget: float,
+                   max_hops: Optional[int] = None) -> Dict[int, Tuple[float, int, List[int]]]:
+    """
+    Every node reachable from source with optimal value <= budget
+    Returns {node: (value, hops, node-index path)}. With max_hops only paths
+    of at most max_hops edges are considered.
+    """
+    indptr, indices, weights = cg.as_lists(attribute)
+    inf = float('inf')
+
+    # Labels: (node, hops, parent label); the heap holds (value, hops, label)
+    labels = [(source, 0, -1)]
+    pq = [(0.0, 0, 0)]
+    tentative = {source: 0.0}  # best value pushed per node (no hop cap)
+    best_hops = {}             # fewest hops among the labels settled per node (hop cap)
+    reached = {}               # node -> (value, hops, label) of its first, optimal settled label
+
+    while pq:
+        d, h, label = heapq.heappop(pq)
+        u = labels[label][0]
+        if max_hops is None:
+            if u in reached:
+                continue
+        elif h >= best_hops.get(u, inf):
+            continue
+        else:
+            best_hops[u] = h
+        if u not in reached:
+            reached[u] = (d, h, label)
+        if max_hops is not None and h >= max_hops:
+            continue
+
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d + weights[e]
+            if nd > budget:
+                continue
+            if max_hops is None:
+                if nd >= tentative.get(v, inf):
+                    continue
+                tentative[v] = nd
+            elif h + 1 >= best_hops.get(v, inf):
+                continue
+            labels.append((v, h + 1, label))
+            heapq.heappush(pq, (nd, h + 1, len(labels) - 1))
+
+    results = {}
+    for node, (value, hops, label) in reached.items():
+        path = []
+        while label != -1:
+            path.append(labels[label][0])
+            label = labels[label][2]
+        path.reverse()
+        results[node] = (value, hops, path)
+    return results
+
+
+def reachable_within(graph, source: str, budget: float, objective: str = 'time',
+                     max_hops: Optional[int] = None) -> pd.DataFrame:
+    """
+    Airports reachable from source within budget (hours, dollars or km)
+    One row per airport, cheapest first: value, hops, path and route totals.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    if source not in graph:
+        raise ValueError(f"Unknown airport: {source}")
+
+    cg = compile_graph(graph)
+    reached = bounded_search(cg, OBJECTIVES[objective], cg.node_index[source], budget, max_hops)
+
+    rows = []
+    for node, (value, hops, path) in reached.items():
+        if node == cg.node_index[source]:
+            continue
+        airport = cg.nodes[node]
+        info = graph.nodes[airport]
+        path = [cg.nodes[i] for i in path]
+        rows.append({
+            'airport': airport,
+            'name': info.get('name', airport),
+            'country': info.get('country', ''),
+            'lat': info['lat'],
+            'lon': info['lon'],
+            objective: round(value, 2),
+            'hops': hops,
+            'route': ' → '.join(path),
+            **route_totals(graph, path)
+        })
+
+    columns = ['airport', 'name', 'country', 'lat', 'lon', objective, 'hops', 'route',
+               'total_distance', 'total_time', 'total_cost']
+    df = pd.DataFrame(rows, columns=columns)
+    return df.sort_values([objective, 'airport'], ignore_index=True)
+
+
+def _budget_color(share: float) -> str:
+    """Green (start) -> amber -> red (at the budget)"""
+    if share < 0.5:
+        return f"#{int(510 * share):02x}b050"
+    return f"#ff{int(176 * (2 - 2 * share)):02x}50"
+
+
+def isochrone_layer(graph, source: str, reachable: pd.DataFrame, budget: float,
+                    objective: str = 'time') -> folium.FeatureGroup:
+    """
+    One map layer for a reachable_within result: every reached airport
+    coloured by its share of the budget, joined to its predecessor on the
+    optimal route (together the shortest-path tree of the reached region)
+    """
+    layer = folium.FeatureGroup(name=f"Reachable from {source}")
+
+    def coords(airport):
+        return graph.nodes[airport]['lat'], graph.nodes[airport]['lon']
+
+    for row in reachable.itertuples(index=False):
+        share = min(getattr(row, objective) / budget, 1.0) if budget > 0 else 1.0
+        color = _budget_color(share)
+        previous = row.route.split(' → ')[-2]
+        folium.PolyLine(
+            locations=[coords(previous), coords(row.airport)],
+            color=color,
+            weight=2,
+            opacity=0.6
+        ).add_to(layer)
+        folium.CircleMarker(
+            location=coords(row.airport),
+            radius=5,
+            color=color,
+            fill=True,
+            fill_opacity=0.9,
+            tooltip=f"{row.airport}: {getattr(row, objective)} ({row.hops} hops)",
+            popup=f"<b>{row.name}</b><br>{row.route}"
+        ).add_to(layer)
+
+    folium.Marker(
+        location=coords(source),
+        tooltip=source,
+        icon=folium.Icon(color='green', icon='plane-departure', prefix='fa')
+    ).add_to(layer)
+    return layer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Airports reachable within a time, cost or distance budget")
+    parser.add_argument('source')
+    parser.add_argument('--budget', type=float, required=True, help="hours, dollars or km")
+    parser.add_argument('--objective', default='time', choices=list(OBJECTIVES))
+    parser.add_argument('--max-hops', type=int)
+    parser.add_argument('--synthetic', type=int, help="search a synthetic network of this many airports")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        graph = build_network_graph(*generate_synthetic_network(args.synthetic))
+    else:
+        graph = build_network_graph(*load_aviation_data())
+
+    start = time.perf_counter()
+    df = reachable_within(graph, args.source, args.budget, args.objective, args.max_hops)
+    elapsed = time.perf_counter() - start
+    print(f"{len(df):,} of {graph.number_of_nodes() - 1:,} airports reachable from {args.source} "
+          f"within {args.budget:g} ({args.objective}) in {elapsed * 1000:.1f} ms")
+    print(df[['airport', args.objective, 'hops', 'route']].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
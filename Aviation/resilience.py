@@ -0,0 +1,327 @@
+"""
+Route and airport criticality analysis
+
+For every route (edge) or airport (node) closure, measures how much the
+optimal distance, time and cost grow across all origin-destination pairs
+and how many pairs lose their last connection.
+
+Baseline single-source trees are built once per objective. Closing an
+element can only lengthen routes that used it, so for each closure only
+the subtree hanging below the element in each affected (source,
+objective) tree is repaired - every other pair is provably unchanged.
+Closures are independent and are spread over a process pool.
+
+    python resilience.py --top 15
+    python resilience.py --airports DXB LHR FRA --workers 4
+"""
+import argparse
+import heapq
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import build_network_graph, generate_synthetic_network, load_aviation_data
+from graph_arrays import CompiledGraph, compile_graph, shortest_path_tree
+from od_export import OBJECTIVES
+
+# Worker-side baseline (set once per process by _init_worker)
+_state = {}
+
+
+class ResilienceBaseline:
+    """
+    All-pairs baseline: dist[name] and pred_edge[name] are (V, V) arrays
+    with one shortest-path tree per source row. Each tree is also laid out
+    in preorder (order[name][s], with tin/tout bounds), so the subtree
+    hanging below any node is one contiguous slice.
+    """
+
+    def __init__(self, cg: CompiledGraph, objectives: Optional[Dict[str, str]] = None):
+        self.cg = cg
+        self.objectives = objectives or OBJECTIVES
+        n = cg.n
+        self.dist = {}
+        self.pred_edge = {}
+        self.order = {}
+        self.tin = {}
+        self.tout = {}
+
+        tails = cg.sources.tolist()
+        for name, attribute in self.objectives.items():
+            dist = np.empty((n, n))
+            pred = np.empty((n, n), dtype=np.int64)
+            order = np.full((n, n), -1, dtype=np.int32)
+            tin = np.full((n, n), -1, dtype=np.int32)
+            tout = np.full((n, n), -1, dtype=np.int32)
+
+            for s in range(n):
+                row_dist, row_pred = shortest_path_tree(cg, attribute, s)
+                dist[s] = row_dist
+                pred[s] = row_pred
+                _preorder(s, row_pred, tails, order[s], tin[s], tout[s])
+
+            self.dist[name] = dist
+            self.pred_edge[name] = pred
+            self.order[name] = order
+            self.tin[name] = tin
+            self.tout[name] = tout
+
+        # Reverse adjacency for seeding repaired subtrees from outside
+        rev = cg.reverse()
+        self.reverse_lists = {name: rev.as_lists(attribute) for name, attribute in self.objectives.items()}
+        self.reverse_edge_ids = rev.edge_ids.tolist()
+        self.reachable = np.isfinite(next(iter(self.dist.values())))
+
+    def subtree(self, name: str, source: int, node: int) -> np.ndarray:
+        """Nodes whose route from source runs through node (node included)"""
+        tin = self.tin[name][source, node]
+        if tin == -1:
+            return self.order[name][source, :0]
+        return self.order[name][source, tin:self.tout[name][source, node]]
+
+
+def _preorder(source: int, pred_edge: List[int], tails: List[int],
+              order: np.ndarray, tin: np.ndarray, tout: np.ndarray):
+    """Fill the preorder layout of one tree: order[tin[v]:tout[v]] is v's subtree"""
+    children = {}
+    for v, e in enumerate(pred_edge):
+        if e != -1:
+            children.setdefault(tails[e], []).append(v)
+
+    position = 0
+    stack = [(source, False)]
+    while stack:
+        v, done = stack.pop()
+        if done:
+            tout[v] = position
+            continue
+        order[position] = v
+        tin[v] = position
+        position += 1
+        stack.append((v, True))
+        stack.extend((child, False) for child in children.get(v, ()))
+
+
+def _repair_subtree(baseline: ResilienceBaseline, name: str, source: int, sub: np.ndarray,
+                    banned_edge: int = -1, banned_node: int = -1) -> Dict[int, float]:
+    """
+    New distances for the nodes of sub after the closure
+    Every node outside sub keeps its distance, so sub is seeded with the
+    best edge entering it from outside and settled with a Dijkstra that
+    never leaves sub.
+    """
+    indptr, indices, weights = baseline.cg.as_lists(baseline.objectives[name])
+    r_indptr, r_indices, r_weights = baseline.reverse_lists[name]
+    r_edge_ids = baseline.reverse_edge_ids
+    old_dist = baseline.dist[name][source]
+
+    in_sub = set(sub.tolist())
+    inf = float('inf')
+    new_dist = dict.fromkeys(in_sub, inf)
+
+    for x in in_sub:
+        if x == banned_node:
+            continue
+        best = inf
+        for k in range(r_indptr[x], r_indptr[x + 1]):
+            y = r_indices[k]
+            if y in in_sub or y == banned_node or r_edge_ids[k] == banned_edge:
+                continue
+            nd = old_dist[y] + r_weights[k]
+            if nd < best:
+                best = nd
+        new_dist[x] = best
+
+    pq = [(d, x) for x, d in new_dist.items() if d < inf]
+    heapq.heapify(pq)
+    settled = set()
+    while pq:
+        d, u = heapq.heappop(pq)
+        if u in settled:
+            continue
+        settled.add(u)
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            if v not in in_sub or v == banned_node or e == banned_edge:
+                continue
+            nd = d + weights[e]
+            if nd < new_dist[v]:
+                new_dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+
+    return new_dist
+
+
+def _closure_impact(baseline: ResilienceBaseline, kind: str, element: int) -> Dict:
+    """Impact of closing one edge (kind='edge') or airport (kind='node')"""
+    cg = baseline.cg
+    n = cg.n
+    if kind == 'edge':
+        banned_edge, banned_node = element, -1
+        head = int(cg.indices[element])
+    else:
+        banned_edge, banned_node = -1, element
+        head = element
+
+    row = {'pairs_disconnected': 0, 'pairs_affected': 0, 'subtrees_repaired': 0}
+    disconnected = set()
+    affected = set()
+
+    for name in baseline.objectives:
+        increase_total = 0.0
+        increase_max = 0.0
+        pred = baseline.pred_edge[name]
+        old = baseline.dist[name]
+
+        # Sources whose tree contains the element: the edge is the tree edge
+        # into its head, or the airport is an inner node of the tree
+        if kind == 'edge':
+            users = np.nonzero(pred[:, head] == element)[0]
+        else:
+            users = np.nonzero((pred[:, head] != -1) & (np.arange(n) != head))[0]
+
+        for s in users.tolist():
+            sub = baseline.subtree(name, s, head)
+            if kind == 'node' and len(sub) < 2:
+                continue
+            new_dist = _repair_subtree(baseline, name, s, sub, banned_edge, banned_node)
+            row['subtrees_repaired'] += 1
+
+            for t, d in new_dist.items():
+                if t == banned_node or d <= old[s, t] + 1e-9:
+                    continue
+                affected.add((s, t))
+                if d == float('inf'):
+                    disconnected.add((s, t))
+                else:
+                    increase_total += d - old[s, t]
+                    increase_max = max(increase_max, d - old[s, t])
+
+        row[f"{name}_increase_total"] = round(increase_total, 2)
+        row[f"{name}_increase_max"] = round(increase_max, 2)
+
+    row['pairs_disconnected'] = len(disconnected)
+    row['pairs_affected'] = len(affected)
+    if kind == 'node':
+        # Connections to or from the closed airport itself
+        row['pairs_lost_at_airport'] = int(baseline.reachable[element].sum() + baseline.reachable[:, element].sum() - 2)
+    return row
+
+
+def _init_worker(baseline: ResilienceBaseline):
+    _state['baseline'] = baseline
+
+
+def _worker_impact(task: Tuple[str, int]) -> Dict:
+    return _closure_impact(_state['baseline'], *task)
+
+
+def _run_closures(baseline: ResilienceBaseline, tasks: List[Tuple[str, int]], workers: Optional[int]) -> List[Dict]:
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < 2:
+        return [_closure_impact(baseline, kind, element) for kind, element in tasks]
+    with Pool(workers, initializer=_init_worker, initargs=(baseline,)) as pool:
+        return pool.map(_worker_impact, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+
+
+def _sort_by_criticality(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    return df.sort_values(['pairs_disconnected', 'time_increase_total', 'pairs_affected'],
+                          ascending=False, ignore_index=True)
+
+
+def route_criticality(graph, workers: Optional[int] = None, baseline: Optional[ResilienceBaseline] = None,
+                      routes: Optional[Iterable[Tuple[str, str]]] = None) -> pd.DataFrame:
+    """
+    Closure impact of every route (or just routes), most critical first
+    Columns: origin, destination, pairs_disconnected, pairs_affected,
+    {objective}_increase_total / _increase_max, subtrees_repaired
+    """
+    cg = compile_graph(graph)
+    baseline = baseline or ResilienceBaseline(cg)
+
+    if routes is None:
+        edge_ids = range(cg.m)
+    else:
+        edge_ids = [cg.edge_id(cg.node_index[u], cg.node_index[v]) for u, v in routes]
+        if -1 in edge_ids:
+            raise ValueError("Route not found in the network")
+
+    tasks = [('edge', int(e)) for e in edge_ids]
+    rows = _run_closures(baseline, tasks, workers)
+    for (_, e), row in zip(tasks, rows):
+        row['origin'] = cg.nodes[cg.sources[e]]
+        row['destination'] = cg.nodes[cg.indices[e]]
+
+    df = pd.DataFrame(rows)
+    return _sort_by_criticality(df[['origin', 'destination'] + [c for c in df.columns
+                                                               if c not in ('origin', 'destination')]])
+
+
+def airport_criticality(graph, workers: Optional[int] = None, baseline: Optional[ResilienceBaseline] = None,
+                        airports: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Closure impact of every airport (or just airports), most critical first
+    Pairs touching the closed airport are reported separately as
+    pairs_lost_at_airport; the other columns cover the remaining pairs.
+    """
+    cg = compile_graph(graph)
+    baseline = baseline or ResilienceBaseline(cg)
+
+    codes = list(cg.nodes) if airports is None else list(airports)
+    missing = [code for code in codes if code not in cg.node_index]
+    if missing:
+        raise ValueError(f"Unknown airports: {', '.join(missing)}")
+
+    tasks = [('node', cg.node_index[code]) for code in codes]
+    rows = _run_closures(baseline, tasks, workers)
+    for code, row in zip(codes, rows):
+        row['airport'] = code
+
+    df = pd.DataFrame(rows)
+    return _sort_by_criticality(df[['airport'] + [c for c in df.columns if c != 'airport']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank routes and airports by closure impact")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--airports', nargs='*', help="only analyse these airports")
+    parser.add_argument('--synthetic', type=int, help="analyse a synthetic network of this many airports")
+    parser.add_argument('--output', help="write both tables to <output>_routes.csv / <output>_airports.csv")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        graph = build_network_graph(*generate_synthetic_network(args.synthetic))
+    else:
+        graph = build_network_graph(*load_aviation_data())
+
+    start = time.perf_counter()
+    baseline = ResilienceBaseline(compile_graph(graph))
+    print(f"Baseline trees: {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    airports = airport_criticality(graph, args.workers, baseline, args.airports)
+    routes = route_criticality(graph, args.workers, baseline) if not args.airports else None
+    print(f"Closures analysed in {time.perf_counter() - start:.2f} s")
+
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print("\nMost critical airports")
+        print(airports.head(args.top).to_string(index=False))
+        if routes is not None:
+            print("\nMost critical routes")
+            print(routes.head(args.top).to_string(index=False))
+
+    if args.output:
+        airports.to_csv(f"{args.output}_airports.csv", index=False)
+        if routes is not None:
+            routes.to_csv(f"{args.output}_routes.csv", index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Process-wide shared network and result cache
+
+The Streamlit app holds one SharedNetwork per process (st.cache_resource),
+so every browser session reads the same graph, compiled CSR arrays and
+all-pairs matrices instead of building its own copy. Arrays are frozen
+(read-only) before they are shared; sessions only ever take references,
+so memory stays flat as the number of sessions grows.
+
+Route results are kept in one ResultCache keyed by
+(graph fingerprint, source, destination, algorithm). Cached
+PathfindingResults are shared between sessions and must not be mutated.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from aviation_algorithms import PathfindingResult, refused_result, route_totals, run_engine
+from graph_arrays import compile_graph, graph_fingerprint
+from parallel_floyd_warshall import blocked_floyd_warshall
+from planner import MAX_PLAN_SECONDS, OBJECTIVES, plan_comparison
+from tracing import span
+
+MAX_CACHED_RESULTS = 4096
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    if isinstance(array, np.ndarray) and array.flags.writeable:
+        array.setflags(write=False)
+    return array
+
+
+class ResultCache:
+    """
+    Thread-safe LRU of computed results
+    The lock only guards the dictionary; results are computed outside it,
+    so one slow query never blocks other sessions. Two sessions missing the
+    same key at once may both compute it - the first stored result wins.
+    """
+
+    def __init__(self, maxsize: int = MAX_CACHED_RESULTS):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            value = self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return value
+
+    def get_or_compute(self, key: Hashable, compute: Callable) -> Tuple[object, bool]:
+        """Returns (value, cached)"""
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        return self.put(key, compute()), False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+class SharedNetwork:
+    """
+    Read-only bundle of one loaded network: graph, dataframes, compiled
+    arrays, content fingerprint and (lazily) all-pairs matrices per weight
+    """
+
+    def __init__(self, graph, airports_df=None, routes_df=None):
+        self.graph = graph
+        self.airports_df = airports_df
+        self.routes_df = routes_df
+        self.compiled = compile_graph(graph)
+        self.fingerprint = graph_fingerprint(self.compiled)
+
+        for array in (self.compiled.indptr, self.compiled.indices, self.compiled.sources):
+            _freeze(array)
+        for array in self.compiled.weights.values():
+            _freeze(array)
+
+        self._all_pairs = {}
+        self._all_pairs_lock = threading.Lock()
+
+    def all_pairs(self, attribute: str = 'time') -> Tuple[np.ndarray, np.ndarray, float]:
+        """(dist, next_hop, seconds to build) for attribute, computed once per process"""
+        with self._all_pairs_lock:
+            if attribute not in self._all_pairs:
+                start = time.perf_counter()
+                _, dist, nxt = blocked_floyd_warshall(self.graph, attribute)
+                self._all_pairs[attribute] = (_freeze(dist), _freeze(nxt), time.perf_counter() - start)
+            return self._all_pairs[attribute]
+
+    def cached_all_pairs(self):
+        """Attributes whose all-pairs matrices are already built"""
+        with self._all_pairs_lock:
+            return list(self._all_pairs)
+
+    def fastest_time_route(self, source: str, destination: str) -> PathfindingResult:
+        """Floyd-Warshall fastest-time answer read from the shared all-pairs matrices"""
+        return self.all_pairs_route(source, destination, 'time', 'Fastest Time')
+
+    def all_pairs_route(self, source: str, destination: str, attribute: str,
+                        optimization_target: str) -> PathfindingResult:
+        """Route for any weight read from the shared all-pairs matrices"""
+        dist, nxt, build_seconds = self.all_pairs(attribute)
+        start_time = time.time()
+
+        node_index = self.compiled.node_index
+        src_idx = node_index[source]
+        dst_idx = node_index[destination]
+
+        if nxt[src_idx, dst_idx] == -1:
+            return PathfindingResult([], float('inf'), time.time() - start_time, {})
+
+        path = [source]
+        current = src_idx
+        while current != dst_idx:
+            current = int(nxt[current, dst_idx])
+            path.append(self.compiled.nodes[current])
+
+        execution_time = time.time() - start_time
+
+        n = self.compiled.n
+        details = {
+            'optimization_target': optimization_target,
+            'algorithm_type': 'All-Pairs (Shared Precomputed Matrix)',
+            'matrix_size': f"{n}x{n}",
+            'precompute_time': round(build_seconds, 4)
+        }
+        details.update(route_totals(self.graph, path))
+
+        return PathfindingResult(path, float(dist[src_idx, dst_idx]), execution_time, details)
+
+
+def cached_compare_all_algorithms(network: SharedNetwork, cache: ResultCache, source: str,
+                                  destination: str, use_all_pairs: bool = True, use_planner: bool = False,
+                                  max_seconds: float = MAX_PLAN_SECONDS, backend: str = 'python') -> Dict:
+    """
+    compare_all_algorithms through the shared result cache
+    Each entry is looked up under (fingerprint, source, destination, entry,
+    engine) and only the misses are computed. With use_all_pairs the
+    Floyd-Warshall answer is read from the shared all-pairs matrix instead
+    of rerunning the O(V³) loop (and the planner may use the matrices for
+    any objective). Refused plans are never cached. Every result gets
+    details['cached'] and details['plan']. backend is passed to the solvers
+    and is part of the cache key, so each backend keeps its own timings.
+    """
+    with span('plan'):
+        plan = plan_comparison(network.graph, use_planner=use_planner, allow_apsp=use_all_pairs,
+                               apsp_cached=network.cached_all_pairs(), max_seconds=max_seconds)
+
+    results = {}
+    for label, step in plan.items():
+        if not step.feasible:
+            results[label] = refused_result(step)
+            continue
+
+        if step.engine == 'apsp_lookup':
+            attribute, target = OBJECTIVES[label]
+            solve = lambda: network.all_pairs_route(source, destination, attribute, target)
+        else:
+            solve = lambda: run_engine(network.graph, step.engine, label, source, destination, backend)
+
+        key = (network.fingerprint, source, destination, label, step.engine, backend)
+        try:
+            with span(f'solve:{label}', engine=step.engine) as solve_span:
+                result, cached = cache.get_or_compute(key, solve)
+                solve_span.attributes['cached'] = cached
+            results[label] = _shared_copy(result, cached=cached, plan=step.explain())
+        except Exception as e:
+            print(f"{label} failed: {e}")
+            results[label] = None
+
+    return results
+
+
+def _shared_copy(result: Optional[PathfindingResult], **extra) -> Optional[PathfindingResult]:
+    """Shallow per-session copy so the shared result itself is never modified"""
+    if result is None:
+        return None
+    details = dict(result.details)
+    details.update(extra)
+    return PathfindingResult(result.path, result.total_weight, result.execution_time, details)
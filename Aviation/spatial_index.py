@@ -0,0 +1,187 @@
+import heapq
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from aviation_algorithms import PathfindingResult, route_totals
+from graph_arrays import compile_graph, multi_source_search, path_from_tree
+
+EARTH_RADIUS_KM = 6371
+LEAF_SIZE = 32
+
+
+def to_unit_vectors(lat, lon) -> np.ndarray:
+    """Latitude/longitude in degrees -> (N, 3) points on the unit sphere"""
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lam = np.radians(np.asarray(lon, dtype=np.float64))
+    return np.stack((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)), axis=-1)
+
+
+def km_to_chord(km: float) -> float:
+    return 2 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+class AirportIndex:
+    """
+    Ball tree over airports on the unit sphere
+    Chord length between unit vectors grows monotonically with great-circle
+    distance, so ball bounds in 3-D give exact pruning for k-nearest,
+    radius and bounding-box queries in roughly O(log N + result) time.
+    """
+
+    def __init__(self, airports_df, leaf_size: int = LEAF_SIZE):
+        self.codes = airports_df['iata'].tolist()
+        self.lat = airports_df['lat'].to_numpy(dtype=np.float64)
+        self.lon = airports_df['lon'].to_numpy(dtype=np.float64)
+        self.points = to_unit_vectors(self.lat, self.lon)
+        self.leaf_size = leaf_size
+
+        # Flat node arrays: centre, radius, children (-1 for leaves) and the
+        # [start, end) slice of self.order owned by each node
+        self.order = np.arange(len(self.codes))
+        self.centers, self.radii, self.children, self.spans = [], [], [], []
+        if len(self.codes):
+            self._build(0, len(self.codes))
+        self.centers = np.array(self.centers)
+        self.radii = np.array(self.radii)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self.centers)
+        idx = self.order[start:end]
+        pts = self.points[idx]
+        center = pts.mean(axis=0)
+        self.centers.append(center)
+        self.radii.append(float(np.sqrt(((pts - center) ** 2).sum(axis=1).max())))
+        self.children.append((-1, -1))
+        self.spans.append((start, end))
+
+        if end - start > self.leaf_size:
+            axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+            mid = (end - start) // 2
+            part = np.argpartition(pts[:, axis], mid)
+            self.order[start:end] = idx[part]
+            left = self._build(start, start + mid)
+            right = self._build(start + mid, end)
+            self.children[node] = (left, right)
+
+        return node
+
+    def _search(self, target: np.ndarray, chord: float) -> np.ndarray:
+        """Airport positions within chord distance of target"""
+        found = []
+        stack = [0] if len(self.codes) else []
+        while stack:
+            node = stack.pop()
+            if np.linalg.norm(self.centers[node] - target) - self.radii[node] > chord:
+                continue
+            left, right = self.children[node]
+            if left == -1:
+                start, end = self.spans[node]
+                idx = self.order[start:end]
+                d = np.linalg.norm(self.points[idx] - target, axis=1)
+                found.append(idx[d <= chord])
+            else:
+                stack.extend((left, right))
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> List[Tuple[str, float]]:
+        """k nearest airports as (iata, km), closest first"""
+        target = to_unit_vectors(lat, lon)
+        best = []  # max-heap of (-chord, position)
+        pq = [(0.0, 0)] if len(self.codes) else []
+
+        while pq:
+            bound, node = heapq.heappop(pq)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            left, right = self.children[node]
+            if left == -1:
+                start, end = self.spans[node]
+                idx = self.order[start:end]
+                for i, d in zip(idx, np.linalg.norm(self.points[idx] - target, axis=1)):
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, int(i)))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, int(i)))
+            else:
+                for child in (left, right):
+                    lower = max(np.linalg.norm(self.centers[child] - target) - self.radii[child], 0.0)
+                    heapq.heappush(pq, (lower, child))
+
+        best.sort(reverse=True)
+        return [(self.codes[i], float(chord_to_km(-d))) for d, i in best]
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Tuple[str, float]]:
+        """Airports within radius_km as (iata, km), closest first"""
+        target = to_unit_vectors(lat, lon)
+        idx = self._search(target, km_to_chord(radius_km))
+        km = chord_to_km(np.linalg.norm(self.points[idx] - target, axis=1))
+        order = np.argsort(km)
+        return [(self.codes[idx[i]], float(km[i])) for i in order]
+
+    def within_bbox(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> List[str]:
+        """Airports inside a lat/lon box; min_lon > max_lon means the box crosses the antimeridian"""
+        width = (max_lon - min_lon) % 360 or (360 if max_lon != min_lon else 0)
+        center_lon = min_lon + width / 2
+        center_lat = (min_lat + max_lat) / 2
+
+        # Cap around the box centre that contains all of its corners and edge midpoints
+        target = to_unit_vectors(center_lat, center_lon)
+        lats = np.array([min_lat, min_lat, max_lat, max_lat, min_lat, max_lat, center_lat, center_lat])
+        lons = np.array([min_lon, max_lon, min_lon, max_lon, center_lon, center_lon, min_lon, max_lon])
+        chord = np.linalg.norm(to_unit_vectors(lats, lons) - target, axis=1).max()
+        if width > 180 or min_lat <= -90 or max_lat >= 90:
+            chord = 2.0
+
+        idx = self._search(target, chord)
+        lat_ok = (self.lat[idx] >= min_lat) & (self.lat[idx] <= max_lat)
+        lon_ok = ((self.lon[idx] - min_lon) % 360) <= width
+        return sorted(self.codes[i] for i in idx[lat_ok & lon_ok])
+
+
+def route_between_areas(graph, index: AirportIndex, origin: Tuple[float, float],
+                        destination: Tuple[float, float], radius_km: float = 150,
+                        weight: str = 'distance') -> PathfindingResult:
+    """
+    Multi-airport routing - any airport within radius_km of origin to any
+    airport within radius_km of destination (e.g. all London airports)
+    One multi-source Dijkstra seeded with every origin airport, stopped at
+    the first destination airport settled.
+    """
+    start_time = time.time()
+
+    cg = compile_graph(graph)
+    origins = [code for code, _ in index.within_radius(*origin, radius_km) if code in cg.node_index]
+    targets = [code for code, _ in index.within_radius(*destination, radius_km) if code in cg.node_index]
+
+    if not origins or not targets:
+        return PathfindingResult([], float('inf'), time.time() - start_time, {})
+
+    source_idx = [cg.node_index[code] for code in origins]
+    dist, pred_edge, reached = multi_source_search(
+        cg, weight, source_idx, {cg.node_index[code] for code in targets}
+    )
+
+    if reached is None:
+        return PathfindingResult([], float('inf'), time.time() - start_time, {})
+
+    # Walk back to whichever origin seeded this branch
+    path_idx = path_from_tree(cg, pred_edge, None, reached)
+    path = [cg.nodes[i] for i in path_idx]
+    execution_time = time.time() - start_time
+
+    details = {
+        'optimization_target': f"Shortest {weight} (multi-airport)",
+        'algorithm_type': 'Multi-Source Dijkstra',
+        'origin_airports': origins,
+        'destination_airports': targets,
+        'radius_km': radius_km
+    }
+    details.update(route_totals(graph, path))
+
+    return PathfindingResult(path, dist[reached], execution_time, details)
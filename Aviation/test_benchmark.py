@@ -0,0 +1,18 @@
+"""
+Serial reference check of the Floyd-Warshall speedup benchmark
+
+    python -m pytest test_benchmark.py
+"""
+import numpy as np
+
+from benchmark import SERIAL_CHECK_PAIRS, run_floyd_warshall_speedup
+
+
+def test_serial_check_skips_self_pairs():
+    # Drawing both ends independently gives i == j pairs for this seed
+    pairs = np.random.default_rng(4).integers(0, 30, size=(SERIAL_CHECK_PAIRS, 2))
+    assert (pairs[:, 0] == pairs[:, 1]).any()
+
+    df = run_floyd_warshall_speedup([30], [1], seed=4)
+    assert list(df['nodes']) == [30]
+    assert list(df['speedup']) == [1.0]
@@ -0,0 +1,228 @@
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from aviation_algorithms import PathfindingResult
+from data_loader import haversine_distance
+
+CRUISE_SPEED_KMH = 800
+DEFAULT_MIN_CONNECTION_HOURS = 1.0
+
+
+def generate_flight_schedule(airports_df, routes_df, days: int = 1, min_daily: int = 1,
+                             max_daily: int = 6, seed: int = 42) -> pd.DataFrame:
+    """
+    Synthetic timetable for offline benchmarking
+    Every route in routes_df is flown in both directions, like
+    build_network_graph. Each direction gets a list of scheduled departures
+    (hours from the start of day 0, rounded to 5 minutes) repeated daily.
+    """
+    rng = np.random.default_rng(seed)
+    coords = airports_df.set_index('iata')[['lat', 'lon']]
+    rows = []
+
+    for _, route in routes_df.iterrows():
+        for src, dst in ((route['source_airport'], route['dest_airport']),
+                         (route['dest_airport'], route['source_airport'])):
+            if src not in coords.index or dst not in coords.index:
+                continue
+
+            distance = haversine_distance(coords.at[src, 'lat'], coords.at[src, 'lon'],
+                                          coords.at[dst, 'lat'], coords.at[dst, 'lon'])
+            daily = rng.integers(min_daily, max_daily + 1)
+            slots = np.sort(np.round(rng.uniform(5, 23, daily) * 12) / 12)
+            departures = [day * 24 + slot for day in range(days) for slot in slots]
+
+            rows.append({
+                'source_airport': src,
+                'dest_airport': dst,
+                'flight_time': round(distance / CRUISE_SPEED_KMH, 2),
+                'departures': departures
+            })
+
+    return pd.DataFrame(rows)
+
+
+class Timetable:
+    """
+    Scheduled connections stored as one departure-sorted array
+    Each connection is a single flight leg: (dep_stop, arr_stop, dep_time,
+    arr_time). Transfers at an airport need its minimum connection time.
+    """
+
+    def __init__(self, stops: List[str], dep_stop: np.ndarray, arr_stop: np.ndarray,
+                 dep_time: np.ndarray, arr_time: np.ndarray, min_connection: np.ndarray):
+        order = np.argsort(dep_time, kind='stable')
+        self.stops = list(stops)
+        self.stop_index = {stop: i for i, stop in enumerate(self.stops)}
+        self.dep_stop = dep_stop[order]
+        self.arr_stop = arr_stop[order]
+        self.dep_time = dep_time[order]
+        self.arr_time = arr_time[order]
+        self.min_connection = min_connection
+
+    def __len__(self):
+        return len(self.dep_time)
+
+
+def build_timetable(schedule_df, min_connection: Optional[Dict[str, float]] = None,
+                    default_connection: float = DEFAULT_MIN_CONNECTION_HOURS) -> Timetable:
+    """Flatten a schedule (one row per directed route with a departures list) into a Timetable"""
+    stops = sorted(set(schedule_df['source_airport']) | set(schedule_df['dest_airport']))
+    stop_index = {stop: i for i, stop in enumerate(stops)}
+
+    dep_stop, arr_stop, dep_time, arr_time = [], [], [], []
+    for _, route in schedule_df.iterrows():
+        src = stop_index[route['source_airport']]
+        dst = stop_index[route['dest_airport']]
+        for dep in route['departures']:
+            dep_stop.append(src)
+            arr_stop.append(dst)
+            dep_time.append(dep)
+            arr_time.append(dep + route['flight_time'])
+
+    mct = np.full(len(stops), default_connection, dtype=np.float64)
+    for stop, hours in (min_connection or {}).items():
+        if stop in stop_index:
+            mct[stop_index[stop]] = hours
+
+    return Timetable(
+        stops,
+        np.array(dep_stop, dtype=np.int32),
+        np.array(arr_stop, dtype=np.int32),
+        np.array(dep_time, dtype=np.float64),
+        np.array(arr_time, dtype=np.float64),
+        mct
+    )
+
+
+def csa_earliest_arrival(timetable: Timetable, source: str, destination: str,
+                         departure_time: float = 0.0) -> PathfindingResult:
+    """
+    Connection Scan Algorithm - EARLIEST ARRIVAL
+    Single linear sweep over the departure-sorted connections, starting at
+    the first departure after departure_time and stopping once departures
+    are later than the best known arrival at the destination.
+    Time Complexity: O(C) for C connections
+    Space Complexity: O(S) for S airports
+    """
+    start_time = time.time()
+
+    s = timetable.stop_index[source]
+    t = timetable.stop_index[destination]
+    inf = float('inf')
+    n = len(timetable.stops)
+
+    arrival = [inf] * n
+    ready = [inf] * n  # earliest time a connection may depart from the stop
+    in_connection = [-1] * n
+    arrival[s] = departure_time
+    ready[s] = departure_time
+
+    dep_stop = timetable.dep_stop.tolist()
+    arr_stop = timetable.arr_stop.tolist()
+    dep_times = timetable.dep_time.tolist()
+    arr_times = timetable.arr_time.tolist()
+    mct = timetable.min_connection.tolist()
+
+    first = int(np.searchsorted(timetable.dep_time, departure_time, side='left'))
+    scanned = 0
+
+    for c in range(first, len(dep_times)):
+        dep = dep_times[c]
+        if dep > arrival[t]:
+            break
+        scanned += 1
+
+        u = dep_stop[c]
+        if ready[u] <= dep:
+            v = arr_stop[c]
+            arr = arr_times[c]
+            if arr < arrival[v]:
+                arrival[v] = arr
+                ready[v] = arr + mct[v]
+                in_connection[v] = c
+
+    legs = []
+    if arrival[t] < inf and s != t:
+        stop = t
+        while stop != s:
+            c = in_connection[stop]
+            legs.append(c)
+            stop = dep_stop[c]
+        legs.reverse()
+
+    path = []
+    if legs or s == t:
+        path = [source] + [timetable.stops[arr_stop[c]] for c in legs]
+    execution_time = time.time() - start_time
+
+    details = {
+        'optimization_target': 'Earliest Arrival',
+        'algorithm_type': 'Connection Scan (Timetable)',
+        'connections_scanned': scanned,
+        'departure_time': round(dep_times[legs[0]], 2) if legs else departure_time,
+        'arrival_time': round(arrival[t], 2),
+        'legs': [
+            {
+                'from': timetable.stops[dep_stop[c]],
+                'to': timetable.stops[arr_stop[c]],
+                'departure': round(dep_times[c], 2),
+                'arrival': round(arr_times[c], 2)
+            }
+            for c in legs
+        ],
+        'hops': len(legs)
+    }
+
+    return PathfindingResult(path, arrival[t], execution_time, details)
+
+
+def csa_profile(timetable: Timetable, source: str, destination: str,
+                window: Tuple[float, float] = (0.0, float('inf'))) -> List[Tuple[float, float]]:
+    """
+    Connection Scan profile query
+    One backward sweep over the connections gives, for every departure from
+    source inside the window, the earliest reachable arrival at destination.
+    Returns the Pareto-optimal (departure, arrival) pairs, latest departure first.
+    Time Complexity: O(C log C)
+    """
+    s = timetable.stop_index[source]
+    t = timetable.stop_index[destination]
+    inf = float('inf')
+    n = len(timetable.stops)
+
+    # Per stop: negated departures (ascending) and matching best arrivals at destination
+    profile_dep = [[] for _ in range(n)]
+    profile_arr = [[] for _ in range(n)]
+
+    dep_stop = timetable.dep_stop.tolist()
+    arr_stop = timetable.arr_stop.tolist()
+    dep_times = timetable.dep_time.tolist()
+    arr_times = timetable.arr_time.tolist()
+    mct = timetable.min_connection.tolist()
+
+    lo = int(np.searchsorted(timetable.dep_time, window[0], side='left'))
+
+    # Connections departing after the window still serve as onward legs
+    for c in range(len(dep_times) - 1, lo - 1, -1):
+        v = arr_stop[c]
+        if v == t:
+            best = arr_times[c]
+        else:
+            ready = arr_times[c] + mct[v]
+            idx = bisect_right(profile_dep[v], -ready) - 1
+            best = profile_arr[v][idx] if idx >= 0 else inf
+
+        if best == inf:
+            continue
+
+        u = dep_stop[c]
+        if not profile_arr[u] or best < profile_arr[u][-1]:
+            profile_dep[u].append(-dep_times[c])
+            profile_arr[u].append(best)
+
+    return [(-d, a) for d, a in zip(profile_dep[s], profile_arr[s]) if -d <= window[1]]
@@ -0,0 +1,209 @@
+"""
+Lightweight span tracing for request latency
+
+A span times one stage of a request (load, plan, solve per algorithm,
+table, charts, map build, map serialisation). Spans nest per thread, so
+every Streamlit session builds its own trace tree; a trace is finished
+when its root span closes. For each stage name the tracer keeps a rolling
+window of the last durations, from which p50/p95/p99 and histograms are
+read. Finished traces are kept for JSON-lines export and, with log_path
+(AVIATION_TRACE_LOG in the app), appended to a file as they complete.
+
+    python tracing.py aviation_traces.jsonl
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Durations kept per stage for the percentiles
+ROLLING_WINDOW = 1000
+# Finished spans kept in memory for export
+MAX_EXPORTED_SPANS = 20000
+
+PERCENTILES = (50, 95, 99)
+
+
+class Span:
+    """One timed stage; attributes may be added while the span is open"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_time': round(self.start_time, 6),
+            'duration_ms': round(self.duration_ms, 4),
+            'attributes': self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Thread-safe tracer
+    The open-span stack is thread-local; the rolling latency windows and
+    the finished spans are shared and guarded by one lock.
+    """
+
+    def __init__(self, window: int = ROLLING_WINDOW, max_spans: int = MAX_EXPORTED_SPANS,
+                 log_path: Optional[str] = None):
+        self.window = window
+        self.log_path = log_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._finished = deque(maxlen=max_spans)
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+            self._local.trace = []
+        return self._local.stack
+
+    def start(self, name: str, **attributes) -> Span:
+        """Open a span under the current one (a new trace if none is open)"""
+        stack = self._stack()
+        if stack:
+            span = Span(name, stack[-1].trace_id, stack[-1].span_id, attributes)
+        else:
+            span = Span(name, uuid.uuid4().hex[:16], None, attributes)
+            self._local.trace = []
+        stack.append(span)
+        return span
+
+    def start_trace(self, name: str, **attributes) -> Span:
+        """
+        Open a root span, dropping spans left open on this thread
+        (a Streamlit rerun or stop interrupts the previous script run)
+        """
+        self._stack().clear()
+        return self.start(name, **attributes)
+
+    def finish(self, span: Span):
+        """Close span (and any children still open); records the trace when it is the root"""
+        span.duration_ms = (time.perf_counter() - span._start) * 1000
+        stack = self._stack()
+        if span not in stack:
+            return
+        while stack:
+            if stack.pop() is span:
+                break
+
+        trace = self._local.trace
+        trace.append(span)
+        with self._lock:
+            latencies = self._latencies.get(span.name)
+            if latencies is None:
+                latencies = self._latencies[span.name] = deque(maxlen=self.window)
+            latencies.append(span.duration_ms)
+
+            if span.parent_id is None:
+                self._finished.extend(trace)
+                if self.log_path:
+                    with open(self.log_path, 'a') as f:
+                        f.write(''.join(json.dumps(s.to_dict()) + '\n' for s in trace))
+        if span.parent_id is None:
+            self._local.trace = []
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        span = self.start(name, **attributes)
+        try:
+            yield span
+        finally:
+            self.finish(span)
+
+    def percentiles(self) -> List[Dict]:
+        """count / mean / p50 / p95 / p99 / max (ms) per stage over the rolling window"""
+        with self._lock:
+            windows = {name: np.array(values) for name, values in self._latencies.items()}
+
+        rows = []
+        for name, values in sorted(windows.items()):
+            row = {'stage': name, 'count': len(values), 'mean_ms': round(float(values.mean()), 2)}
+            for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                row[f'p{p}_ms'] = round(float(value), 2)
+            row['max_ms'] = round(float(values.max()), 2)
+            rows.append(row)
+        return rows
+
+    def histogram(self, name: str, bins: int = 20):
+        """(counts, bin edges in ms) of the rolling window for one stage"""
+        with self._lock:
+            values = np.array(self._latencies.get(name, ()))
+        return np.histogram(values, bins=bins)
+
+    def to_jsonl(self) -> str:
+        """Finished spans as JSON lines (one span per line)"""
+        with self._lock:
+            spans = list(self._finished)
+        return ''.join(json.dumps(span.to_dict()) + '\n' for span in spans)
+
+    def export_jsonl(self, path: str) -> int:
+        """Write finished spans to path; returns the number of spans written"""
+        text = self.to_jsonl()
+        with open(path, 'w') as f:
+            f.write(text)
+        return text.count('\n')
+
+    def clear(self):
+        with self._lock:
+            self._latencies.clear()
+            self._finished.clear()
+
+
+# Process-wide tracer used by the solvers and the app
+TRACER = Tracer(log_path=os.environ.get('AVIATION_TRACE_LOG') or None)
+
+
+def span(name: str, **attributes):
+    """TRACER.span - time a stage under the current request"""
+    return TRACER.span(name, **attributes)
+
+
+def load_jsonl(path: str) -> List[Dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize_spans(spans: Iterable[Dict]) -> List[Dict]:
+    """Per-stage percentiles of exported spans (offline counterpart of Tracer.percentiles)"""
+    tracer = Tracer(window=None)
+    for record in spans:
+        tracer._latencies.setdefault(record['name'], deque()).append(record['duration_ms'])
+    return tracer.percentiles()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise exported request traces")
+    parser.add_argument('path', help="JSON-lines trace export")
+    args = parser.parse_args()
+
+    spans = load_jsonl(args.path)
+    traces = len(set(span['trace_id'] for span in spans))
+    print(f"{len(spans):,} spans in {traces:,} traces")
+    for row in summarize_spans(spans):
+        print(f"{row['stage']:<28} n={row['count']:<6} p50={row['p50_ms']:>10.2f} ms  "
+              f"p95={row['p95_ms']:>10.2f} ms  p99={row['p99_ms']:>10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
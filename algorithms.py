@@ -1,9 +1,21 @@
 import heapq
 import copy
 
+import numpy as np
+
+from delta_stepping import delta_stepping
+from jit_kernels import bellman_ford_kernel, dijkstra_kernel, floyd_warshall_kernel, use_numba
+from network import edge_arrays
+
+
+def dijkstra(graph, source, backend="python"):
+    """
+    Dijkstra's algorithm - works on directed/undirected graphs with non-negative weights
+    backend="numba" runs the compiled kernel when Numba is installed.
+    """
+    if use_numba(backend):
+        return _dijkstra_numba(graph, source)
 
-def dijkstra(graph, source):
-    """Dijkstra's algorithm - works on directed/undirected graphs with non-negative weights"""
     dist = {n: float("inf") for n in graph.nodes}
     prev = {}
     dist[source] = 0
@@ -27,8 +39,11 @@ def dijkstra(graph, source):
     return dist, prev
 
 
-def bellman_ford(graph, source):
+def bellman_ford(graph, source, backend="python"):
     """Bellman-Ford algorithm - works with negative weights, detects negative cycles"""
+    if use_numba(backend):
+        return _bellman_ford_numba(graph, source)
+
     dist = {n: float("inf") for n in graph.nodes}
     prev = {}
     dist[source] = 0
@@ -50,8 +65,11 @@ def bellman_ford(graph, source):
     return dist, prev
 
 
-def floyd_warshall(graph):
+def floyd_warshall(graph, backend="python"):
     """Floyd-Warshall algorithm - computes all-pairs shortest paths"""
+    if use_numba(backend):
+        return _floyd_warshall_numba(graph)
+
     nodes = list(graph.nodes)
     dist = {i: {j: float("inf") for j in nodes} for i in nodes}
     next_node = {i: {j: None for j in nodes} for i in nodes}
@@ -72,4 +90,206 @@ def floyd_warshall(graph):
                     dist[i][j] = dist[i][k] + dist[k][j]
                     next_node[i][j] = next_node[i][k]
 
-    return dist, next_node
\ No newline at end of file
+    return dist, next_node
+
+
+def _dijkstra_numba(graph, source):
+    """dijkstra() through the compiled kernel (same heap order, so same prev)"""
+    # dijkstra() follows graph.neighbors(), i.e. undirected edges both ways
+    nodes, src, dst, weights = edge_arrays(graph, both_directions=True)
+    # Index nodes in sorted order so the kernel's (distance, index) heap
+    # breaks ties like the reference (distance, name) heap
+    order = sorted(range(len(nodes)), key=nodes.__getitem__)
+    rank = np.empty(len(nodes), dtype=np.int64)
+    rank[order] = np.arange(len(nodes))
+    src, dst = rank[src], rank[dst]
+    edges = np.argsort(src, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=len(nodes))))).astype(np.int64)
+    names = [nodes[i] for i in order]
+
+    dist_arr, pred_edge, _ = dijkstra_kernel(indptr, dst[edges], weights[edges], int(rank[nodes.index(source)]), -1)
+    dist = dict(zip(names, dist_arr.tolist()))
+    prev = {names[v]: names[src[edges[e]]] for v, e in enumerate(pred_edge.tolist()) if e != -1}
+    return dist, prev
+
+
+def _bellman_ford_numba(graph, source):
+    nodes, src, dst, weights = edge_arrays(graph)
+    dist_arr, pred, _, negative_cycle = bellman_ford_kernel(len(nodes), src, dst, weights, nodes.index(source))
+    if negative_cycle:
+        raise ValueError("Graph contains a negative-weight cycle")
+    dist = dict(zip(nodes, dist_arr.tolist()))
+    prev = {nodes[v]: nodes[u] for v, u in enumerate(pred.tolist()) if u != -1}
+    return dist, prev
+
+
+def _floyd_warshall_numba(graph):
+    nodes, src, dst, weights = edge_arrays(graph)
+    n = len(nodes)
+    dist_arr = np.full((n, n), np.inf)
+    next_arr = np.full((n, n), -1, dtype=np.int64)
+    np.fill_diagonal(dist_arr, 0.0)
+    dist_arr[src, dst] = weights
+    next_arr[src, dst] = dst
+    dist_arr, next_arr = floyd_warshall_kernel(dist_arr, next_arr)
+
+    dist = {u: dict(zip(nodes, row)) for u, row in zip(nodes, dist_arr.tolist())}
+    next_node = {u: {v: nodes[j] if j != -1 else None for v, j in zip(nodes, row)}
+                 for u, row in zip(nodes, next_arr.tolist())}
+    return dist, next_node
+
+
+def integer_weights(graph, weight="distance", max_scale=1000):
+    """
+    (scale, max scaled weight) for integer priority queues, or None
+    scale is the smallest power of ten up to max_scale that turns every
+    weight into a non-negative integer (1 for integral weights).
+    """
+    weights = [data[weight] for _, _, data in graph.edges(data=True)]
+    if any(w < 0 for w in weights):
+        return None
+
+    scale = 1
+    while scale <= max_scale:
+        if all(abs(w * scale - round(w * scale)) < 1e-9 for w in weights):
+            return scale, int(round(max(weights, default=0) * scale))
+        scale *= 10
+    return None
+
+
+def _require_integer_weights(graph, weight):
+    scaled = integer_weights(graph, weight)
+    if scaled is None:
+        raise ValueError(f"Edge weight '{weight}' is negative or cannot be scaled to integers")
+    return scaled
+
+
+def dial_dijkstra(graph, source, weight="distance", stats=None):
+    """
+    Dijkstra with Dial's bucket queue - integer (or scalable) weights only
+    Circular array of max_weight + 1 buckets indexed by distance; each
+    bucket is a set, so a decrease-key moves the node instead of leaving a
+    stale entry behind. Time Complexity: O(V + E + D) for max distance D.
+    stats (optional dict) receives bucket_scans and decrease_keys.
+    """
+    scale, max_weight = _require_integer_weights(graph, weight)
+    n_buckets = max_weight + 1
+    buckets = [set() for _ in range(n_buckets)]
+
+    int_dist = {source: 0}
+    prev = {}
+    settled = set()
+    buckets[0].add(source)
+    queued = 1
+    position = 0
+    bucket_scans = 0
+    decrease_keys = 0
+
+    while queued:
+        bucket = buckets[position % n_buckets]
+        bucket_scans += 1
+        while bucket:
+            u = bucket.pop()
+            queued -= 1
+            settled.add(u)
+            du = int_dist[u]
+
+            for v in graph.neighbors(u):
+                if v in settled:
+                    continue
+                w = graph[u][v][weight]
+                nd = du + int(round(w * scale))
+                old = int_dist.get(v)
+                if old is None or nd < old:
+                    if old is None:
+                        queued += 1
+                    else:
+                        buckets[old % n_buckets].discard(v)
+                        decrease_keys += 1
+                    int_dist[v] = nd
+                    prev[v] = u
+                    buckets[nd % n_buckets].add(v)
+        position += 1
+
+    if stats is not None:
+        stats.update(bucket_scans=bucket_scans, decrease_keys=decrease_keys, scale=scale)
+
+    dist = {n: float("inf") for n in graph.nodes}
+    for node, d in int_dist.items():
+        dist[node] = d / scale if scale != 1 else d
+    return dist, prev
+
+
+def radix_heap_dijkstra(graph, source, weight="distance", stats=None):
+    """
+    Dijkstra with a radix heap - integer (or scalable) weights only
+    Bucket i holds keys whose highest bit differing from the last popped
+    key is bit i - 1. Popping refills bucket 0 by redistributing the first
+    non-empty bucket, so every key moves at most log2(D) times.
+    Time Complexity: O(E + V log D) for max distance D.
+    stats (optional dict) receives bucket_scans, redistributed and stale_pops.
+    """
+    scale, _ = _require_integer_weights(graph, weight)
+
+    buckets = [[] for _ in range(65)]
+    last = 0
+    size = 1
+    buckets[0].append((0, source))
+
+    int_dist = {source: 0}
+    prev = {}
+    settled = set()
+    bucket_scans = 0
+    redistributed = 0
+    stale_pops = 0
+
+    while size:
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            bucket_scans += i
+            items = buckets[i]
+            buckets[i] = []
+            last = min(key for key, _ in items)
+            for key, node in items:
+                buckets[(key ^ last).bit_length()].append((key, node))
+            redistributed += len(items)
+
+        key, u = buckets[0].pop()
+        size -= 1
+        if u in settled or key > int_dist[u]:
+            stale_pops += 1
+            continue
+        settled.add(u)
+
+        for v in graph.neighbors(u):
+            if v in settled:
+                continue
+            w = graph[u][v][weight]
+            nd = key + int(round(w * scale))
+            old = int_dist.get(v)
+            if old is None or nd < old:
+                int_dist[v] = nd
+                prev[v] = u
+                buckets[(nd ^ last).bit_length()].append((nd, v))
+                size += 1
+
+    if stats is not None:
+        stats.update(bucket_scans=bucket_scans, redistributed=redistributed,
+                     stale_pops=stale_pops, scale=scale)
+
+    dist = {n: float("inf") for n in graph.nodes}
+    for node, d in int_dist.items():
+        dist[node] = d / scale if scale != 1 else d
+    return dist, prev
+
+
+# Priority queue used by Dijkstra; "dial" and "radix" need integer (or scalable) weights,
+# "delta" is bucketed delta-stepping with batched NumPy relaxation
+DIJKSTRA_ENGINES = {
+    "heap": dijkstra,
+    "dial": dial_dijkstra,
+    "radix": radix_heap_dijkstra,
+    "delta": delta_stepping,
+}
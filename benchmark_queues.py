@@ -0,0 +1,123 @@
+"""
+Binary heap vs bucket-queue Dijkstra on generated road networks
+
+    python benchmark_queues.py --sizes 1000 10000 100000
+    python benchmark_queues.py --sizes 100000 --deltas 30 120 480 2000 --workers 4
+
+With --deltas the sizes are instead swept over delta-stepping bucket
+widths (0 = the default width), each checked against the binary heap.
+Delta-stepping times exclude the one-off edge list conversion, which is
+reported separately as convert_ms.
+"""
+import argparse
+import random
+import time
+
+from algorithms import DIJKSTRA_ENGINES
+from delta_stepping import delta_stepping_arrays
+from network import edge_arrays, generate_road_network
+
+
+def time_engine(engine, graph, sources, repeats):
+    """Best-of-repeats seconds over all sources, queue stats summed over sources, distances"""
+    best = float("inf")
+    for _ in range(repeats):
+        stats = {}
+        results = []
+        start = time.perf_counter()
+        for source in sources:
+            if engine is DIJKSTRA_ENGINES["heap"]:
+                results.append(engine(graph, source)[0])
+                continue
+            run_stats = {}
+            results.append(engine(graph, source, "distance", run_stats)[0])
+            stats["bucket_scans"] = stats.get("bucket_scans", 0) + run_stats["bucket_scans"]
+        best = min(best, time.perf_counter() - start)
+    return best, stats, results
+
+
+def run_benchmark(sizes, queries=5, repeats=3, seed=42):
+    rows = []
+    for size in sizes:
+        graph = generate_road_network(size, seed=seed)
+        sources = random.Random(seed).sample(list(graph.nodes), min(queries, size))
+
+        heap_time, _, reference = time_engine(DIJKSTRA_ENGINES["heap"], graph, sources, repeats)
+        row = {"nodes": size, "edges": graph.number_of_edges(), "heap_ms": round(heap_time * 1000, 2)}
+
+        for name in ("dial", "radix"):
+            elapsed, stats, results = time_engine(DIJKSTRA_ENGINES[name], graph, sources, repeats)
+            if results != reference:
+                raise ValueError(f"{name} distances differ from the binary heap")
+            row[f"{name}_ms"] = round(elapsed * 1000, 2)
+            row[f"{name}_speedup"] = round(heap_time / elapsed, 2) if elapsed > 0 else None
+            row[f"{name}_bucket_scans"] = stats["bucket_scans"] // len(sources)
+
+        rows.append(row)
+        print(row)
+    return rows
+
+
+def run_delta_benchmark(sizes, deltas, queries=5, repeats=3, seed=42, workers=1):
+    rows = []
+    for size in sizes:
+        graph = generate_road_network(size, seed=seed)
+        sources = random.Random(seed).sample(list(graph.nodes), min(queries, size))
+        heap_time, _, reference = time_engine(DIJKSTRA_ENGINES["heap"], graph, sources, repeats)
+
+        start = time.perf_counter()
+        nodes, src, dst, weights = edge_arrays(graph)
+        convert_time = time.perf_counter() - start
+        index = {node: i for i, node in enumerate(nodes)}
+
+        for delta in deltas:
+            best = float("inf")
+            for _ in range(repeats):
+                stats = {}
+                results = []
+                start = time.perf_counter()
+                for source in sources:
+                    run_stats = {}
+                    results.append(delta_stepping_arrays(len(nodes), src, dst, weights, index[source],
+                                                         delta, workers, run_stats)[0])
+                    for key in ("bucket_scans", "phases", "relaxations"):
+                        stats[key] = stats.get(key, 0) + run_stats[key]
+                best = min(best, time.perf_counter() - start)
+
+            for dist, expected in zip(results, reference):
+                if dict(zip(nodes, dist.tolist())) != expected:
+                    raise ValueError(f"delta-stepping (delta={run_stats['delta']:g}) differs from the binary heap")
+
+            row = {
+                "nodes": size,
+                "delta": round(run_stats["delta"], 2),
+                "workers": workers,
+                "heap_ms": round(heap_time * 1000, 2),
+                "convert_ms": round(convert_time * 1000, 2),
+                "delta_ms": round(best * 1000, 2),
+                "speedup": round(heap_time / best, 2) if best > 0 else None,
+                **{key: value // len(sources) for key, value in stats.items()},
+            }
+            rows.append(row)
+            print(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Dijkstra priority queues on road networks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=5, help="single-source runs per size")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--deltas", type=float, nargs="+", help="sweep delta-stepping bucket widths instead")
+    parser.add_argument("--workers", type=int, default=1, help="delta-stepping processes")
+    args = parser.parse_args()
+
+    if args.deltas:
+        run_delta_benchmark(args.sizes, args.deltas, args.queries, args.repeats, args.seed, args.workers)
+    else:
+        run_benchmark(args.sizes, args.queries, args.repeats, args.seed)
+
+
+if __name__ == "__main__":
+    main()
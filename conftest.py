@@ -0,0 +1,5 @@
+# The root app and Aviation/ both import flat modules with clashing names
+# (planner, jit_kernels), so each app's tests run from its own directory:
+#     python -m pytest               # root app
+#     cd Aviation && python -m pytest
+collect_ignore = ["Aviation"]
@@ -0,0 +1,220 @@
+"""
+Delta-stepping single-source shortest paths (Meyer & Sanders)
+
+Nodes are grouped into buckets of width delta by tentative distance.
+Edges of weight <= delta are light, the rest heavy. The lowest non-empty
+bucket is settled by relaxing the light edges of its whole frontier at
+once, repeating while that re-fills the bucket, and then relaxing the
+heavy edges of every node it settled (heavy edges can never land in the
+same bucket). Each relaxation round is one batch of NumPy array
+operations over all frontier edges instead of one heap operation per
+edge.
+
+delta trades the two extremes: a tiny delta is Dijkstra (one distance per
+bucket, many rounds), a huge one is Bellman-Ford (one bucket, repeated
+relaxation). With workers > 1 the edge batches of large rounds are split
+over a process pool that reads the CSR arrays and the distance array from
+shared memory; the parent merges the proposals and writes the distances.
+"""
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from network import edge_arrays
+
+# Rounds with fewer frontier edges than this stay in the parent process
+PARALLEL_MIN_EDGES = 50_000
+
+# Worker-side views of the shared CSR and distance arrays
+_shared = {}
+
+
+def default_delta(weights, n_nodes):
+    """Max weight / average out-degree (Meyer & Sanders), at least the smallest positive weight"""
+    if len(weights) == 0:
+        return 1.0
+    degree = len(weights) / max(n_nodes, 1)
+    positive = weights[weights > 0]
+    floor = positive.min() if len(positive) else 1.0
+    return float(max(weights.max() / max(degree, 1.0), floor))
+
+
+def _csr(n, src, dst, weights):
+    order = np.argsort(src, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=n)))).astype(np.int64)
+    return indptr, dst[order], weights[order]
+
+
+def _expand(indptr, nodes):
+    """(source node, edge id) of every outgoing edge of nodes"""
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return np.repeat(nodes, counts), offsets
+
+
+def _proposals(indptr, targets, weights, dist, nodes):
+    """Best (target, distance, parent) per target over the edges of nodes that improve dist"""
+    parents, edges = _expand(indptr, nodes)
+    v = targets[edges]
+    nd = dist[parents] + weights[edges]
+    better = nd < dist[v]
+    v, nd, parents = v[better], nd[better], parents[better]
+    order = np.lexsort((nd, v))
+    v, nd, parents = v[order], nd[order], parents[order]
+    first = np.ones(len(v), dtype=bool)
+    first[1:] = v[1:] != v[:-1]
+    return v[first], nd[first], parents[first]
+
+
+def _attach(specs):
+    for key, (name, shape, dtype) in specs.items():
+        handle = shared_memory.SharedMemory(name=name)
+        _shared.setdefault("handles", []).append(handle)
+        _shared[key] = np.ndarray(shape, dtype=dtype, buffer=handle.buf)
+
+
+def _worker_proposals(task):
+    kind, nodes = task
+    return _proposals(_shared[f"{kind}_indptr"], _shared[f"{kind}_targets"], _shared[f"{kind}_weights"],
+                      _shared["dist"], nodes)
+
+
+class _Relaxer:
+    """Runs relaxation rounds in-process or, for large rounds, on the shared-memory pool"""
+
+    def __init__(self, csr, dist, workers):
+        self.csr = csr
+        self.dist = dist
+        self.workers = workers
+        self.pool = None
+        self.handles = []
+        if workers > 1:
+            specs = {}
+            for kind, arrays in csr.items():
+                for part, array in zip(("indptr", "targets", "weights"), arrays):
+                    specs[f"{kind}_{part}"] = self._share(array)
+            specs["dist"] = self._share(dist)
+            self.dist = np.ndarray(dist.shape, dtype=dist.dtype, buffer=self.handles[-1].buf)
+            self.pool = Pool(workers, initializer=_attach, initargs=(specs,))
+
+    def _share(self, array):
+        handle = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=handle.buf)[:] = array
+        self.handles.append(handle)
+        return handle.name, array.shape, array.dtype
+
+    def propose(self, kind, nodes):
+        indptr, targets, weights = self.csr[kind]
+        if self.pool is None or int((indptr[nodes + 1] - indptr[nodes]).sum()) < PARALLEL_MIN_EDGES:
+            return _proposals(indptr, targets, weights, self.dist, nodes)
+
+        chunks = np.array_split(nodes, self.workers)
+        parts = self.pool.map(_worker_proposals, [(kind, chunk) for chunk in chunks if len(chunk)])
+        v, nd, parents = (np.concatenate(column) for column in zip(*parts))
+        order = np.lexsort((nd, v))
+        v, nd, parents = v[order], nd[order], parents[order]
+        first = np.ones(len(v), dtype=bool)
+        first[1:] = v[1:] != v[:-1]
+        return v[first], nd[first], parents[first]
+
+    def close(self):
+        """Stop the pool and free the shared blocks; callers must drop their dist views first"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+        self.dist = None  # release the view before unmapping
+        for handle in self.handles:
+            try:
+                handle.close()
+            finally:
+                handle.unlink()
+
+
+def delta_stepping_arrays(n, src, dst, weights, source, delta=None, workers=1, stats=None):
+    """
+    Delta-stepping over an edge list (see network.edge_arrays)
+    Returns (dist, parent) arrays indexed by node, parent -1 for the
+    source and unreached nodes. workers > 1 starts a new process pool and
+    copies the graph into shared memory on every call, which only pays
+    off on large graphs (rounds of PARALLEL_MIN_EDGES edges or more);
+    leave workers=1 for small graphs and repeated queries.
+    """
+    if len(weights) and weights.min() < 0:
+        raise ValueError("Delta-stepping needs non-negative edge weights")
+    delta = float(delta) if delta else default_delta(weights, n)
+    workers = workers or os.cpu_count() or 1
+
+    light = weights <= delta
+    csr = {
+        "light": _csr(n, src[light], dst[light], weights[light]),
+        "heavy": _csr(n, src[~light], dst[~light], weights[~light]),
+    }
+
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    parent = np.full(n, -1, dtype=np.int64)
+    settled = np.zeros(n, dtype=bool)
+    pending = np.array([source], dtype=np.int64)  # reached but not settled
+    buckets = phases = relaxations = 0
+
+    relaxer = _Relaxer(csr, dist, workers)
+    dist = relaxer.dist
+    try:
+        while len(pending):
+            bucket = np.floor(dist[pending].min() / delta)
+            frontier = pending[np.floor(dist[pending] / delta) == bucket]
+            buckets += 1
+            bucket_nodes = []
+
+            while len(frontier):
+                phases += 1
+                bucket_nodes.append(frontier)
+                indptr = csr["light"][0]
+                relaxations += int((indptr[frontier + 1] - indptr[frontier]).sum())
+                v, nd, parents = relaxer.propose("light", frontier)
+                dist[v] = nd
+                parent[v] = parents
+                pending = np.concatenate((pending, v))
+                # Light edges re-fill the current bucket; those nodes go round again
+                frontier = v[np.floor(nd / delta) == bucket]
+
+            done = np.unique(np.concatenate(bucket_nodes))
+            settled[done] = True
+            indptr = csr["heavy"][0]
+            relaxations += int((indptr[done + 1] - indptr[done]).sum())
+            v, nd, parents = relaxer.propose("heavy", done)
+            dist[v] = nd
+            parent[v] = parents
+
+            pending = np.concatenate((pending, v))
+            pending = np.unique(pending[~settled[pending]])
+        result = dist.copy()
+    finally:
+        dist = None  # a live view of shared memory would make close() raise BufferError
+        relaxer.close()
+
+    if stats is not None:
+        stats.update(delta=delta, bucket_scans=buckets, phases=phases, relaxations=relaxations)
+    return result, parent
+
+
+def delta_stepping(graph, source, weight="distance", stats=None, delta=None, workers=1):
+    """
+    Delta-stepping SSSP - non-negative weights
+    Same (dist, prev) dicts as dijkstra(); delta defaults to default_delta().
+    workers > 1 relaxes large rounds on a shared-memory process pool
+    started per call, so it is meant for large graphs only.
+    stats (optional dict) receives delta, bucket_scans (buckets settled),
+    phases (relaxation rounds) and relaxations (edges relaxed).
+    """
+    nodes, src, dst, weights = edge_arrays(graph, weight, both_directions=True)
+    dist, parent = delta_stepping_arrays(len(nodes), src, dst, weights, nodes.index(source),
+                                         delta, workers, stats)
+    distances = dict(zip(nodes, dist.tolist()))
+    prev = {nodes[v]: nodes[u] for v, u in enumerate(parent.tolist()) if u != -1}
+    return distances, prev
@@ -1,5 +1,8 @@
 import time
-from algorithms import dijkstra, bellman_ford, floyd_warshall
+from algorithms import DIJKSTRA_ENGINES, bellman_ford, floyd_warshall
+from jit_kernels import use_numba
+from metrics import measure_memory
+from planner import MAX_PLAN_SECONDS, plan_evaluation
 
 
 def reconstruct_path(prev, src, dst):
@@ -33,44 +36,96 @@ def reconstruct_path_fw(next_node, src, dst):
     return path
 
 
-def evaluate_algorithms(graph, source, destination):
-    """Evaluate all three pathfinding algorithms"""
+def run_timed(func, args, profile_memory=False):
+    """Run func(*args), returning (output, seconds, memory stats or {})"""
+    start = time.time()
+    if profile_memory:
+        output, memory = measure_memory(func, *args)
+    else:
+        output, memory = func(*args), {}
+    return output, time.time() - start, memory
+
+
+def refused_result(step):
+    """Placeholder for an algorithm the planner refused to run"""
+    return {
+        "time": 0.0,
+        "path": [],
+        "distance": float('inf'),
+        "refused": True,
+        "estimated_seconds": step["estimated_seconds"],
+        "plan": step["plan"]
+    }
+
+
+def evaluate_algorithms(graph, source, destination, profile_memory=False, dijkstra_engine="heap",
+                        use_planner=False, max_seconds=MAX_PLAN_SECONDS, backend="python"):
+    """
+    Evaluate all three pathfinding algorithms (optionally with tracemalloc memory stats)
+    dijkstra_engine picks Dijkstra's priority queue: "heap", "dial", "radix" or
+    "delta" (delta-stepping; the integer bucket queues fall back to the heap
+    when distances are not integral);
+    with use_planner the planner picks the cheapest queue instead. Algorithms
+    estimated above max_seconds are refused rather than run, and every result
+    carries the planner's explanation under "plan". backend="numba" runs the
+    heap Dijkstra, Bellman-Ford and Floyd-Warshall as compiled kernels when
+    Numba is installed; each result records the backend that actually ran.
+    """
+    plan = plan_evaluation(graph, dijkstra_engine, use_planner, max_seconds=max_seconds)
+    kernel_backend = "numba" if use_numba(backend) else "python"
     results = {}
 
     # Dijkstra's Algorithm
-    start = time.time()
-    dist_d, prev_d = dijkstra(graph, source)
-    time_d = time.time() - start
-    path_d = reconstruct_path(prev_d, source, destination)
-
-    results["Dijkstra"] = {
-        "time": time_d,
-        "path": path_d if path_d else [],
-        "distance": dist_d.get(destination, float('inf'))
-    }
+    if plan["Dijkstra"]["feasible"]:
+        engine = plan["Dijkstra"]["engine"]
+        queue_stats = {}
+        args = (graph, source, backend) if engine == "heap" else (graph, source, "distance", queue_stats)
+        (dist_d, prev_d), time_d, mem_d = run_timed(DIJKSTRA_ENGINES[engine], args, profile_memory)
+        path_d = reconstruct_path(prev_d, source, destination)
+
+        results["Dijkstra"] = {
+            "time": time_d,
+            "path": path_d if path_d else [],
+            "distance": dist_d.get(destination, float('inf')),
+            "engine": engine,
+            "backend": kernel_backend if engine == "heap" else "python",
+            "plan": plan["Dijkstra"]["plan"],
+            **queue_stats,
+            **mem_d
+        }
+    else:
+        results["Dijkstra"] = refused_result(plan["Dijkstra"])
 
     # Bellman-Ford Algorithm
-    start = time.time()
-    dist_bf, prev_bf = bellman_ford(graph, source)
-    time_bf = time.time() - start
-    path_bf = reconstruct_path(prev_bf, source, destination)
-
-    results["Bellman-Ford"] = {
-        "time": time_bf,
-        "path": path_bf if path_bf else [],
-        "distance": dist_bf.get(destination, float('inf'))
-    }
+    if plan["Bellman-Ford"]["feasible"]:
+        (dist_bf, prev_bf), time_bf, mem_bf = run_timed(bellman_ford, (graph, source, backend), profile_memory)
+        path_bf = reconstruct_path(prev_bf, source, destination)
+
+        results["Bellman-Ford"] = {
+            "time": time_bf,
+            "path": path_bf if path_bf else [],
+            "distance": dist_bf.get(destination, float('inf')),
+            "backend": kernel_backend,
+            "plan": plan["Bellman-Ford"]["plan"],
+            **mem_bf
+        }
+    else:
+        results["Bellman-Ford"] = refused_result(plan["Bellman-Ford"])
 
     # Floyd-Warshall Algorithm
-    start = time.time()
-    dist_fw, next_fw = floyd_warshall(graph)
-    time_fw = time.time() - start
-    path_fw = reconstruct_path_fw(next_fw, source, destination)
-
-    results["Floyd-Warshall"] = {
-        "time": time_fw,
-        "path": path_fw if path_fw else [],
-        "distance": dist_fw[source][destination]
-    }
+    if plan["Floyd-Warshall"]["feasible"]:
+        (dist_fw, next_fw), time_fw, mem_fw = run_timed(floyd_warshall, (graph, backend), profile_memory)
+        path_fw = reconstruct_path_fw(next_fw, source, destination)
+
+        results["Floyd-Warshall"] = {
+            "time": time_fw,
+            "path": path_fw if path_fw else [],
+            "distance": dist_fw[source][destination],
+            "backend": kernel_backend,
+            "plan": plan["Floyd-Warshall"]["plan"],
+            **mem_fw
+        }
+    else:
+        results["Floyd-Warshall"] = refused_result(plan["Floyd-Warshall"])
 
-    return results
\ No newline at end of file
+    return results
@@ -3,18 +3,36 @@ import networkx as nx
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 
-from network import create_transport_network
+from network import create_transport_network, network_hash
 from evaluator import evaluate_algorithms
+from jit_kernels import NUMBA_AVAILABLE
 from metrics import calculate_metrics
+from simulation import simulate_travel_times
 
 st.set_page_config("Transport Network Optimization", layout="wide")
 st.title("🚦 Transport Network Optimization & Algorithm Comparison")
 
-# Create consistent network
-if 'graph' not in st.session_state:
-    st.session_state.graph = create_transport_network()
 
-graph = st.session_state.graph
+# Network, layout and results are shared by every session of this process;
+# sessions only hold references, so treat them as read-only
+@st.cache_resource
+def load_network():
+    graph = create_transport_network()
+    return graph, network_hash(graph)
+
+
+@st.cache_resource
+def network_layout(graph_key, _graph):
+    return nx.spring_layout(_graph, seed=42, k=2)
+
+
+@st.cache_resource(max_entries=1024)
+def shared_evaluation(graph_key, source, destination, dijkstra_engine, use_planner, backend, _graph):
+    return evaluate_algorithms(_graph, source, destination, dijkstra_engine=dijkstra_engine,
+                               use_planner=use_planner, backend=backend)
+
+
+graph, graph_key = load_network()
 cities = list(graph.nodes)
 
 col1, col2 = st.columns(2)
@@ -23,9 +41,31 @@ with col1:
 with col2:
     dst = st.selectbox("Destination City", cities, index=1 if len(cities) > 1 else 0)
 
+profile_memory = st.checkbox("🧠 Profile memory (tracemalloc)", value=False)
+dijkstra_engine = st.selectbox(
+    "⚙️ Dijkstra priority queue", ["heap", "dial", "radix", "delta"],
+    format_func={"heap": "Binary heap", "dial": "Dial buckets", "radix": "Radix heap",
+                 "delta": "Delta-stepping"}.get,
+    help="Dial and radix apply to integer kilometre distances; delta-stepping relaxes buckets in batches"
+)
+use_planner = st.checkbox("🧭 Let the planner pick the Dijkstra queue",
+                          help="Uses the cost model's cheapest priority queue for this network")
+use_jit = st.checkbox("⚡ JIT-compiled kernels (Numba)", disabled=not NUMBA_AVAILABLE,
+                      help="Compiled heap Dijkstra, Bellman-Ford and Floyd-Warshall; same results"
+                      if NUMBA_AVAILABLE else "Install numba to enable")
+backend = "numba" if use_jit else "python"
+mc_samples = st.number_input("🎲 Monte Carlo speed samples", min_value=0, max_value=100000, value=5000, step=1000,
+                             help="Random per-trip speeds for travel-time distributions (0 to skip)")
+
 if st.button("🔍 Run All Algorithms", type="primary"):
     with st.spinner("Computing shortest paths..."):
-        results = evaluate_algorithms(graph, src, dst)
+        if profile_memory:
+            # Profiling measures a fresh run, so it bypasses the shared cache
+            results = evaluate_algorithms(graph, src, dst, profile_memory=True,
+                                          dijkstra_engine=dijkstra_engine, use_planner=use_planner,
+                                          backend=backend)
+        else:
+            results = shared_evaluation(graph_key, src, dst, dijkstra_engine, use_planner, backend, graph)
 
     # Network Visualization
     st.subheader("🗺️ Transport Network & Algorithm Paths")
@@ -40,7 +80,7 @@ if st.button("🔍 Run All Algorithms", type="primary"):
     }
 
     # Get positions for consistent layout
-    pos = nx.spring_layout(graph, seed=42, k=2)
+    pos = network_layout(graph_key, graph)
 
     # Plot 1: Full Network
     ax = axes[0, 0]
@@ -109,8 +149,20 @@ if st.button("🔍 Run All Algorithms", type="primary"):
     for idx, (algo, data) in enumerate(results.items()):
         with cols[idx]:
             st.markdown(f"### {algo}")
+            if data.get("refused"):
+                st.warning(data["plan"])
+                continue
             st.markdown(f"**⏱️ Execution Time:** `{data['time'] * 1000:.4f} ms`")
             st.markdown(f"**📏 Total Distance:** `{data['distance']:.1f} km`")
+            if "bucket_scans" in data:
+                st.markdown(f"**🪣 Bucket Scans:** `{data['bucket_scans']}` ({data['engine']} queue)")
+            if "phases" in data:
+                st.markdown(f"**🔁 Relaxation Rounds:** `{data['phases']}` (Δ = {data['delta']:g})")
+            if data.get("backend") == "numba":
+                st.markdown("**⚡ Backend:** `Numba JIT`")
+            if "peak_memory_kb" in data:
+                st.markdown(f"**🧠 Peak Memory:** `{data['peak_memory_kb']:.2f} KB` "
+                            f"({data['blocks_retained']} blocks retained, {data['retained_kb']:.2f} KB retained)")
 
             if isinstance(data["path"], list) and len(data["path"]) > 0:
                 path_str = " ➜ ".join(data["path"])
@@ -125,6 +177,18 @@ if st.button("🔍 Run All Algorithms", type="primary"):
             else:
                 st.warning("No path found")
 
+            st.caption("Query plan")
+            st.code(data["plan"], language=None)
+
+    if profile_memory:
+        st.subheader("🧠 Peak Memory Comparison")
+        mem_fig, mem_ax = plt.subplots(figsize=(8, 3))
+        mem_ax.bar(list(results.keys()),
+                   [data.get("peak_memory_kb", 0) for data in results.values()],
+                   color=[algo_colors[algo] for algo in results])
+        mem_ax.set_ylabel("Peak allocation (KB)")
+        st.pyplot(mem_fig)
+
     # Best Algorithm Summary
     st.subheader("🏆 Performance Summary")
 
@@ -151,6 +215,28 @@ if st.button("🔍 Run All Algorithms", type="primary"):
     else:
         st.error("No valid paths found between selected cities")
 
+    # Travel-time uncertainty under random per-trip speeds
+    if mc_samples and src != dst:
+        st.subheader("🎲 Travel-Time Distribution (Monte Carlo)")
+        simulation = simulate_travel_times(
+            graph, src, dst,
+            paths={algo: data["path"] for algo, data in results.items()},
+            samples=int(mc_samples)
+        )
+
+        rows = [{"Route": algo, **stats} for algo, stats in simulation["paths"].items()]
+        rows.append({"Route": "Time-optimal per trip", **simulation["optimal"]})
+        st.table(rows)
+        st.caption("Travel time in hours: mean, median (p50), 95th percentile (p95) and standard deviation")
+
+        frequency = simulation["route_frequency"][:8]
+        if frequency:
+            freq_fig, freq_ax = plt.subplots(figsize=(8, 0.5 + 0.4 * len(frequency)))
+            freq_ax.barh([" ➜ ".join(r["path"]) for r in frequency][::-1],
+                         [r["share"] * 100 for r in frequency][::-1], color="#4ECDC4")
+            freq_ax.set_xlabel("Fastest route in % of sampled trips")
+            st.pyplot(freq_fig)
+
 # Network Statistics in Sidebar
 with st.sidebar:
     st.header("📈 Network Statistics")
@@ -160,5 +246,6 @@ with st.sidebar:
               f"{sum(d['distance'] for _, _, d in graph.edges(data=True)) / len(graph.edges):.1f} km")
 
     if st.button("🔄 Regenerate Network"):
-        st.session_state.graph = create_transport_network()
+        load_network.clear()
+        shared_evaluation.clear()
         st.rerun()
\ No newline at end of file
@@ -1,3 +1,7 @@
+import sys
+import tracemalloc
+
+
 def calculate_metrics(path, graph):
     distance = 0
     time = 0
@@ -12,3 +16,59 @@ def calculate_metrics(path, graph):
         "Travel Time (hrs)": round(time, 2),
         "Fuel Cost ($)": round(distance * 0.12, 2)
     }
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate retained size in bytes of obj and everything it references"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "nbytes"):
+        size += obj.nbytes
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def measure_memory(func, *args, **kwargs):
+    """
+    Run func under tracemalloc
+    Returns (result, stats) where stats holds the peak traced allocation
+    above the pre-call baseline, the number of memory blocks allocated by
+    the call that are still alive when it returns (blocks_retained), and
+    the retained size of the returned result. Tracing the caller already
+    had running is left on. Aviation/profiling.py keeps the same function
+    for the aviation app (the two apps share no modules); change both
+    copies together.
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    before = tracemalloc.take_snapshot()
+    baseline, _ = tracemalloc.get_traced_memory()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    blocks_retained = sum(max(stat.count_diff, 0) for stat in after.compare_to(before, "filename"))
+
+    stats = {
+        "peak_memory_kb": round((peak - baseline) / 1024, 2),
+        "blocks_retained": blocks_retained,
+        "retained_kb": round(deep_sizeof(result) / 1024, 2)
+    }
+    return result, stats
@@ -1,6 +1,13 @@
-import networkx as nx
+import hashlib
+import math
 import random
 
+import networkx as nx
+import numpy as np
+
+# Per-trip travel speed range (km/h)
+SPEED_RANGE = (70, 100)
+
 
 def create_transport_network(seed=42):
     """Create a deterministic transport network"""
@@ -36,11 +43,67 @@ def create_transport_network(seed=42):
 
     for u, v, distance in edges:
         if u in cities and v in cities:
-            speed = random.randint(70, 100)
+            speed = random.randint(*SPEED_RANGE)
             G.add_edge(
                 u, v,
                 distance=distance,
                 time=distance / speed
             )
 
-    return G
\ No newline at end of file
+    return G
+
+
+def generate_road_network(n_nodes, seed=42, max_distance=120):
+    """
+    Large synthetic road network for benchmarks: a roughly square grid of
+    two-way roads with integer kilometre distances plus a few long highways
+    """
+    rng = random.Random(seed)
+    side = max(int(math.ceil(math.sqrt(n_nodes))), 1)
+    G = nx.DiGraph()
+    G.add_nodes_from(f"N{i}" for i in range(n_nodes))
+
+    def add_road(u, v, distance):
+        for a, b in ((u, v), (v, u)):
+            G.add_edge(f"N{a}", f"N{b}", distance=distance,
+                       time=distance / rng.randint(*SPEED_RANGE))
+
+    for i in range(n_nodes):
+        col = i % side
+        if col + 1 < side and i + 1 < n_nodes:
+            add_road(i, i + 1, rng.randint(5, max_distance))
+        if i + side < n_nodes:
+            add_road(i, i + side, rng.randint(5, max_distance))
+
+    for _ in range(n_nodes // 50):
+        add_road(rng.randrange(n_nodes), rng.randrange(n_nodes), rng.randint(max_distance, 4 * max_distance))
+
+    G.remove_edges_from(list(nx.selfloop_edges(G)))
+    return G
+
+
+def edge_arrays(graph, attribute="distance", both_directions=False):
+    """
+    Edge list as arrays: (nodes, source index, target index, attribute values)
+    An undirected edge is listed once, as graph.edges() yields it; with
+    both_directions it is listed both ways, as graph.neighbors() sees it.
+    """
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(graph.edges(data=attribute))
+    if both_directions and not graph.is_directed():
+        edges += [(v, u, w) for u, v, w in edges if u != v]
+    src = np.array([index[u] for u, _, _ in edges], dtype=np.int64)
+    dst = np.array([index[v] for _, v, _ in edges], dtype=np.int64)
+    weights = np.array([w for _, _, w in edges], dtype=np.float64)
+    return nodes, src, dst, weights
+
+
+def network_hash(graph):
+    """Content hash of the nodes and edge attributes (cache key for shared results)"""
+    digest = hashlib.sha1()
+    for node in sorted(graph.nodes):
+        digest.update(f"{node}\n".encode("utf-8"))
+    for u, v, data in sorted(graph.edges(data=True), key=lambda e: (e[0], e[1])):
+        digest.update(f"{u}>{v}:{sorted(data.items())}\n".encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,136 @@
+import math
+
+from algorithms import integer_weights
+
+# Seconds per unit of work, timed on generate_road_network graphs (200 - 100k nodes)
+HEAP_SECONDS = 1.8e-7           # per (V + E) log2 V
+DIAL_SECONDS = 2.2e-6           # per (V + E)
+DIAL_SCAN_SECONDS = 1e-7        # per bucket scanned
+RADIX_SECONDS = 2.9e-6          # per (V + E)
+DELTA_SECONDS = 1.4e-6          # per (V + E), default delta (mostly edge list conversion)
+BELLMAN_FORD_SECONDS = 5.5e-7   # per V x E (no early exit)
+FLOYD_WARSHALL_SECONDS = 2.1e-7  # per V^3
+READ_SECONDS = 1e-7             # per answer read back from a finished tree or matrix
+
+# Plans estimated above this are refused instead of freezing the UI
+MAX_PLAN_SECONDS = 30.0
+MAX_DIAL_BUCKETS = 10_000_000
+
+WORKLOADS = ("single_pair", "one_to_many", "all_pairs")
+
+
+def graph_profile(graph, weight="distance"):
+    """V, E, negative weights and integer scaling of weight"""
+    weights = [data[weight] for _, _, data in graph.edges(data=True)]
+    return {
+        "nodes": graph.number_of_nodes(),
+        "edges": graph.number_of_edges(),
+        "negative": any(w < 0 for w in weights),
+        "integer_scale": integer_weights(graph, weight),
+    }
+
+
+def estimate_seconds(profile, engine, workload="single_pair"):
+    """
+    (estimated seconds, None) or (inf, reason the engine cannot run)
+    Single-source engines build one tree per origin (V for all_pairs);
+    every engine then reads 1, V or V^2 answers for single_pair,
+    one_to_many and all_pairs, so one_to_many amortises one tree (or one
+    V^3 matrix) over every destination.
+    """
+    if workload not in WORKLOADS:
+        raise ValueError(f"Unknown workload: {workload}")
+    n, m = profile["nodes"], profile["edges"]
+    sources = n if workload == "all_pairs" else 1
+    reads = {"single_pair": 1, "one_to_many": n, "all_pairs": n * n}[workload] * READ_SECONDS
+
+    if engine in ("heap", "dial", "radix", "delta") and profile["negative"]:
+        return float("inf"), "Dijkstra needs non-negative weights"
+
+    if engine == "heap":
+        return sources * (n + m) * math.log2(n + 2) * HEAP_SECONDS + reads, None
+
+    if engine == "delta":
+        return sources * (n + m) * DELTA_SECONDS + reads, None
+
+    if engine in ("dial", "radix"):
+        if profile["integer_scale"] is None:
+            return float("inf"), "weights cannot be scaled to integers"
+        if engine == "radix":
+            return sources * (n + m) * RADIX_SECONDS + reads, None
+        max_weight = profile["integer_scale"][1]
+        if max_weight + 1 > MAX_DIAL_BUCKETS:
+            return float("inf"), f"{max_weight + 1:,} buckets needed"
+        # Bucket scans run up to the largest distance, ~ max weight x hop diameter
+        scans = max_weight * math.sqrt(n)
+        return sources * ((n + m) * DIAL_SECONDS + scans * DIAL_SCAN_SECONDS) + reads, None
+
+    if engine == "bellman_ford":
+        return sources * n * m * BELLMAN_FORD_SECONDS + reads, None
+
+    if engine == "floyd_warshall":
+        return n ** 3 * FLOYD_WARSHALL_SECONDS + reads, None
+
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+def _format_seconds(seconds):
+    if seconds == float("inf"):
+        return "not applicable"
+    if seconds < 1:
+        return f"~{seconds * 1000:.3g} ms"
+    return f"~{seconds:,.3g} s"
+
+
+def plan_step(profile, label, candidates, workload="single_pair", max_seconds=MAX_PLAN_SECONDS):
+    """Cheapest valid engine among candidates, with an explanation; refused above max_seconds"""
+    scored = sorted((*estimate_seconds(profile, engine, workload), engine) for engine in candidates)
+    seconds, invalid, engine = scored[0]
+    summary = f"V={profile['nodes']:,}, E={profile['edges']:,}"
+
+    lines = []
+    if seconds == float("inf"):
+        feasible = False
+        lines.append(f"{label}: no valid engine ({invalid})")
+    elif seconds > max_seconds:
+        feasible = False
+        lines.append(f"{label}: refused - {engine} is estimated at {_format_seconds(seconds)} "
+                     f"on {summary} (limit {_format_seconds(max_seconds)})")
+    else:
+        feasible = True
+        lines.append(f"{label}: {engine} ({workload}, {summary}) est. {_format_seconds(seconds)}")
+
+    for other_seconds, other_invalid, other in scored[1:]:
+        lines.append(f"  rejected {other} ({_format_seconds(other_seconds)}): {other_invalid or 'slower'}")
+
+    return {
+        "engine": engine,
+        "estimated_seconds": seconds,
+        "feasible": feasible,
+        "plan": "\n".join(lines),
+    }
+
+
+def plan_evaluation(graph, dijkstra_engine="heap", use_planner=False, workload="single_pair",
+                    max_seconds=MAX_PLAN_SECONDS):
+    """
+    Plan for each evaluate_algorithms entry
+    Dijkstra runs dijkstra_engine when it is valid (else the binary heap),
+    or the cheapest queue with use_planner. Every entry is refused when its
+    estimate exceeds max_seconds.
+    """
+    profile = graph_profile(graph)
+    if use_planner:
+        dijkstra_candidates = ["heap", "dial", "radix", "delta"]
+    else:
+        dijkstra_candidates = [dijkstra_engine]
+
+    plan = {"Dijkstra": plan_step(profile, "Dijkstra", dijkstra_candidates, workload, max_seconds)}
+    if not use_planner and dijkstra_engine != "heap" and plan["Dijkstra"]["estimated_seconds"] == float("inf"):
+        fallback = plan_step(profile, "Dijkstra", ["heap"], workload, max_seconds)
+        fallback["plan"] = plan["Dijkstra"]["plan"] + "\n  falling back to the binary heap\n" + fallback["plan"]
+        plan["Dijkstra"] = fallback
+
+    plan["Bellman-Ford"] = plan_step(profile, "Bellman-Ford", ["bellman_ford"], workload, max_seconds)
+    plan["Floyd-Warshall"] = plan_step(profile, "Floyd-Warshall", ["floyd_warshall"], workload, max_seconds)
+    return plan
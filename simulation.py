@@ -0,0 +1,117 @@
+import numpy as np
+
+from network import SPEED_RANGE, edge_arrays
+
+
+def sample_edge_times(distances, samples=5000, speed_range=SPEED_RANGE, seed=None):
+    """samples x edges travel-time matrix (hrs) with one uniform integer speed per trip and edge"""
+    rng = np.random.default_rng(seed)
+    speeds = rng.integers(speed_range[0], speed_range[1] + 1, size=(samples, len(distances)))
+    return distances[None, :] / speeds
+
+
+def batched_shortest_times(times, src, dst, n_nodes, source):
+    """
+    Bellman-Ford over all samples at once
+    Every round relaxes all edges of all samples with one vectorized
+    min-reduction per destination node; stops when no sample improves.
+    Returns (dist, pred_edge), both samples x nodes (pred_edge -1 = none).
+    """
+    samples = times.shape[0]
+    dist = np.full((samples, n_nodes), np.inf)
+    dist[:, source] = 0.0
+
+    # Edges grouped by destination node for np.minimum.reduceat
+    order = np.argsort(dst, kind="stable")
+    sorted_dst = dst[order]
+    starts = np.flatnonzero(np.r_[True, sorted_dst[1:] != sorted_dst[:-1]])
+    heads = sorted_dst[starts]
+
+    for _ in range(max(n_nodes - 1, 1)):
+        candidate = dist[:, src[order]] + times[:, order]
+        best = np.minimum.reduceat(candidate, starts, axis=1)
+        improved = best < dist[:, heads]
+        if not improved.any():
+            break
+        dist[:, heads] = np.where(improved, best, dist[:, heads])
+
+    # Recover one optimal predecessor edge per node from the tight edges
+    rows = np.arange(samples)
+    pred_edge = np.full((samples, n_nodes), -1, dtype=np.int64)
+    tight = np.isclose(dist[:, src] + times, dist[:, dst])
+    for v in range(n_nodes):
+        if v == source:
+            continue
+        incoming = np.flatnonzero(dst == v)
+        if len(incoming) == 0:
+            continue
+        first = tight[:, incoming].argmax(axis=1)
+        has_tight = tight[rows, incoming[first]] & np.isfinite(dist[:, v])
+        pred_edge[:, v] = np.where(has_tight, incoming[first], -1)
+
+    return dist, pred_edge
+
+
+def summarize_times(values):
+    """Mean / p50 / p95 / std of per-sample travel times (finite samples only)"""
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return {"mean": float("inf"), "p50": float("inf"), "p95": float("inf"), "std": 0.0}
+    return {
+        "mean": round(float(finite.mean()), 3),
+        "p50": round(float(np.percentile(finite, 50)), 3),
+        "p95": round(float(np.percentile(finite, 95)), 3),
+        "std": round(float(finite.std()), 3)
+    }
+
+
+def simulate_travel_times(graph, source, destination, paths=None, samples=5000,
+                          speed_range=SPEED_RANGE, seed=None):
+    """
+    Monte Carlo travel times under random per-trip speeds
+
+    Draws a samples x edges speed matrix and reports:
+      - "paths": time distribution of each given path (dict label -> path)
+      - "optimal": distribution of the time-optimal route per sample
+      - "route_frequency": how often each route is time-optimal, most common first
+    """
+    nodes, src, dst, distances = edge_arrays(graph, "distance")
+    index = {node: i for i, node in enumerate(nodes)}
+    edge_index = {(nodes[u], nodes[v]): e for e, (u, v) in enumerate(zip(src, dst))}
+
+    times = sample_edge_times(distances, samples, speed_range, seed)
+    source_idx, dest_idx = index[source], index[destination]
+
+    results = {"samples": samples, "paths": {}}
+
+    for label, path in (paths or {}).items():
+        if not path or len(path) < 2:
+            continue
+        path_edges = [edge_index[(path[i], path[i + 1])] for i in range(len(path) - 1)]
+        results["paths"][label] = summarize_times(times[:, path_edges].sum(axis=1))
+
+    dist, pred_edge = batched_shortest_times(times, src, dst, len(nodes), source_idx)
+    results["optimal"] = summarize_times(dist[:, dest_idx])
+
+    # Walk every sample's tree back from the destination at once
+    routes = np.full((samples, len(nodes)), -1, dtype=np.int64)
+    current = np.where(np.isfinite(dist[:, dest_idx]), dest_idx, -1)
+    rows = np.arange(samples)
+    for step in range(len(nodes)):
+        routes[:, step] = current
+        active = current >= 0
+        if not active.any():
+            break
+        edge = np.where(active, pred_edge[rows, np.maximum(current, 0)], -1)
+        current = np.where(edge >= 0, src[np.maximum(edge, 0)], -1)
+
+    unique_routes, counts = np.unique(routes, axis=0, return_counts=True)
+    frequency = []
+    for route, count in zip(unique_routes, counts):
+        path = [nodes[i] for i in reversed(route[route >= 0].tolist())]
+        if path:
+            frequency.append({"path": path, "share": round(float(count) / samples, 4)})
+    frequency.sort(key=lambda r: r["share"], reverse=True)
+    results["route_frequency"] = frequency
+
+    return results
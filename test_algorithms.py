@@ -0,0 +1,51 @@
+"""
+Regression checks for the Dijkstra engines
+
+    python -m pytest test_algorithms.py
+"""
+import networkx as nx
+import pytest
+
+from algorithms import _dijkstra_numba, dial_dijkstra, dijkstra, radix_heap_dijkstra
+from delta_stepping import delta_stepping
+from evaluator import evaluate_algorithms
+
+
+def float_integral_graph():
+    """Integral distances stored as floats, which integer_weights scales by 1"""
+    g = nx.DiGraph()
+    g.add_edge("A", "B", distance=150.0)
+    g.add_edge("B", "C", distance=20.0)
+    g.add_edge("A", "C", distance=200.0)
+    return g
+
+
+@pytest.mark.parametrize("engine", [dial_dijkstra, radix_heap_dijkstra])
+def test_integer_queues_accept_float_integral_weights(engine):
+    g = float_integral_graph()
+    dist, prev = engine(g, "A")
+    assert dist == dijkstra(g, "A")[0]
+    assert prev["C"] == "B"
+
+
+@pytest.mark.parametrize("engine", ["dial", "radix"])
+def test_evaluate_with_integer_queue_on_float_integral_weights(engine):
+    result = evaluate_algorithms(float_integral_graph(), "A", "C", dijkstra_engine=engine)["Dijkstra"]
+    assert result["engine"] == engine
+    assert result["path"] == ["A", "B", "C"]
+    assert result["distance"] == 170
+
+
+def test_dijkstra_kernel_matches_reference_on_undirected_graphs():
+    # Without Numba the kernel runs uncompiled on the same arrays
+    g = nx.Graph()
+    g.add_edge("A", "B", distance=1.0)
+    g.add_edge("B", "C", distance=2.0)
+    assert _dijkstra_numba(g, "C") == dijkstra(g, "C")
+
+
+def test_delta_stepping_matches_reference_on_undirected_graphs():
+    g = nx.Graph()
+    g.add_edge("A", "B", distance=1.0)
+    g.add_edge("B", "C", distance=2.0)
+    assert delta_stepping(g, "C")[0] == dijkstra(g, "C")[0]